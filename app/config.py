@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -7,3 +8,71 @@ YOLO_MODELS_DIR.mkdir(exist_ok=True)
 
 SAM3_MODELS_DIR = BASE_DIR / "sam3_models"
 SAM3_MODELS_DIR.mkdir(exist_ok=True)
+
+MODEL_BLOBS_DIR = BASE_DIR / "model_blobs"
+MODEL_BLOBS_DIR.mkdir(exist_ok=True)
+
+JOBS_DIR = BASE_DIR / "jobs"
+JOBS_DIR.mkdir(exist_ok=True)
+
+MODEL_MMAP_DIR = BASE_DIR / "model_mmap"
+MODEL_MMAP_DIR.mkdir(exist_ok=True)
+
+RESULT_CACHE_DIR = BASE_DIR / "result_cache"
+RESULT_CACHE_DIR.mkdir(exist_ok=True)
+
+IMAGE_FETCH_TIMEOUT = float(os.getenv("IMAGE_FETCH_TIMEOUT", "30"))
+IMAGE_FETCH_MAX_CONNECTIONS = int(os.getenv("IMAGE_FETCH_MAX_CONNECTIONS", "64"))
+IMAGE_FETCH_MAX_KEEPALIVE = int(os.getenv("IMAGE_FETCH_MAX_KEEPALIVE", "32"))
+IMAGE_FETCH_MAX_PER_HOST = int(os.getenv("IMAGE_FETCH_MAX_PER_HOST", "8"))
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", str(1 << 30)))
+IMAGE_DECODE_REDUCE = os.getenv("IMAGE_DECODE_REDUCE", "1").lower() not in ("0", "false", "no")
+
+INFERENCE_LANE_WORKERS = int(os.getenv("INFERENCE_LANE_WORKERS", "1"))
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", "16"))
+INFERENCE_RETRY_AFTER = int(os.getenv("INFERENCE_RETRY_AFTER", "5"))
+INFERENCE_PROCESSES = int(os.getenv("INFERENCE_PROCESSES", "0"))
+WORKER_TORCH_THREADS = int(os.getenv("WORKER_TORCH_THREADS", "0"))
+WORKER_CPU_PINNING = os.getenv("WORKER_CPU_PINNING", "0").lower() in ("1", "true", "yes")
+MODEL_MMAP_WEIGHTS = os.getenv("MODEL_MMAP_WEIGHTS", "1" if INFERENCE_PROCESSES > 0 else "0").lower() in ("1", "true", "yes")
+
+DEFAULT_IMGSZ = int(os.getenv("DEFAULT_IMGSZ", "640"))
+YOLO_BATCH_MAX_SIZE = int(os.getenv("YOLO_BATCH_MAX_SIZE", "8"))
+YOLO_BATCH_MAX_LATENCY_MS = float(os.getenv("YOLO_BATCH_MAX_LATENCY_MS", "10"))
+YOLO_BATCH_MAX_QUEUE = int(os.getenv("YOLO_BATCH_MAX_QUEUE", "1024"))
+YOLO_BATCH_IDLE_TIMEOUT = float(os.getenv("YOLO_BATCH_IDLE_TIMEOUT", "60"))
+
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+SAM3_EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("SAM3_EMBEDDING_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+SAM3_TEXT_CACHE_MAX_BYTES = int(os.getenv("SAM3_TEXT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+SAM3_SESSION_MAX = int(os.getenv("SAM3_SESSION_MAX", "32"))
+SAM3_SESSION_IDLE_TIMEOUT = float(os.getenv("SAM3_SESSION_IDLE_TIMEOUT", "300"))
+
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_BYTES", str(8 * 1024 * 1024 * 1024)))
+MODEL_CACHE_POLICY = os.getenv("MODEL_CACHE_POLICY", "lru")
+MODEL_PIN = [spec.strip() for spec in os.getenv("MODEL_PIN", "").split(",") if spec.strip()]
+MODEL_PRELOAD = [spec.strip() for spec in os.getenv("MODEL_PRELOAD", "").split(",") if spec.strip()]
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+
+MODEL_REGISTRY_RESCAN_INTERVAL = float(os.getenv("MODEL_REGISTRY_RESCAN_INTERVAL", "5"))
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+YOLO_EXPORT_FORMATS = ("onnx", "openvino", "torchscript")
+YOLO_EXPORT_ON_UPLOAD = [fmt.strip() for fmt in os.getenv("YOLO_EXPORT_ON_UPLOAD", "").split(",") if fmt.strip()]
+YOLO_BENCHMARK_RUNS = int(os.getenv("YOLO_BENCHMARK_RUNS", "10"))
+
+CONCEPT_BATCH_INFLIGHT = int(os.getenv("CONCEPT_BATCH_INFLIGHT", "2"))
+
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+PIPELINE_FETCH_CONCURRENCY = int(os.getenv("PIPELINE_FETCH_CONCURRENCY", "8"))
+PIPELINE_DECODE_CONCURRENCY = int(os.getenv("PIPELINE_DECODE_CONCURRENCY", "4"))
+PIPELINE_ENCODE_CONCURRENCY = int(os.getenv("PIPELINE_ENCODE_CONCURRENCY", "2"))
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "32"))
+JOB_RESULTS_PAGE_MAX = int(os.getenv("JOB_RESULTS_PAGE_MAX", "500"))
@@ -0,0 +1,87 @@
+import json
+from typing import Any, AsyncIterator, Optional
+
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+FAST_JSON_MEDIA_TYPE = "application/vnd.annotator.fast+json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return vars(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+
+def _dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default).encode("utf-8")
+
+
+def negotiate_fast_media_type(request: Request) -> Optional[str]:
+    accept = request.headers.get("accept", "")
+    if msgpack is not None:
+        for media_type in MSGPACK_MEDIA_TYPES:
+            if media_type in accept:
+                return media_type
+    # Plain application/json is what most HTTP clients send by default, so JSON opts in via its own type.
+    if FAST_JSON_MEDIA_TYPE in accept:
+        return FAST_JSON_MEDIA_TYPE
+    return None
+
+
+def fast_response(request: Request, content: Any) -> Any:
+    """Serialize ``content`` directly when the client explicitly accepts msgpack or fast JSON.
+
+    Returning a ``Response`` skips FastAPI's ``response_model`` validation and
+    ``model_dump``: nested models are written from their fields as they are. Those
+    fields are still plain lists, built by the services with one ``tolist()`` per
+    array, because the same objects feed the validated path, NDJSON and the result
+    store. The declared schema still documents the payload. Other clients get
+    ``content`` back unchanged and go through the regular validated path.
+    """
+    media_type = negotiate_fast_media_type(request)
+    if media_type is None:
+        return content
+    if media_type in MSGPACK_MEDIA_TYPES:
+        body = msgpack.packb(content, default=_default, use_bin_type=True)
+    else:
+        body = _dumps(content)
+    return Response(content=body, media_type=media_type)
+
+
+def _ndjson_line(idx: int, value: Any, field: str) -> dict:
+    if isinstance(value, HTTPException):
+        return {"index": idx, "error": value.detail, "status_code": value.status_code}
+    if isinstance(value, BaseModel):
+        return {"index": idx, **vars(value)}
+    return {"index": idx, field: value}
+
+
+def ndjson_response(items: AsyncIterator[tuple[int, Any]], field: str = "result") -> StreamingResponse:
+    async def lines():
+        async for idx, value in items:
+            yield _dumps(_ndjson_line(idx, value, field)) + b"\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
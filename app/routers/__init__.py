@@ -1,9 +1,13 @@
 from .health import router as health_router
 from .yolo import router as yolo_router
 from .sam3 import router as sam3_router
+from .jobs import router as jobs_router
+from .metrics import router as metrics_router
 
 __all__ = [
     "health_router",
     "yolo_router",
     "sam3_router",
+    "jobs_router",
+    "metrics_router",
 ]
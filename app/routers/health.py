@@ -1,8 +1,33 @@
 from fastapi import APIRouter
 
+from app.services.image_service import image_cache
+from app.services.inference_executor import InferenceExecutor
+from app.services.job_service import JobService
+from app.services.model_manager import ModelManager
+from app.services.result_store import result_store
+from app.services.sam3_service import Sam3Service
+from app.services.sam3_session import Sam3SessionManager
+from app.services.yolo_service import YoloService
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
-def health_check():
-    return {"status": "ok"}
+async def health_check():
+    return {
+        "status": "ok",
+        "inference": InferenceExecutor.stats(),
+        "worker_pool": InferenceExecutor.pool_stats(),
+        "models": ModelManager.stats(),
+        "yolo_batching": YoloService.batcher_stats(),
+        "image_cache": image_cache.stats(),
+        "sam3_embedding_cache": Sam3Service.embedding_cache_stats(),
+        "sam3_text_cache": Sam3Service.text_cache_stats(),
+        "result_cache": result_store.stats(),
+        "sam3_sessions": Sam3SessionManager.stats(),
+        "coalescing": {
+            "yolo": YoloService.coalescing_stats(),
+            "sam3": Sam3Service.coalescing_stats(),
+        },
+        "jobs": JobService.stats(),
+    }
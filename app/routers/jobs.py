@@ -0,0 +1,35 @@
+from typing import List
+
+from fastapi import APIRouter, Query, Request
+
+from app.config import JOB_RESULTS_PAGE_MAX
+from app.responses import fast_response
+from app.schemas.jobs import JobInfo, JobResultsPage
+from app.services.job_service import JobService
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("", response_model=List[JobInfo])
+def list_jobs():
+    return JobService.list()
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+def get_job(job_id: str):
+    return JobService.get(job_id)
+
+
+@router.get("/{job_id}/results", response_model=JobResultsPage)
+def get_job_results(
+    job_id: str,
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=JOB_RESULTS_PAGE_MAX),
+):
+    return fast_response(request, JobService.results(job_id, offset, limit))
+
+
+@router.delete("/{job_id}", status_code=204)
+def delete_job(job_id: str):
+    JobService.delete(job_id)
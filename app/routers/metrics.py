@@ -0,0 +1,85 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.image_service import image_cache
+from app.services.inference_executor import InferenceExecutor
+from app.services.job_service import JobService
+from app.services.metrics import METRICS_MEDIA_TYPE, STAGE_SECONDS, process_rss_bytes, render_gauge
+from app.services.model_manager import ModelManager
+from app.services.result_store import result_store
+from app.services.sam3_service import Sam3Service
+from app.services.sam3_session import Sam3SessionManager
+from app.services.yolo_service import YoloService
+
+router = APIRouter(tags=["metrics"])
+
+
+def _cache_lines() -> list[str]:
+    caches = {
+        "image": image_cache.stats(),
+        "sam3_embedding": Sam3Service.embedding_cache_stats(),
+        "sam3_text": Sam3Service.text_cache_stats(),
+        "models": ModelManager.stats(),
+        "results": result_store.stats(),
+    }
+    lines = []
+    for metric, key, documentation, kind in (
+        ("annotator_cache_hits_total", "hits", "Cache hits.", "counter"),
+        ("annotator_cache_misses_total", "misses", "Cache misses.", "counter"),
+        ("annotator_cache_evictions_total", "evictions", "Cache evictions.", "counter"),
+        ("annotator_cache_hit_ratio", "hit_rate", "Cache hit ratio since start.", "gauge"),
+        ("annotator_cache_bytes", "bytes", "Bytes held by the cache.", "gauge"),
+        ("annotator_cache_max_bytes", "max_bytes", "Cache byte budget.", "gauge"),
+    ):
+        samples = [({"cache": name}, stats[key]) for name, stats in caches.items()]
+        lines += render_gauge(metric, documentation, samples, kind)
+    return lines
+
+
+def _queue_lines() -> list[str]:
+    lanes = InferenceExecutor.stats()
+    batchers = YoloService.batcher_stats()
+    jobs = JobService.stats()
+    lines = []
+    for metric, key, documentation, kind in (
+        ("annotator_lane_pending", "pending", "Tasks admitted to an inference lane.", "gauge"),
+        ("annotator_lane_queued", "queued", "Tasks waiting for an inference lane worker.", "gauge"),
+        ("annotator_lane_running", "running", "Tasks running on an inference lane.", "gauge"),
+        ("annotator_lane_rejected_total", "rejected", "Tasks rejected because the lane was full.", "counter"),
+    ):
+        lines += render_gauge(metric, documentation, [({"lane": lane}, s[key]) for lane, s in lanes.items()], kind)
+    lines += render_gauge(
+        "annotator_batcher_queued",
+        "Images waiting in a YOLO micro-batcher.",
+        [({"batcher": name}, s["queued"]) for name, s in batchers.items()],
+    )
+    pool = InferenceExecutor.pool_stats()
+    if pool is not None:
+        lines += render_gauge(
+            "annotator_worker_inflight",
+            "Calls dispatched to an inference worker process and not yet finished.",
+            [({"worker": str(i)}, count) for i, count in enumerate(pool["inflight"])],
+        )
+    lines += render_gauge("annotator_jobs_queue_depth", "Jobs waiting for a job worker.", [({}, jobs["queued"])])
+    lines += render_gauge(
+        "annotator_jobs",
+        "Known jobs by status.",
+        [({"status": status}, count) for status, count in jobs["jobs"].items()],
+    )
+    lines += render_gauge(
+        "annotator_sam3_sessions_active",
+        "Open SAM3 interactive sessions.",
+        [({}, Sam3SessionManager.stats()["active"])],
+    )
+    return lines
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    lines = STAGE_SECONDS.render()
+    lines += _cache_lines()
+    lines += _queue_lines()
+    rss = process_rss_bytes()
+    if rss is not None:
+        lines += render_gauge("process_resident_memory_bytes", "Resident memory size in bytes.", [({}, rss)])
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=METRICS_MEDIA_TYPE)
@@ -1,7 +1,9 @@
 from typing import List
 
-from fastapi import APIRouter, File, Form, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile, WebSocket
 
+from app.responses import fast_response, ndjson_response, wants_ndjson
+from app.schemas.jobs import JobInfo
 from app.schemas.sam3 import (
     Sam3ModelInfo,
     UploadSam3ModelResponse,
@@ -12,7 +14,9 @@ from app.schemas.sam3 import (
     Sam3ConceptBatchRequest,
     Sam3ConceptBatchResponse,
 )
+from app.services.job_service import JobService
 from app.services.sam3_service import Sam3Service
+from app.services.sam3_session import Sam3SessionManager
 
 router = APIRouter(prefix="/sam3-models", tags=["sam3"])
 
@@ -31,29 +35,53 @@ def list_sam3_models():
 
 
 @router.delete("/{model_name}", status_code=204)
-def delete_sam3_model(model_name: str):
-    Sam3Service.delete_model(model_name)
+async def delete_sam3_model(model_name: str):
+    await Sam3Service.delete_model(model_name)
 
 
 @router.post("/{model_name}/annotate", response_model=Sam3AnnotateResponse)
 async def sam3_annotate(
     model_name: str,
     payload: Sam3AnnotateRequest,
+    request: Request,
 ):
-    return Sam3Service.annotate(model_name, payload)
+    return fast_response(request, await Sam3Service.annotate(model_name, payload))
 
 
 @router.post("/{model_name}/concept", response_model=Sam3ConceptResponse)
 async def sam3_concept_segment(
     model_name: str,
     payload: Sam3ConceptRequest,
+    request: Request,
 ):
-    return Sam3Service.concept_segment(model_name, payload)
+    return fast_response(request, await Sam3Service.concept_segment(model_name, payload))
 
 
 @router.post("/{model_name}/concept-batch", response_model=Sam3ConceptBatchResponse)
 async def sam3_concept_batch(
     model_name: str,
     payload: Sam3ConceptBatchRequest,
+    request: Request,
 ):
-    return Sam3Service.concept_batch(model_name, payload)
+    if wants_ndjson(request):
+        return ndjson_response(await Sam3Service.stream_concept_batch(model_name, payload))
+    return fast_response(request, await Sam3Service.concept_batch(model_name, payload))
+
+
+@router.post("/{model_name}/concept-batch/jobs", response_model=JobInfo, status_code=202)
+def submit_sam3_concept_batch_job(
+    model_name: str,
+    payload: Sam3ConceptBatchRequest,
+):
+    if Sam3Service.registry.get(model_name) is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return JobService.submit("sam3-concept-batch", model_name, payload)
+
+
+@router.websocket("/{model_name}/session")
+async def sam3_session(
+    websocket: WebSocket,
+    model_name: str,
+    image_url: str,
+):
+    await Sam3SessionManager.serve(websocket, model_name, image_url)
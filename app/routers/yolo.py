@@ -1,13 +1,18 @@
 from typing import List
 
-from fastapi import APIRouter, File, Form, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
 
+from app.responses import fast_response, ndjson_response, wants_ndjson
+from app.schemas.jobs import JobInfo
 from app.schemas.yolo import (
     YoloModelInfo,
     AutoAnnotateRequest,
     AutoAnnotateResponse,
     UploadModelResponse,
+    ExportModelRequest,
+    ModelBackendsResponse,
 )
+from app.services.job_service import JobService
 from app.services.yolo_service import YoloService
 
 router = APIRouter(prefix="/yolo-models", tags=["yolo"])
@@ -28,14 +33,41 @@ def list_yolo_models():
 
 
 @router.delete("/{model_name}", status_code=204)
-def delete_yolo_model(model_name: str):
-    YoloService.delete_model(model_name)
+async def delete_yolo_model(model_name: str):
+    await YoloService.delete_model(model_name)
 
 
 @router.post("/{model_name}/annotate", response_model=AutoAnnotateResponse)
 async def auto_annotate_images(
     model_name: str,
     payload: AutoAnnotateRequest,
+    request: Request,
 ):
-    annotations = YoloService.run_inference(model_name, payload)
-    return AutoAnnotateResponse(annotations=annotations)
+    if wants_ndjson(request):
+        items = await YoloService.stream_inference(model_name, payload, return_exceptions=True)
+        return ndjson_response(items, field="annotations")
+    annotations = await YoloService.run_inference(model_name, payload)
+    return fast_response(request, AutoAnnotateResponse.model_construct(annotations=annotations))
+
+
+@router.post("/{model_name}/jobs", response_model=JobInfo, status_code=202)
+def submit_yolo_annotate_job(
+    model_name: str,
+    payload: AutoAnnotateRequest,
+):
+    if YoloService.registry.get(model_name) is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return JobService.submit("yolo-annotate", model_name, payload)
+
+
+@router.post("/{model_name}/export", response_model=ModelBackendsResponse)
+async def export_yolo_model(
+    model_name: str,
+    payload: ExportModelRequest,
+):
+    return await YoloService.export(model_name, payload)
+
+
+@router.get("/{model_name}/backends", response_model=ModelBackendsResponse)
+def get_yolo_model_backends(model_name: str):
+    return YoloService.get_backends(model_name)
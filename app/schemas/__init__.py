@@ -1,22 +1,53 @@
-from .yolo import YoloModelInfo, AutoAnnotateRequest, AutoAnnotateResponse, UploadModelResponse
+from .yolo import (
+    YoloModelInfo,
+    TilingOptions,
+    AutoAnnotateRequest,
+    AutoAnnotateResponse,
+    UploadModelResponse,
+    ExportModelRequest,
+    ModelBackendInfo,
+    ModelBackendsResponse,
+)
 from .sam3 import (
     Sam3ModelInfo,
     UploadSam3ModelResponse,
+    MaskFormat,
+    MaskRLE,
+    PolygonOptions,
+    Sam3PromptRequest,
     Sam3AnnotateRequest,
     Sam3AnnotateResponse,
     Sam3ConceptRequest,
     Sam3ConceptResponse,
+    Sam3SessionPrompt,
+)
+from .jobs import (
+    JobInfo,
+    JobResultItem,
+    JobResultsPage,
 )
 
 __all__ = [
     "YoloModelInfo",
+    "TilingOptions",
     "AutoAnnotateRequest",
     "AutoAnnotateResponse",
     "UploadModelResponse",
+    "ExportModelRequest",
+    "ModelBackendInfo",
+    "ModelBackendsResponse",
     "Sam3ModelInfo",
     "UploadSam3ModelResponse",
+    "MaskFormat",
+    "MaskRLE",
+    "PolygonOptions",
+    "Sam3PromptRequest",
     "Sam3AnnotateRequest",
     "Sam3AnnotateResponse",
     "Sam3ConceptRequest",
     "Sam3ConceptResponse",
+    "Sam3SessionPrompt",
+    "JobInfo",
+    "JobResultItem",
+    "JobResultsPage",
 ]
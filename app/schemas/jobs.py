@@ -0,0 +1,32 @@
+from typing import Any, Optional, Literal
+from pydantic import BaseModel, ConfigDict
+
+
+class JobInfo(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    id: str
+    kind: Literal["yolo-annotate", "sam3-concept-batch"]
+    model_name: str
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    total: int
+    completed: int
+    failed: int
+    created_at: str
+    updated_at: str
+    error: Optional[str] = None
+
+
+class JobResultItem(BaseModel):
+    index: int
+    result: Any = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+
+
+class JobResultsPage(BaseModel):
+    job_id: str
+    offset: int
+    limit: int
+    total: int
+    items: list[JobResultItem]
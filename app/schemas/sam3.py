@@ -1,5 +1,5 @@
 from typing import Optional, Literal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Sam3ModelInfo(BaseModel):
@@ -12,12 +12,36 @@ class UploadSam3ModelResponse(BaseModel):
     message: str
 
 
-class Sam3AnnotateRequest(BaseModel):
-    image_url: str
+MaskFormat = Literal["polygon", "rle", "png", "bitmap", "none"]
+
+
+class MaskRLE(BaseModel):
+    size: list[int]
+    counts: list[int]
+
+
+class PolygonOptions(BaseModel):
+    tolerance: Optional[float] = Field(None, ge=0)
+    max_points: Optional[int] = Field(None, ge=3)
+    precision: Optional[int] = Field(None, ge=0, le=6)
+    largest_component_only: bool = False
+
+
+class Sam3PromptRequest(BaseModel):
     prompt_type: Literal["bbox", "point", "points", "points_per_object", "negative_points"]
     bboxes: Optional[list[float]] = None
     points: Optional[list[list[float]]] = None
     labels: Optional[list[int]] = None
+    mask_format: Optional[MaskFormat] = None
+    polygon_options: Optional[PolygonOptions] = None
+
+
+class Sam3AnnotateRequest(Sam3PromptRequest):
+    image_url: str
+
+
+class Sam3SessionPrompt(Sam3PromptRequest):
+    request_id: Optional[str] = None
 
 
 class Sam3AnnotateResponse(BaseModel):
@@ -25,12 +49,17 @@ class Sam3AnnotateResponse(BaseModel):
     boxes: list[list[float]]
     confidences: list[float]
     mask_images: list[str]
+    mask_rles: list[MaskRLE] = []
+    mask_bitmaps: list[str] = []
+    mask_size: Optional[list[int]] = None
 
 
 class Sam3ConceptRequest(BaseModel):
     image_url: str
     text_prompts: list[str]
     conf_threshold: Optional[float] = 0.25
+    mask_format: Optional[MaskFormat] = None
+    polygon_options: Optional[PolygonOptions] = None
 
 
 class Sam3ConceptResponse(BaseModel):
@@ -39,6 +68,9 @@ class Sam3ConceptResponse(BaseModel):
     confidences: list[float]
     prompt_indices: list[int]
     mask_images: list[str]
+    mask_rles: list[MaskRLE] = []
+    mask_bitmaps: list[str] = []
+    mask_size: Optional[list[int]] = None
 
 
 class Sam3ConceptBatchRequest(BaseModel):
@@ -47,6 +79,8 @@ class Sam3ConceptBatchRequest(BaseModel):
     conf_threshold: Optional[float] = 0.25
     class_name: str
     skip_duplicates: Optional[bool] = False
+    mask_format: Optional[MaskFormat] = None
+    polygon_options: Optional[PolygonOptions] = None
 
 
 class Sam3ConceptBatchResultItem(BaseModel):
@@ -55,6 +89,9 @@ class Sam3ConceptBatchResultItem(BaseModel):
     confidences: list[float]
     prompt_indices: list[int]
     mask_images: list[str]
+    mask_rles: list[MaskRLE] = []
+    mask_bitmaps: list[str] = []
+    mask_size: Optional[list[int]] = None
 
 
 class Sam3ConceptBatchResponse(BaseModel):
@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
 
 
 class YoloModelInfo(BaseModel):
@@ -8,11 +8,20 @@ class YoloModelInfo(BaseModel):
     date_add: str
 
 
+class TilingOptions(BaseModel):
+    tile_size: int = Field(1024, ge=64)
+    overlap: float = Field(0.2, ge=0, lt=1)
+    batch_size: int = Field(8, ge=1)
+    merge: Literal["nms", "wbf"] = "nms"
+    iou_threshold: float = Field(0.5, gt=0, le=1)
+
+
 class AutoAnnotateRequest(BaseModel):
     image_urls: list[str]
     conf_threshold: Optional[float] = 0.25
     imgsz: Optional[int] = None
     class_map: Optional[dict[str, str]] = None
+    tiling: Optional[TilingOptions] = None
 
 
 class AutoAnnotateResponse(BaseModel):
@@ -23,3 +32,20 @@ class UploadModelResponse(BaseModel):
     name: str
     classes: list[str]
     message: str
+
+
+class ExportModelRequest(BaseModel):
+    formats: list[Literal["onnx", "openvino", "torchscript"]] = ["onnx"]
+
+
+class ModelBackendInfo(BaseModel):
+    name: str
+    path: Optional[str] = None
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ModelBackendsResponse(BaseModel):
+    name: str
+    selected: str
+    backends: list[ModelBackendInfo]
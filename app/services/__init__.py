@@ -1,10 +1,23 @@
-from .image_service import load_image_from_url, extract_polygons_from_masks
+from .image_service import (
+    ImageFetcher,
+    load_image_from_url,
+    extract_polygons_from_masks,
+)
+from .inference_executor import InferenceExecutor
+from .model_manager import ModelManager
 from .yolo_service import YoloService
 from .sam3_service import Sam3Service
+from .sam3_session import Sam3SessionManager
+from .job_service import JobService
 
 __all__ = [
+    "ImageFetcher",
     "load_image_from_url",
     "extract_polygons_from_masks",
+    "InferenceExecutor",
+    "ModelManager",
     "YoloService",
     "Sam3Service",
+    "Sam3SessionManager",
+    "JobService",
 ]
@@ -0,0 +1,130 @@
+import asyncio
+import contextvars
+from collections import deque
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.config import INFERENCE_RETRY_AFTER
+from app.services.inference_executor import InferenceExecutor
+
+
+class MicroBatcher:
+    """Collects items submitted by concurrent requests and runs them as one batch.
+
+    A batch is dispatched once ``max_batch_size`` items are waiting or
+    ``max_latency`` seconds have passed since the first of them arrived.
+    ``run_batch`` receives the list of items on the lane executor and must
+    return one result per item, in order.
+    """
+
+    def __init__(
+        self,
+        lane: str,
+        run_batch: Callable[[list], list],
+        max_batch_size: int,
+        max_latency: float,
+        max_queue: int,
+        idle_timeout: float,
+        on_idle: Optional[Callable[["MicroBatcher"], None]] = None,
+    ):
+        self.lane = lane
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max_latency
+        self.max_queue = max_queue
+        self.idle_timeout = idle_timeout
+        self.on_idle = on_idle
+        self.batches = 0
+        self.batched_items = 0
+        self._items: deque[tuple[Any, asyncio.Future]] = deque()
+        self._has_items: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _ensure_worker(self) -> None:
+        if self._has_items is None:
+            self._has_items = asyncio.Event()
+        if self._worker is None or self._worker.done():
+            # A fresh context: the worker outlives the request that started it and serves every endpoint.
+            self._worker = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def submit_many(self, items: list) -> list:
+        if len(items) > self.max_queue:
+            # Could never fit, so retrying would loop forever: feed it in queue-sized chunks instead.
+            results = []
+            for start in range(0, len(items), self.max_queue):
+                results += await self.submit_many(items[start:start + self.max_queue])
+            return results
+        if len(self._items) + len(items) > self.max_queue:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Batch queue for {self.lane} is full, retry later",
+                headers={"Retry-After": str(INFERENCE_RETRY_AFTER)},
+            )
+        self._ensure_worker()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for item in items:
+            future = loop.create_future()
+            self._items.append((item, future))
+            futures.append(future)
+        self._has_items.set()
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.wait_for(self._has_items.wait(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                if not self._items:
+                    if self.on_idle is not None:
+                        self.on_idle(self)
+                    return
+                continue
+
+            deadline = loop.time() + self.max_latency
+            while len(self._items) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._has_items.clear()
+                try:
+                    await asyncio.wait_for(self._has_items.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = []
+            while self._items and len(batch) < self.max_batch_size:
+                item, future = self._items.popleft()
+                if not future.done():
+                    batch.append((item, future))
+            if self._items:
+                self._has_items.set()
+            else:
+                self._has_items.clear()
+            if batch:
+                await self._dispatch(batch)
+
+    async def _dispatch(self, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.batched_items += len(batch)
+        try:
+            # Each submitting request was admitted to the lane when it started; max_queue bounds the rest.
+            items = [item for item, _ in batch]
+            results = await InferenceExecutor.run(self.lane, self.run_batch, items, admitted=True)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self._items),
+            "batches": self.batches,
+            "avg_batch_size": (self.batched_items / self.batches) if self.batches else 0.0,
+        }
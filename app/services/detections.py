@@ -0,0 +1,49 @@
+from typing import Optional
+
+import numpy as np
+
+
+class DetectionBoxes:
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    def __len__(self) -> int:
+        return len(self.xyxy)
+
+
+class DetectionFailure:
+    """Per-image failure inside a batch; plain data so it can leave a worker process."""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+
+
+class DetectionResult:
+    """Plain-NumPy stand-in for an ultralytics ``Results`` with only boxes and timings.
+
+    Cheap to pickle, so it is what crosses process boundaries and tile merges.
+    """
+
+    def __init__(self, boxes: DetectionBoxes, speed: Optional[dict] = None):
+        self.boxes = boxes
+        self.speed = speed or {}
+
+    @classmethod
+    def empty(cls) -> "DetectionResult":
+        return cls(DetectionBoxes(
+            np.zeros((0, 4), dtype=np.float32),
+            np.zeros(0, dtype=np.float32),
+            np.zeros(0, dtype=np.float32),
+        ))
+
+    @classmethod
+    def from_results(cls, res) -> Optional["DetectionResult"]:
+        if res is None:
+            return None
+        boxes = res.boxes
+        return cls(
+            DetectionBoxes(boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(), boxes.cls.cpu().numpy()),
+            dict(getattr(res, "speed", None) or {}),
+        )
@@ -1,43 +1,201 @@
-from io import BytesIO
+import asyncio
+import hashlib
+import io
+from dataclasses import dataclass
+from typing import Hashable, Optional, Union
+from urllib.parse import urlsplit
 
 import cv2
+import httpx
 import numpy as np
-import requests
 from fastapi import HTTPException
+from PIL import Image
 
+from app.config import (
+    IMAGE_FETCH_TIMEOUT,
+    IMAGE_FETCH_MAX_CONNECTIONS,
+    IMAGE_FETCH_MAX_KEEPALIVE,
+    IMAGE_FETCH_MAX_PER_HOST,
+    IMAGE_CACHE_MAX_BYTES,
+    IMAGE_DECODE_REDUCE,
+)
+from app.services.cache import LRUCache
+from app.services.mask_encoding import largest_contours, masks_to_numpy, postprocess_polygons
+from app.services.metrics import timed
 
-def load_image_from_url(url: str) -> np.ndarray:
+
+class ImageFetcher:
+    _client: Optional[httpx.AsyncClient] = None
+    _host_limits: dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(
+                timeout=IMAGE_FETCH_TIMEOUT,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=IMAGE_FETCH_MAX_CONNECTIONS,
+                    max_keepalive_connections=IMAGE_FETCH_MAX_KEEPALIVE,
+                ),
+            )
+        return cls._client
+
+    @classmethod
+    def _host_limit(cls, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in cls._host_limits:
+            cls._host_limits[host] = asyncio.Semaphore(IMAGE_FETCH_MAX_PER_HOST)
+        return cls._host_limits[host]
+
+    @classmethod
+    async def fetch(cls, url: str, headers: Optional[dict[str, str]] = None) -> httpx.Response:
+        async with cls._host_limit(url):
+            response = await cls.get_client().get(url, headers=headers)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._client is not None:
+            await cls._client.aclose()
+        cls._client = None
+        cls._host_limits.clear()
+
+
+@dataclass(frozen=True)
+class CachedImage:
+    image: np.ndarray
+    etag: Optional[str]
+    last_modified: Optional[str]
+    scale: float = 1.0
+
+
+image_cache = LRUCache(IMAGE_CACHE_MAX_BYTES)
+
+
+REDUCED_DECODE_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+
+
+def _jpeg_longest_side(data: bytes) -> Optional[int]:
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        with Image.open(io.BytesIO(data)) as header:
+            return max(header.size) if header.format == "JPEG" else None
+    except Exception:
+        return None
+
+
+def reduction_factor(longest: Optional[int], target_size: Optional[int]) -> int:
+    """Largest JPEG DCT scaling factor that keeps the longest side at or above ``target_size``."""
+    if not longest or not target_size:
+        return 1
+    for factor in REDUCED_DECODE_FLAGS:
+        if longest // factor >= target_size:
+            return factor
+    return 1
+
+
+def decode_image(data: bytes, factor: int = 1) -> np.ndarray:
+    # Kept in OpenCV's BGR order, which is what the ultralytics predictors expect for arrays.
+    file_bytes = np.frombuffer(data, dtype=np.uint8)
+    img = cv2.imdecode(file_bytes, REDUCED_DECODE_FLAGS.get(factor, cv2.IMREAD_COLOR))
+
+    if img is None:
+        raise ValueError("Failed to decode image")
+
+    return img
+
+
+def decode_scaled_image(data: bytes, target_size: Optional[int]) -> tuple[np.ndarray, float]:
+    """Decode at reduced resolution when the model input is much smaller than the image.
 
-        image_bytes = BytesIO(response.content)
-        file_bytes = np.asarray(bytearray(image_bytes.read()), dtype=np.uint8)
-        img = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+    Returns the image and the factor mapping its pixel coordinates back to the original.
+    """
+    longest = _jpeg_longest_side(data) if target_size and IMAGE_DECODE_REDUCE else None
+    factor = reduction_factor(longest, target_size)
+    img = decode_image(data, factor)
+    if factor == 1:
+        return img, 1.0
+    return img, longest / max(img.shape[:2])
 
-        if img is None:
-            raise ValueError("Failed to decode image")
 
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+def image_digest(img: np.ndarray) -> str:
+    return hashlib.blake2b(np.ascontiguousarray(img).data, digest_size=16).hexdigest()
 
-        return img
+
+def _validators(cached: Optional[CachedImage]) -> dict[str, str]:
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+
+async def fetch_image_bytes(url: str) -> bytes:
+    try:
+        with timed("fetch"):
+            response = await ImageFetcher.fetch(url)
+        return response.content
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"Failed to load image from URL: {exc}") from exc
+
+
+@dataclass(frozen=True)
+class FetchedImage:
+    key: Hashable
+    content: bytes
+    target_size: Optional[int]
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+async def fetch_image(url: str, target_size: Optional[int] = None) -> Union[CachedImage, FetchedImage]:
+    """Download an image, or revalidate its cached decode and return that instead."""
+    key = url if target_size is None else (url, target_size)
+    try:
+        cached = image_cache.peek(key)
+        with timed("fetch"):
+            response = await ImageFetcher.fetch(url, headers=_validators(cached))
+        if response.status_code == 304 and cached is not None:
+            image_cache.get(key)
+            return cached
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"Failed to load image from URL: {exc}") from exc
+
+    image_cache.record_miss()
+    return FetchedImage(
+        key, response.content, target_size, response.headers.get("etag"), response.headers.get("last-modified")
+    )
+
+
+async def decode_fetched_image(fetched: Union[CachedImage, FetchedImage]) -> CachedImage:
+    if isinstance(fetched, CachedImage):
+        return fetched
+    try:
+        with timed("decode"):
+            img, scale = await asyncio.to_thread(decode_scaled_image, fetched.content, fetched.target_size)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"Failed to load image from URL: {exc}") from exc
+    img.setflags(write=False)
+
+    entry = CachedImage(img, fetched.etag, fetched.last_modified, scale)
+    if entry.etag or entry.last_modified:
+        image_cache.put(fetched.key, entry, img.nbytes)
+    else:
+        image_cache.pop(fetched.key)
+    return entry
+
+
+async def load_image_from_url(url: str) -> np.ndarray:
+    return (await decode_fetched_image(await fetch_image(url))).image
 
 
-def extract_polygons_from_masks(masks_data) -> list[list[list[float]]]:
-    polygons = []
-    for mask_data in masks_data:
-        mask_np = mask_data.cpu().numpy()
-        contours, _ = cv2.findContours(
-            mask_np.astype(np.uint8),
-            cv2.RETR_EXTERNAL,
-            cv2.CHAIN_APPROX_TC89_L1
-        )
-        if contours:
-            largest_contour = max(contours, key=cv2.contourArea)
-            polygon = largest_contour.reshape(-1, 2).tolist()
-            polygons.append(polygon)
-        else:
-            polygons.append([])
-    return polygons
+def extract_polygons_from_masks(masks_data, options=None) -> list[list[list[float]]]:
+    return postprocess_polygons(largest_contours(masks_to_numpy(masks_data)), options)
@@ -0,0 +1,222 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.config import (
+    INFERENCE_LANE_WORKERS,
+    INFERENCE_MAX_PENDING,
+    INFERENCE_RETRY_AFTER,
+    INFERENCE_PROCESSES,
+    WORKER_TORCH_THREADS,
+    WORKER_CPU_PINNING,
+)
+from app.services.metrics import observe_stage
+from app.services.worker_pool import WorkerPool
+
+
+class InferenceLane:
+    def __init__(self, key: str, workers: int, max_pending: int):
+        self.key = key
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"infer-{key}")
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+        self._lock = threading.Lock()
+
+    def _started(self, wait: float) -> None:
+        with self._lock:
+            self.running += 1
+            self.total_wait += wait
+            self.last_wait = wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def _finished(self, ok: bool) -> None:
+        with self._lock:
+            self.running -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self.completed + self.failed + self.running
+            return {
+                "pending": self.pending,
+                "running": self.running,
+                "queued": max(self.pending - self.running, 0),
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": (self.total_wait / started * 1000) if started else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "last_wait_ms": self.last_wait * 1000,
+            }
+
+
+class Reservation:
+    """One pending slot held on a lane by a multi-call request.
+
+    Released at most once: by ``release``, or on garbage collection if the
+    request is dropped before its stream is ever iterated.
+    """
+
+    def __init__(self, lane: InferenceLane):
+        self.lane = lane
+        self._held = True
+
+    def release(self) -> None:
+        if self._held:
+            self._held = False
+            self.lane.pending -= 1
+
+    def __del__(self) -> None:
+        self.release()
+
+
+class InferenceExecutor:
+    _lanes: dict[str, InferenceLane] = {}
+    _pool: Optional[WorkerPool] = None
+
+    @classmethod
+    async def start(cls, processes: int = INFERENCE_PROCESSES) -> None:
+        if processes <= 0 or cls._pool is not None:
+            return
+        cls._pool = WorkerPool(processes, WORKER_TORCH_THREADS, WORKER_CPU_PINNING)
+        await asyncio.to_thread(cls._pool.start)
+
+    @classmethod
+    def get_lane(cls, key: str) -> InferenceLane:
+        lane = cls._lanes.get(key)
+        if lane is None:
+            lane = InferenceLane(key, INFERENCE_LANE_WORKERS, INFERENCE_MAX_PENDING)
+            cls._lanes[key] = lane
+        return lane
+
+    @classmethod
+    def drop_lanes(cls, *keys: str) -> None:
+        """Forget lanes of a removed model; work already queued on them still finishes."""
+        for key in keys:
+            lane = cls._lanes.pop(key, None)
+            if lane is not None:
+                lane.executor.shutdown(wait=False)
+
+    @classmethod
+    def _admit(cls, key: str) -> InferenceLane:
+        lane = cls.get_lane(key)
+        if lane.pending >= lane.max_pending:
+            lane.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"Inference queue for {key} is full, retry later",
+                headers={"Retry-After": str(INFERENCE_RETRY_AFTER)},
+            )
+        return lane
+
+    @classmethod
+    def reserve(cls, key: str) -> Reservation:
+        """Admit a multi-call request once, before it starts streaming.
+
+        The request holds one pending slot until ``release``, and its calls pass
+        ``admitted=True``, so none of them can hit a 503 halfway through.
+        """
+        lane = cls._admit(key)
+        lane.pending += 1
+        return Reservation(lane)
+
+    @classmethod
+    def release(cls, reservation: Reservation) -> None:
+        reservation.release()
+
+    @classmethod
+    async def _run_in_worker(cls, lane: InferenceLane, future) -> Any:
+        lane.pending += 1
+        lane._started(0.0)
+        ok = False
+        try:
+            try:
+                status, value, observations = await asyncio.wrap_future(future)
+            except BrokenProcessPool as exc:
+                # Only the calls on the dead worker fail; the pool replaces it for the next ones.
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Inference worker for {lane.key} crashed, retry later",
+                    headers={"Retry-After": str(INFERENCE_RETRY_AFTER)},
+                ) from exc
+            for stage, seconds, model in observations:
+                observe_stage(stage, seconds, model)
+            if status == "http_error":
+                status_code, detail, headers = value
+                raise HTTPException(status_code=status_code, detail=detail, headers=headers)
+            ok = True
+            return value
+        finally:
+            lane._finished(ok)
+            lane.pending -= 1
+
+    @classmethod
+    async def run(cls, key: str, fn: Callable[..., Any], *args: Any, admitted: bool = False) -> Any:
+        lane = cls.get_lane(key) if admitted else cls._admit(key)
+        if cls._pool is not None:
+            return await cls._run_in_worker(lane, cls._pool.submit(fn, args))
+
+        enqueued_at = time.perf_counter()
+
+        def job():
+            lane._started(time.perf_counter() - enqueued_at)
+            ok = False
+            try:
+                result = fn(*args)
+                ok = True
+                return result
+            finally:
+                lane._finished(ok)
+
+        ctx = contextvars.copy_context()
+        lane.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(lane.executor, ctx.run, job)
+        finally:
+            lane.pending -= 1
+
+    @classmethod
+    async def broadcast(cls, key: str, fn: Callable[..., Any], *args: Any, admitted: bool = False) -> list:
+        """Run ``fn`` once in every worker process (or once in-process without a pool)."""
+        if cls._pool is None:
+            return [await cls.run(key, fn, *args, admitted=admitted)]
+        lane = cls.get_lane(key)
+        return await asyncio.gather(*(cls._run_in_worker(lane, f) for f in cls._pool.broadcast(fn, args)))
+
+    @classmethod
+    def stats(cls) -> dict[str, dict]:
+        return {key: lane.stats() for key, lane in cls._lanes.items()}
+
+    @classmethod
+    def uses_processes(cls) -> bool:
+        return cls._pool is not None
+
+    @classmethod
+    def pool_stats(cls) -> Optional[dict]:
+        return cls._pool.stats() if cls._pool is not None else None
+
+    @classmethod
+    def shutdown(cls) -> None:
+        if cls._pool is not None:
+            cls._pool.shutdown()
+            cls._pool = None
+        for lane in cls._lanes.values():
+            lane.executor.shutdown(wait=False, cancel_futures=True)
+        cls._lanes.clear()
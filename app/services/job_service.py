@@ -0,0 +1,284 @@
+import asyncio
+import json
+import logging
+import shutil
+import uuid
+from contextlib import aclosing
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.config import JOBS_DIR, JOB_WORKERS, JOB_CHUNK_SIZE, JOB_RESULTS_PAGE_MAX, INFERENCE_RETRY_AFTER
+from app.schemas.jobs import JobInfo, JobResultItem, JobResultsPage
+from app.schemas.sam3 import Sam3ConceptBatchRequest
+from app.schemas.yolo import AutoAnnotateRequest
+from app.services.sam3_service import Sam3Service
+from app.services.yolo_service import YoloService
+
+logger = logging.getLogger(__name__)
+
+JOB_PAYLOADS = {
+    "yolo-annotate": AutoAnnotateRequest,
+    "sam3-concept-batch": Sam3ConceptBatchRequest,
+}
+
+
+class Job:
+    def __init__(self, job_id: str, kind: str, model_name: str, payload: BaseModel, directory: Path):
+        self.id = job_id
+        self.kind = kind
+        self.model_name = model_name
+        self.payload = payload
+        self.directory = directory
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.updated_at = self.created_at
+        self.failed = 0
+        self.offsets: dict[int, int] = {}
+
+    @property
+    def total(self) -> int:
+        return len(self.payload.image_urls)
+
+    @property
+    def results_path(self) -> Path:
+        return self.directory / "results.ndjson"
+
+    def remaining(self) -> list[int]:
+        return [idx for idx in range(self.total) if idx not in self.offsets]
+
+    def info(self) -> JobInfo:
+        return JobInfo(
+            id=self.id,
+            kind=self.kind,
+            model_name=self.model_name,
+            status=self.status,
+            total=self.total,
+            completed=len(self.offsets),
+            failed=self.failed,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            error=self.error,
+        )
+
+    def save(self) -> None:
+        self.updated_at = datetime.now().isoformat()
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "model_name": self.model_name,
+            "payload": self.payload.model_dump(),
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+        tmp_path = self.directory / "job.json.tmp"
+        with tmp_path.open("w") as f:
+            json.dump(data, f)
+        tmp_path.replace(self.directory / "job.json")
+
+    def append_result(self, idx: int, line: dict) -> None:
+        with self.results_path.open("ab") as f:
+            self.offsets[idx] = f.tell()
+            f.write((json.dumps(line) + "\n").encode("utf-8"))
+        if "error" in line:
+            self.failed += 1
+
+    def load_results(self) -> None:
+        if not self.results_path.exists():
+            return
+        good_size = 0
+        with self.results_path.open("rb") as f:
+            while True:
+                offset = f.tell()
+                raw = f.readline()
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    line = json.loads(raw)
+                except ValueError:
+                    break
+                self.offsets[line["index"]] = offset
+                if "error" in line:
+                    self.failed += 1
+                good_size = f.tell()
+        with self.results_path.open("r+b") as f:
+            f.truncate(good_size)
+
+    def read_result(self, idx: int) -> Optional[dict]:
+        offset = self.offsets.get(idx)
+        if offset is None:
+            return None
+        with self.results_path.open("rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    @classmethod
+    def load(cls, directory: Path) -> "Job":
+        with (directory / "job.json").open() as f:
+            data = json.load(f)
+        payload = JOB_PAYLOADS[data["kind"]].model_validate(data["payload"])
+        job = cls(data["id"], data["kind"], data["model_name"], payload, directory)
+        job.status = data["status"]
+        job.error = data.get("error")
+        job.created_at = data["created_at"]
+        job.updated_at = data["updated_at"]
+        job.load_results()
+        return job
+
+
+class JobService:
+    _jobs: dict[str, Job] = {}
+    _queue: Optional[asyncio.Queue] = None
+    _workers: list[asyncio.Task] = []
+
+    @classmethod
+    async def start(cls) -> None:
+        cls._queue = asyncio.Queue()
+        for directory in sorted(JOBS_DIR.iterdir()):
+            if not (directory / "job.json").exists():
+                continue
+            try:
+                job = Job.load(directory)
+            except Exception as exc:
+                logger.warning("Skipping unreadable job %s: %s", directory.name, exc)
+                continue
+            cls._jobs[job.id] = job
+            if job.status in ("queued", "running"):
+                job.status = "queued"
+                cls._queue.put_nowait(job.id)
+        cls._workers = [asyncio.create_task(cls._worker()) for _ in range(max(1, JOB_WORKERS))]
+
+    @classmethod
+    async def stop(cls) -> None:
+        for worker in cls._workers:
+            worker.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
+        cls._workers = []
+
+    @classmethod
+    def submit(cls, kind: str, model_name: str, payload: BaseModel) -> JobInfo:
+        if not payload.image_urls:
+            raise HTTPException(status_code=400, detail="image_urls list cannot be empty")
+        if cls._queue is None:
+            raise HTTPException(status_code=503, detail="Job workers are not running")
+
+        job_id = uuid.uuid4().hex
+        directory = JOBS_DIR / job_id
+        directory.mkdir()
+        job = Job(job_id, kind, model_name, payload, directory)
+        job.save()
+        cls._jobs[job_id] = job
+        cls._queue.put_nowait(job_id)
+        return job.info()
+
+    @classmethod
+    def _get(cls, job_id: str) -> Job:
+        job = cls._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+
+    @classmethod
+    def get(cls, job_id: str) -> JobInfo:
+        return cls._get(job_id).info()
+
+    @classmethod
+    def list(cls) -> list[JobInfo]:
+        return [job.info() for job in cls._jobs.values()]
+
+    @classmethod
+    def results(cls, job_id: str, offset: int, limit: int) -> JobResultsPage:
+        job = cls._get(job_id)
+        offset = max(0, offset)
+        limit = max(1, min(limit, JOB_RESULTS_PAGE_MAX))
+        items = []
+        for idx in range(offset, min(offset + limit, job.total)):
+            line = job.read_result(idx)
+            if line is not None:
+                items.append(JobResultItem.model_construct(**line))
+        return JobResultsPage(job_id=job.id, offset=offset, limit=limit, total=job.total, items=items)
+
+    @classmethod
+    def delete(cls, job_id: str) -> None:
+        job = cls._get(job_id)
+        job.status = "cancelled"
+        cls._jobs.pop(job_id, None)
+        shutil.rmtree(job.directory, ignore_errors=True)
+
+    @classmethod
+    def stats(cls) -> dict:
+        counts: dict[str, int] = {}
+        for job in cls._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": len(cls._workers), "queued": cls._queue.qsize() if cls._queue else 0, "jobs": counts}
+
+    @classmethod
+    async def _worker(cls) -> None:
+        while True:
+            job_id = await cls._queue.get()
+            job = cls._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            try:
+                await cls._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if job.status == "cancelled":
+                    continue
+                logger.warning("Job %s failed: %s", job.id, exc)
+                job.status = "failed"
+                job.error = exc.detail if isinstance(exc, HTTPException) else str(exc)
+                job.save()
+
+    @classmethod
+    async def _stream(cls, job: Job, indices: List[int]):
+        chunk = job.payload.model_copy(update={"image_urls": [job.payload.image_urls[i] for i in indices]})
+        if job.kind == "yolo-annotate":
+            return await YoloService.stream_inference(job.model_name, chunk, return_exceptions=True)
+        return await Sam3Service.stream_concept_batch(job.model_name, chunk, return_exceptions=True)
+
+    @classmethod
+    async def _run(cls, job: Job) -> None:
+        job.status = "running"
+        job.save()
+        remaining = job.remaining()
+        while remaining:
+            if job.status == "cancelled":
+                return
+            indices, remaining = remaining[:JOB_CHUNK_SIZE], remaining[JOB_CHUNK_SIZE:]
+            retry = []
+            try:
+                # Closing the stream on every exit, cancellation included, frees its lane slot at once.
+                async with aclosing(await cls._stream(job, indices)) as stream:
+                    async for sub_idx, value in stream:
+                        if job.status == "cancelled":
+                            return
+                        idx = indices[sub_idx]
+                        if isinstance(value, HTTPException):
+                            if value.status_code == 503:
+                                retry.append(idx)
+                                continue
+                            line = {"index": idx, "error": value.detail, "status_code": value.status_code}
+                            job.append_result(idx, line)
+                        elif isinstance(value, BaseModel):
+                            job.append_result(idx, {"index": idx, "result": value.model_dump()})
+                        else:
+                            job.append_result(idx, {"index": idx, "result": value})
+            except HTTPException as exc:
+                if exc.status_code != 503:
+                    raise
+                retry = [idx for idx in indices if idx not in job.offsets]
+            if retry:
+                remaining = retry + remaining
+                await asyncio.sleep(INFERENCE_RETRY_AFTER)
+
+        if job.status != "cancelled":
+            job.status = "completed"
+            job.save()
@@ -0,0 +1,140 @@
+import base64
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from app.schemas.sam3 import MaskRLE
+
+
+def masks_to_numpy(masks_data, keep: Optional[list[int]] = None) -> np.ndarray:
+    if hasattr(masks_data, "cpu"):
+        masks_data = masks_data.cpu().numpy()
+    masks = np.asarray(masks_data)
+    if keep is not None:
+        masks = masks[keep]
+    return masks > 0.5
+
+
+def encode_rle(masks: np.ndarray) -> list[MaskRLE]:
+    """COCO-style uncompressed RLE (column-major, starting with a zero run) for a (N, H, W) batch."""
+    n, h, w = masks.shape
+    if n == 0:
+        return []
+    flat = masks.transpose(0, 2, 1).reshape(n, h * w)
+    padded = np.zeros((n, h * w + 1), dtype=bool)
+    padded[:, 1:] = flat
+    rows, cols = np.nonzero(padded[:, 1:] != padded[:, :-1])
+    splits = np.searchsorted(rows, np.arange(1, n))
+
+    rles = []
+    for changes in np.split(cols, splits):
+        bounds = np.concatenate(([0], changes, [h * w]))
+        rles.append(MaskRLE.model_construct(size=[h, w], counts=np.diff(bounds).tolist()))
+    return rles
+
+
+def encode_bitmaps(masks: np.ndarray) -> list[str]:
+    n = masks.shape[0]
+    packed = np.packbits(masks.reshape(n, -1), axis=1)
+    return [base64.b64encode(row.tobytes()).decode("ascii") for row in packed]
+
+
+def encode_pngs(masks: np.ndarray) -> list[str]:
+    images = []
+    for mask in masks:
+        _, png_data = cv2.imencode(".png", mask.astype(np.uint8) * 255)
+        images.append(base64.b64encode(png_data).decode("utf-8"))
+    return images
+
+
+def largest_contours(masks: np.ndarray, scale: tuple[float, float] = (1.0, 1.0)) -> list[np.ndarray]:
+    polygons = []
+    for mask in masks.astype(np.uint8):
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_TC89_L1)
+        if contours:
+            polygon = max(contours, key=cv2.contourArea).reshape(-1, 2).astype(np.float32)
+            polygons.append(polygon * np.array(scale, dtype=np.float32))
+        else:
+            polygons.append(np.zeros((0, 2), dtype=np.float32))
+    return polygons
+
+
+def _limit_points(polygon: np.ndarray, tolerance: float, max_points: Optional[int]) -> np.ndarray:
+    if tolerance > 0 and len(polygon) > 2:
+        polygon = cv2.approxPolyDP(polygon.reshape(-1, 1, 2), tolerance, True).reshape(-1, 2)
+    if max_points is None or len(polygon) <= max_points:
+        return polygon
+
+    # Widen the Douglas-Peucker tolerance until the vertex budget is met, then fall back to even sampling.
+    epsilon = max(tolerance, 0.5)
+    for _ in range(8):
+        epsilon *= 2
+        reduced = cv2.approxPolyDP(polygon.reshape(-1, 1, 2), epsilon, True).reshape(-1, 2)
+        if len(reduced) <= max_points:
+            return reduced
+    idx = np.linspace(0, len(polygon), max_points, endpoint=False).astype(np.int64)
+    return polygon[idx]
+
+
+def postprocess_polygons(polygons: list[np.ndarray], options=None) -> list[list[list[float]]]:
+    """Simplify, cap and round polygons; without ``options`` they are returned unchanged."""
+    if not polygons:
+        return []
+    if options is None:
+        return [np.asarray(p).tolist() for p in polygons]
+
+    tolerance = options.tolerance or 0.0
+    if tolerance > 0 or options.max_points is not None:
+        polygons = [
+            _limit_points(np.asarray(p, dtype=np.float32), tolerance, options.max_points)
+            for p in polygons
+        ]
+
+    lengths = [len(p) for p in polygons]
+    if not sum(lengths):
+        return [[] for _ in polygons]
+    coords = np.concatenate([np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in polygons])
+    if options.precision is not None:
+        coords = np.round(coords, options.precision)
+    return [chunk.tolist() for chunk in np.split(coords, np.cumsum(lengths)[:-1])]
+
+
+def encode_masks(
+    masks,
+    mask_format: Optional[str],
+    keep: Optional[list[int]] = None,
+    polygon_options=None,
+) -> dict:
+    """Encode an ultralytics ``Masks`` object in the requested format.
+
+    ``mask_format=None`` keeps the original response shape (polygons and PNGs).
+    Only the requested encodings are computed; ``keep`` selects a subset of masks.
+    """
+    fields = {"masks": [], "mask_images": [], "mask_rles": [], "mask_bitmaps": [], "mask_size": None}
+    if masks is None or mask_format == "none":
+        return fields
+
+    if mask_format in (None, "polygon"):
+        if polygon_options is not None and polygon_options.largest_component_only:
+            data = masks_to_numpy(masks.data, keep)
+            h, w = data.shape[1:]
+            orig_h, orig_w = masks.orig_shape[:2]
+            polygons = largest_contours(data, (orig_w / w, orig_h / h))
+        else:
+            polygons = masks.xy
+            if keep is not None:
+                polygons = [polygons[i] for i in keep]
+        fields["masks"] = postprocess_polygons(polygons, polygon_options)
+    if mask_format == "polygon":
+        return fields
+
+    data = masks_to_numpy(masks.data, keep)
+    if mask_format in (None, "png"):
+        fields["mask_images"] = encode_pngs(data)
+    elif mask_format == "rle":
+        fields["mask_rles"] = encode_rle(data)
+    elif mask_format == "bitmap":
+        fields["mask_bitmaps"] = encode_bitmaps(data)
+        fields["mask_size"] = list(data.shape[1:])
+    return fields
@@ -0,0 +1,137 @@
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+from fastapi.requests import HTTPConnection
+
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+endpoint_label: ContextVar[str] = ContextVar("endpoint_label", default="")
+_stage_collector: ContextVar[Optional[list]] = ContextVar("stage_collector", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Thread-safe cumulative histogram rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in sorted(snapshot):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "annotator_stage_seconds",
+    "Time spent per request stage.",
+    ("stage", "model", "endpoint"),
+)
+
+
+def observe_stage(stage: str, seconds: float, model: str = "", endpoint: Optional[str] = None) -> None:
+    collector = _stage_collector.get()
+    if collector is not None:
+        collector.append((stage, seconds, model))
+        return
+    STAGE_SECONDS.observe(seconds, stage=stage, model=model, endpoint=endpoint_label.get() if endpoint is None else endpoint)
+
+
+@contextmanager
+def timed(stage: str, model: str = "", endpoint: Optional[str] = None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start, model, endpoint)
+
+
+@contextmanager
+def collect_stages():
+    """Buffer stage observations instead of recording them, e.g. in a worker process."""
+    observations: list[tuple[str, float, str]] = []
+    token = _stage_collector.set(observations)
+    try:
+        yield observations
+    finally:
+        _stage_collector.reset(token)
+
+
+async def label_endpoint(connection: HTTPConnection) -> None:
+    route = connection.scope.get("route")
+    endpoint_label.set(getattr(route, "path", connection.url.path))
+
+
+def render_gauge(name: str, documentation: str, samples: Iterable[tuple[dict, float]], kind: str = "gauge") -> list[str]:
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return lines
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident memory of this process, or None where it cannot be read (Windows without psutil)."""
+    try:
+        import psutil
+    except ImportError:
+        pass
+    else:
+        return psutil.Process().memory_info().rss
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
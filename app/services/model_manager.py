@@ -0,0 +1,138 @@
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config import MODEL_CACHE_MAX_BYTES, MODEL_CACHE_POLICY, MODEL_PIN
+
+
+def parse_model_spec(spec: str) -> tuple[str, str]:
+    kind, sep, name = spec.partition(":")
+    if not sep or not name:
+        raise ValueError(f"Invalid model spec '{spec}', expected '<kind>:<name>'")
+    return kind, name
+
+
+def estimate_model_bytes(model: Any, weights_path: Optional[Path] = None) -> int:
+    module = model if hasattr(model, "parameters") else getattr(model, "model", None)
+    if module is not None and hasattr(module, "parameters"):
+        total = sum(p.numel() * p.element_size() for p in module.parameters())
+        total += sum(b.numel() * b.element_size() for b in module.buffers())
+        if total:
+            return total
+    if weights_path is not None and weights_path.exists():
+        return weights_path.stat().st_size
+    return 0
+
+
+class ModelEntry:
+    def __init__(self, key: tuple[str, str], model: Any, nbytes: int, version: Any = None):
+        self.key = key
+        self.model = model
+        self.nbytes = nbytes
+        self.version = version
+        self.loaded_at = time.time()
+        self.last_used = time.monotonic()
+        self.uses = 0
+
+    def touch(self) -> None:
+        self.last_used = time.monotonic()
+        self.uses += 1
+
+
+class ModelManager:
+    max_bytes = MODEL_CACHE_MAX_BYTES
+    policy = MODEL_CACHE_POLICY
+    _entries: dict[tuple[str, str], ModelEntry] = {}
+    _pinned: set[tuple[str, str]] = {parse_model_spec(spec) for spec in MODEL_PIN}
+    _lock = threading.RLock()
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    @classmethod
+    def get(cls, kind: str, name: str, version: Any = None) -> Optional[Any]:
+        with cls._lock:
+            entry = cls._entries.get((kind, name))
+            if entry is not None and entry.version != version:
+                cls._entries.pop((kind, name), None)
+                entry = None
+            if entry is None:
+                cls.misses += 1
+                return None
+            entry.touch()
+            cls.hits += 1
+            return entry.model
+
+    @classmethod
+    def put(
+        cls,
+        kind: str,
+        name: str,
+        model: Any,
+        nbytes: int,
+        version: Any = None,
+        alias: Optional[str] = None,
+    ) -> None:
+        key = (kind, name)
+        with cls._lock:
+            if alias is not None and (kind, alias) in cls._pinned:
+                cls._pinned.add(key)
+            cls._entries.pop(key, None)
+            cls._evict_for(nbytes, exclude=key)
+            entry = ModelEntry(key, model, nbytes, version)
+            entry.touch()
+            cls._entries[key] = entry
+
+    @classmethod
+    def pop(cls, kind: str, name: str) -> None:
+        with cls._lock:
+            cls._entries.pop((kind, name), None)
+
+    @classmethod
+    def used_bytes(cls) -> int:
+        return sum(entry.nbytes for entry in cls._entries.values())
+
+    @classmethod
+    def _victim_order(cls, entry: ModelEntry) -> tuple:
+        if cls.policy == "lfu":
+            return entry.uses, entry.last_used
+        return (entry.last_used,)
+
+    @classmethod
+    def _evict_for(cls, nbytes: int, exclude: tuple[str, str]) -> None:
+        candidates = sorted(
+            (e for k, e in cls._entries.items() if k not in cls._pinned and k != exclude),
+            key=cls._victim_order,
+        )
+        used = cls.used_bytes()
+        for entry in candidates:
+            if used + nbytes <= cls.max_bytes:
+                break
+            cls._entries.pop(entry.key, None)
+            used -= entry.nbytes
+            cls.evictions += 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            lookups = cls.hits + cls.misses
+            return {
+                "policy": cls.policy,
+                "bytes": cls.used_bytes(),
+                "max_bytes": cls.max_bytes,
+                "hits": cls.hits,
+                "misses": cls.misses,
+                "hit_rate": (cls.hits / lookups) if lookups else 0.0,
+                "evictions": cls.evictions,
+                "models": [
+                    {
+                        "kind": kind,
+                        "name": name,
+                        "bytes": entry.nbytes,
+                        "uses": entry.uses,
+                        "pinned": (kind, name) in cls._pinned,
+                    }
+                    for (kind, name), entry in cls._entries.items()
+                ],
+            }
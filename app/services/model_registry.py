@@ -0,0 +1,222 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from app.config import MODEL_REGISTRY_RESCAN_INTERVAL
+
+HASH_CHUNK_SIZE = 1024 * 1024
+TRACKED_FILES = ("metadata.json", "classes.json", "backends.json")
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_stamp(path: Optional[Path]) -> Optional[tuple[int, int]]:
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass
+class ModelRecord:
+    name: str
+    path: Path
+    mtime: float
+    date_add: str
+    weights_path: Optional[Path] = None
+    weights_size: int = 0
+    weights_hash: Optional[str] = None
+    classes: Optional[list[str]] = None
+    metadata: dict = field(default_factory=dict)
+    backends: dict = field(default_factory=dict)
+    stamp: tuple = ()
+    content_addressed: bool = False
+
+    @property
+    def version(self) -> str:
+        """Changes whenever the directory, its weights or its JSON files change, even in place."""
+        return hashlib.blake2b(repr(self.stamp).encode(), digest_size=8).hexdigest()
+
+
+def model_identity(record: ModelRecord) -> tuple[str, Optional[str]]:
+    """Key and version under which a record's loaded model is cached.
+
+    Content-addressed uploads share one instance per weights hash; legacy
+    directories, and uploads whose weights were rewritten after the hash was
+    recorded, are keyed by name and versioned by their file stamps.
+    """
+    if record.content_addressed:
+        return f"sha256:{record.metadata['weights_sha256']}", None
+    return record.name, record.version
+
+
+def model_lane(kind: str, record: ModelRecord) -> str:
+    """Inference lane for a record; names sharing one cached predictor share its lane too."""
+    key, _ = model_identity(record)
+    return f"{kind}:{key}"
+
+
+class ModelRegistry:
+    """In-memory index of a models directory.
+
+    Records are built once and kept current by register/unregister. Changes
+    made outside the service are picked up by a cheap mtime scan that runs
+    at most every MODEL_REGISTRY_RESCAN_INTERVAL seconds.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        weights_glob: str,
+        required_file: str,
+        exclude_suffixes: tuple[str, ...] = (),
+    ):
+        self.root = root
+        self.weights_glob = weights_glob
+        self.required_file = required_file
+        self.exclude_suffixes = exclude_suffixes
+        self.rescan_interval = MODEL_REGISTRY_RESCAN_INTERVAL
+        self._records: dict[str, ModelRecord] = {}
+        self._loaded = False
+        self._last_scan = 0.0
+        self._lock = threading.RLock()
+
+    def _stamp(self, model_dir: Path, weights_path: Optional[Path]) -> tuple:
+        paths = [model_dir, model_dir / self.required_file, *(model_dir / name for name in TRACKED_FILES), weights_path]
+        return tuple(_file_stamp(path) for path in paths)
+
+    def _read_record(self, model_dir: Path) -> Optional[ModelRecord]:
+        try:
+            mtime = model_dir.stat().st_mtime
+            if not (model_dir / self.required_file).exists():
+                return None
+
+            metadata = {}
+            metadata_file = model_dir / "metadata.json"
+            if metadata_file.exists():
+                with metadata_file.open() as f:
+                    metadata = json.load(f)
+
+            classes = None
+            classes_file = model_dir / "classes.json"
+            if classes_file.exists():
+                with classes_file.open() as f:
+                    classes = json.load(f)
+
+            backends = {}
+            backends_file = model_dir / "backends.json"
+            if backends_file.exists():
+                with backends_file.open() as f:
+                    backends = json.load(f)
+
+            weights_path = None
+            if metadata.get("weights_file"):
+                weights_path = model_dir / metadata["weights_file"]
+            else:
+                weights_files = sorted(
+                    p for p in model_dir.glob(self.weights_glob)
+                    if p.is_file() and p.suffix not in self.exclude_suffixes
+                )
+                if weights_files:
+                    weights_path = weights_files[0]
+            if weights_path is not None and not weights_path.is_file():
+                weights_path = None
+
+            # A recorded hash only holds while the weights are untouched since metadata.json was written.
+            weights_hash = metadata.get("weights_sha256")
+            if weights_hash and weights_path is not None:
+                weights_stat = weights_path.stat()
+                if (
+                    weights_stat.st_size != metadata.get("weights_size", weights_stat.st_size)
+                    or weights_stat.st_mtime_ns > metadata_file.stat().st_mtime_ns
+                ):
+                    weights_hash = None
+
+            return ModelRecord(
+                name=model_dir.name,
+                path=model_dir,
+                mtime=mtime,
+                date_add=datetime.fromtimestamp(mtime).isoformat(),
+                weights_path=weights_path,
+                weights_size=weights_path.stat().st_size if weights_path is not None else 0,
+                weights_hash=weights_hash,
+                classes=classes,
+                metadata=metadata,
+                backends=backends,
+                stamp=self._stamp(model_dir, weights_path),
+                content_addressed=weights_hash is not None,
+            )
+        except (OSError, ValueError):
+            return None
+
+    def _scan(self) -> None:
+        seen = set()
+        for model_dir in self.root.iterdir():
+            if not model_dir.is_dir() or model_dir.name.startswith("."):
+                continue
+            seen.add(model_dir.name)
+            record = self._records.get(model_dir.name)
+            if record is not None and record.stamp == self._stamp(model_dir, record.weights_path):
+                continue
+            record = self._read_record(model_dir)
+            if record is None:
+                self._records.pop(model_dir.name, None)
+            else:
+                self._records[model_dir.name] = record
+        for name in set(self._records) - seen:
+            self._records.pop(name, None)
+        self._loaded = True
+        self._last_scan = time.monotonic()
+
+    def _maybe_scan(self) -> None:
+        if not self._loaded or time.monotonic() - self._last_scan >= self.rescan_interval:
+            self._scan()
+
+    def get(self, name: str) -> Optional[ModelRecord]:
+        with self._lock:
+            self._maybe_scan()
+            return self._records.get(name)
+
+    def list(self) -> list[ModelRecord]:
+        with self._lock:
+            self._maybe_scan()
+            return list(self._records.values())
+
+    def register(self, name: str) -> Optional[ModelRecord]:
+        with self._lock:
+            record = self._read_record(self.root / name)
+            if record is None:
+                self._records.pop(name, None)
+            else:
+                self._records[name] = record
+            return record
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._records.pop(name, None)
+
+    def is_shared(self, record: ModelRecord) -> bool:
+        key, _ = model_identity(record)
+        return any(model_identity(other)[0] == key for other in self.list() if other.name != record.name)
+
+    def weights_hash(self, name: str) -> Optional[str]:
+        record = self.get(name)
+        if record is None or record.weights_path is None:
+            return None
+        if record.weights_hash is None:
+            record.weights_hash = file_sha256(record.weights_path)
+        return record.weights_hash
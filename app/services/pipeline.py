@@ -0,0 +1,62 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Sequence
+
+from app.config import PIPELINE_QUEUE_SIZE
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: Callable[[Any], Awaitable[Any]]
+    concurrency: int = 1
+
+
+class Finished:
+    """Stage output that skips the remaining stages, e.g. a result-cache hit."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+async def iterate_pipeline(
+    items: Sequence,
+    stages: Sequence[Stage],
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+) -> AsyncIterator[tuple[int, Any]]:
+    """Push ``items`` through ``stages`` connected by bounded queues.
+
+    Every stage runs its own number of workers, so item N+1 is fetched and
+    decoded while item N is in the model, and a slow stage (or a slow
+    consumer) backs the earlier ones up instead of piling images in memory.
+    Yields ``(index, result)`` in completion order. An exception raised by a
+    stage becomes that item's result and skips the stages after it.
+    """
+    queues = [asyncio.Queue(queue_size) for _ in range(len(stages) + 1)]
+
+    async def feed() -> None:
+        for idx, item in enumerate(items):
+            await queues[0].put((idx, item))
+
+    async def work(stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        while True:
+            idx, value = await inbox.get()
+            if not isinstance(value, (Finished, Exception)):
+                try:
+                    value = await stage.fn(value)
+                except Exception as exc:
+                    value = exc
+            await outbox.put((idx, value))
+
+    tasks = [asyncio.ensure_future(feed())]
+    for stage, inbox, outbox in zip(stages, queues, queues[1:]):
+        tasks += [asyncio.ensure_future(work(stage, inbox, outbox)) for _ in range(max(1, stage.concurrency))]
+    try:
+        for _ in range(len(items)):
+            idx, value = await queues[-1].get()
+            yield idx, value.value if isinstance(value, Finished) else value
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,44 @@
+import logging
+from functools import partial
+
+from app.config import MODEL_PRELOAD, MODEL_WARMUP
+from app.services.inference_executor import InferenceExecutor
+from app.services.model_manager import parse_model_spec
+from app.services.sam3_service import Sam3Service
+from app.services.yolo_service import YoloService
+
+logger = logging.getLogger(__name__)
+
+LOADERS = {
+    "yolo": (YoloService.load_model, YoloService.warm_up, YoloService.lane),
+    "sam3-visual": (
+        Sam3Service.load_visual_model, Sam3Service.warm_up_visual, partial(Sam3Service.lane, "sam3-visual"),
+    ),
+    "sam3-concept": (
+        Sam3Service.load_concept_predictor, Sam3Service.warm_up_concept, partial(Sam3Service.lane, "sam3-concept"),
+    ),
+}
+
+
+def preload_model(kind: str, name: str, warm_up: bool) -> None:
+    load, warm, _ = LOADERS[kind]
+    load(name)
+    if warm_up:
+        warm(name)
+
+
+async def preload_models(specs: list[str] = MODEL_PRELOAD, warm_up: bool = MODEL_WARMUP) -> None:
+    for spec in specs:
+        try:
+            kind, name = parse_model_spec(spec)
+            if kind not in LOADERS:
+                raise KeyError(kind)
+        except (ValueError, KeyError):
+            logger.warning("Skipping invalid preload spec %r (kinds: %s)", spec, ", ".join(LOADERS))
+            continue
+        try:
+            lane = LOADERS[kind][2](name)
+            await InferenceExecutor.broadcast(lane, preload_model, kind, name, warm_up)
+            logger.info("Preloaded %s", spec)
+        except Exception as exc:
+            logger.warning("Failed to preload %s: %s", spec, exc)
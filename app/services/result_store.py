@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.config import RESULT_CACHE_DIR, RESULT_CACHE_MAX_BYTES
+from app.services.image_service import image_digest
+from app.services.model_registry import ModelRegistry
+from app.services.single_flight import flight_key
+
+
+class ResultStore:
+    """SQLite-backed cache of serialized annotation results, bounded by payload bytes.
+
+    Keys combine the model's weights hash, the image content hash and the
+    normalized request parameters, so new weights or a changed image never
+    hit a stale entry. Every entry is also tagged with the model it came
+    from so deleting that model drops its results right away. Once over
+    ``max_bytes`` the least recently read entries are evicted until the
+    store is back under ``low_water`` of it, so a full store does not trim
+    on every put.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, low_water: float = 0.9):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = 0
+        self._bytes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "key TEXT PRIMARY KEY, model TEXT NOT NULL, value BLOB NOT NULL, "
+                    "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+                conn.execute("CREATE INDEX IF NOT EXISTS results_model ON results (model)")
+            self._entries, self._bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            self._conn = conn
+        return self._conn
+
+    def open(self) -> None:
+        """Open the database and load its totals, so ``stats`` is accurate before the first lookup."""
+        if self.enabled:
+            with self._lock:
+                self._db()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with db:
+                db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return bytes(row[0])
+
+    def put(self, key: str, model: str, value: bytes) -> bool:
+        size = len(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            db = self._db()
+            with db:
+                previous = db.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, model, value, size, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, model, sqlite3.Binary(value), size, time.time()),
+                )
+                if previous is None:
+                    self._entries += 1
+                self._bytes += size - (previous[0] if previous else 0)
+                if self._bytes > self.max_bytes:
+                    self._evict(db)
+        return True
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        excess = self._bytes - int(self.max_bytes * self.low_water)
+        doomed, freed = [], 0
+        for key, size in db.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if freed >= excess:
+                break
+            doomed.append((key,))
+            freed += size
+        db.executemany("DELETE FROM results WHERE key = ?", doomed)
+        self._entries -= len(doomed)
+        self._bytes -= freed
+        self.evictions += len(doomed)
+
+    def invalidate(self, model: str) -> int:
+        if not self.enabled:
+            return 0
+        with self._lock:
+            db = self._db()
+            with db:
+                count, size = db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results WHERE model = ?", (model,)
+                ).fetchone()
+                db.execute("DELETE FROM results WHERE model = ?", (model,))
+            self._entries -= count
+            self._bytes -= size
+            return count
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+
+    def stats(self) -> dict:
+        # Served from counters only: /health calls this on the event loop and must not wait on SQLite.
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+result_store = ResultStore(RESULT_CACHE_DIR / "results.sqlite3", RESULT_CACHE_MAX_BYTES)
+
+
+def content_digest(image) -> str:
+    """Content hash of ``image`` (encoded bytes or a decoded array), as used in result keys."""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return hashlib.blake2b(image, digest_size=16).hexdigest()
+    return image_digest(image)
+
+
+def _result_key(registry: ModelRegistry, model_name: str, digest: str, params: tuple) -> Optional[str]:
+    record = registry.get(model_name)
+    model_hash = registry.weights_hash(model_name)
+    if record is None or model_hash is None:
+        return None
+    return flight_key(model_hash, model_name, record.version, digest, *params)
+
+
+async def result_key(registry: ModelRegistry, model_name: str, digest: str, *params) -> Optional[str]:
+    """Result-store key for an image with ``content_digest`` ``digest``, or None when caching is off.
+
+    Runs off the event loop: the first lookup for a legacy model without a
+    recorded weights hash reads the whole weights file.
+    """
+    if not result_store.enabled:
+        return None
+    return await asyncio.to_thread(_result_key, registry, model_name, digest, params)
+
+
+async def load_result(key: Optional[str]) -> Optional[bytes]:
+    if key is None:
+        return None
+    return await asyncio.to_thread(result_store.get, key)
+
+
+async def save_result(key: Optional[str], model: str, value: bytes) -> None:
+    if key is not None:
+        await asyncio.to_thread(result_store.put, key, model, value)
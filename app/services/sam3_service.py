@@ -1,19 +1,28 @@
+import asyncio
 import json
+import logging
 import shutil
-import base64
-from datetime import datetime
-from typing import List
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
 
-import cv2
 import numpy as np
 from fastapi import HTTPException, UploadFile
-from ultralytics import SAM
-from ultralytics.models.sam import SAM3SemanticPredictor
-
-from app.config import SAM3_MODELS_DIR
+from ultralytics.models.sam import SAM3Predictor, SAM3SemanticPredictor
+
+from app.config import (
+    SAM3_MODELS_DIR,
+    SAM3_EMBEDDING_CACHE_MAX_BYTES,
+    SAM3_TEXT_CACHE_MAX_BYTES,
+    CONCEPT_BATCH_INFLIGHT,
+    PIPELINE_FETCH_CONCURRENCY,
+    PIPELINE_DECODE_CONCURRENCY,
+    PIPELINE_ENCODE_CONCURRENCY,
+)
 from app.schemas.sam3 import (
     Sam3ModelInfo,
     UploadSam3ModelResponse,
+    Sam3PromptRequest,
     Sam3AnnotateRequest,
     Sam3AnnotateResponse,
     Sam3ConceptRequest,
@@ -22,61 +31,103 @@ from app.schemas.sam3 import (
     Sam3ConceptBatchResponse,
     Sam3ConceptBatchResultItem,
 )
-from app.services.image_service import load_image_from_url
+from app.services.cache import LRUCache, tensor_nbytes
+from app.services.image_service import decode_fetched_image, fetch_image, image_digest, load_image_from_url
+from app.services.inference_executor import InferenceExecutor
+from app.services.mask_encoding import encode_masks
+from app.services.metrics import timed
+from app.services.model_manager import ModelManager, estimate_model_bytes
+from app.services.model_registry import ModelRecord, ModelRegistry, model_identity, model_lane
+from app.services.pipeline import Finished, Stage, iterate_pipeline
+from app.services.result_store import content_digest, load_result, result_key, result_store, save_result
+from app.services.shared_weights import drop_shared_weights, share_module_weights
+from app.services.single_flight import AsyncSingleFlight, SingleFlight, flight_key
+from app.services.storage import blob_store, create_staging_dir, publish_staging_dir
 
+logger = logging.getLogger(__name__)
 
-def mask_to_base64_png(mask_tensor) -> str:
-    mask = mask_tensor.cpu().numpy().astype(np.uint8)
-    _, png_data = cv2.imencode('.png', mask * 255)
-    return base64.b64encode(png_data).decode('utf-8')
+WARMUP_IMGSZ = 256
 
 
 class Sam3Service:
-    _visual_cache: dict[str, SAM] = {}
-    _concept_cache: dict[str, SAM3SemanticPredictor] = {}
+    registry = ModelRegistry(SAM3_MODELS_DIR, weights_glob="sam3.pt", required_file="metadata.json")
+    _embedding_cache = LRUCache(SAM3_EMBEDDING_CACHE_MAX_BYTES)
+    _text_cache = LRUCache(SAM3_TEXT_CACHE_MAX_BYTES)
+    _text_encodes = SingleFlight()
+    _flights = AsyncSingleFlight()
+    _loads = SingleFlight()
 
     @classmethod
-    def get_visual_model(cls, name: str) -> SAM:
-        if name in cls._visual_cache:
-            model_dir = SAM3_MODELS_DIR / name
-            if not model_dir.exists():
-                cls._visual_cache.pop(name, None)
-                raise HTTPException(status_code=404, detail="SAM3 model not found")
-            return cls._visual_cache[name]
-
-        model_dir = SAM3_MODELS_DIR / name
-        if not model_dir.exists():
+    def require_model(cls, name: str) -> ModelRecord:
+        record = cls.registry.get(name)
+        if record is None:
             raise HTTPException(status_code=404, detail="SAM3 model not found")
+        return record
+
+    @classmethod
+    def lane(cls, kind: str, name: str) -> str:
+        return model_lane(kind, cls.require_model(name))
 
-        weights_path = model_dir / "sam3.pt"
-        if not weights_path.exists():
+    @classmethod
+    def get_visual_model(cls, name: str) -> SAM3Predictor:
+        record = cls.require_model(name)
+
+        key, version = model_identity(record)
+        cached = ModelManager.get("sam3-visual", key, version)
+        if cached is not None:
+            return cached
+
+        weights_path = record.weights_path
+        if weights_path is None:
             raise HTTPException(status_code=404, detail="SAM3 model weights file not found")
 
+        load = partial(cls._load_visual_model, name, key, version, weights_path)
+        return cls._loads.do(("sam3-visual", key, version), load)
+
+    @classmethod
+    def _load_visual_model(cls, name: str, key: str, version, weights_path: Path) -> SAM3Predictor:
         try:
-            model = SAM(str(weights_path))
+            overrides = dict(
+                conf=0.25,
+                task="segment",
+                mode="predict",
+                model=str(weights_path),
+                retina_masks=True,
+                save=False,
+                verbose=False,
+            )
+            with timed("load", name):
+                model = SAM3Predictor(overrides=overrides)
+                model.setup_model(model=None, verbose=False)
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"Failed to load SAM3 model: {exc}") from exc
 
-        cls._visual_cache[name] = model
+        share_module_weights(getattr(model, "model", None), f"sam3-visual-{key}-{version or ''}")
+        ModelManager.put("sam3-visual", key, model, estimate_model_bytes(model, weights_path), version, alias=name)
         return model
 
+    @classmethod
+    def load_visual_model(cls, name: str) -> None:
+        cls.get_visual_model(name)
+
     @classmethod
     def get_concept_predictor(cls, name: str) -> SAM3SemanticPredictor:
-        if name in cls._concept_cache:
-            model_dir = SAM3_MODELS_DIR / name
-            if not model_dir.exists():
-                cls._concept_cache.pop(name, None)
-                raise HTTPException(status_code=404, detail="SAM3 model not found")
-            return cls._concept_cache[name]
+        record = cls.require_model(name)
 
-        model_dir = SAM3_MODELS_DIR / name
-        if not model_dir.exists():
-            raise HTTPException(status_code=404, detail="SAM3 model not found")
+        key, version = model_identity(record)
+        cached = ModelManager.get("sam3-concept", key, version)
+        if cached is not None:
+            return cached
 
-        weights_path = model_dir / "sam3.pt"
-        if not weights_path.exists():
+        weights_path = record.weights_path
+        if weights_path is None:
             raise HTTPException(status_code=404, detail="SAM3 model weights file not found")
 
+        load = partial(cls._load_concept_predictor, name, key, version, weights_path)
+        return cls._loads.do(("sam3-concept", key, version), load)
+
+    @classmethod
+    def _load_concept_predictor(cls, name: str, key: str, version, weights_path: Path) -> SAM3SemanticPredictor:
         try:
             overrides = dict(
                 conf=0.25,
@@ -85,13 +136,52 @@ class Sam3Service:
                 model=str(weights_path),
                 half=True,
             )
-            predictor = SAM3SemanticPredictor(overrides=overrides)
+            with timed("load", name):
+                predictor = SAM3SemanticPredictor(overrides=overrides)
+                predictor.setup_model(model=None, verbose=False)
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"Failed to load SAM3 semantic predictor: {exc}") from exc
 
-        cls._concept_cache[name] = predictor
+        share_module_weights(getattr(predictor, "model", None), f"sam3-concept-{key}-{version or ''}")
+        cls._cache_text_encoder(predictor, key, version)
+        ModelManager.put("sam3-concept", key, predictor, estimate_model_bytes(predictor, weights_path), version, alias=name)
         return predictor
 
+    @classmethod
+    def _cache_text_encoder(cls, predictor: SAM3SemanticPredictor, key: str, version) -> None:
+        """Memoize the predictor's text encoder per prompt list.
+
+        Every call with ``text=`` re-encodes the prompts although only the image
+        changes between calls, so the encoder output is kept in ``_text_cache``
+        and shared by every image and request using the same prompts.
+        """
+        backbone = getattr(predictor.model, "backbone", None)
+        encode = getattr(backbone, "forward_text", None)
+        if encode is None:
+            logger.warning("SAM3 model %s exposes no text encoder; prompt embeddings are not cached", key)
+            return
+
+        def forward_text(captions, *args, **kwargs):
+            # Box prompts or extra text change the output and are not hashable; encode those directly.
+            if any(arg is not None for arg in (*args, *kwargs.values())):
+                return encode(captions, *args, **kwargs)
+            cache_key = (key, version, tuple(captions))
+            cached = cls._text_cache.get(cache_key)
+            if cached is None:
+                cached = cls._text_encodes.do(cache_key, partial(encode_and_store, cache_key, captions, args, kwargs))
+            return dict(cached) if isinstance(cached, dict) else cached
+
+        def encode_and_store(cache_key, captions, args, kwargs):
+            out = encode(captions, *args, **kwargs)
+            cls._text_cache.put(cache_key, out, tensor_nbytes(out))
+            return out
+
+        backbone.forward_text = forward_text
+
+    @classmethod
+    def load_concept_predictor(cls, name: str) -> None:
+        cls.get_concept_predictor(name)
+
     @classmethod
     async def upload_model(
         cls,
@@ -102,16 +192,27 @@ class Sam3Service:
         if model_dir.exists():
             raise HTTPException(status_code=400, detail="SAM3 model with this name already exists")
 
-        model_dir.mkdir(parents=True, exist_ok=True)
-
-        weights_storage_path = model_dir / "sam3.pt"
-        with weights_storage_path.open("wb") as buffer:
-            buffer.write(await weights_file.read())
+        blob = await blob_store.save_upload(weights_file)
+        staging = create_staging_dir(SAM3_MODELS_DIR)
+        try:
+            blob_store.link(blob, staging / "sam3.pt")
+            metadata = {
+                "name": name,
+                "weights_file": "sam3.pt",
+                "weights_sha256": blob.sha256,
+                "weights_size": blob.size,
+            }
+            with (staging / "metadata.json").open("w") as f:
+                json.dump(metadata, f)
+            publish_staging_dir(staging, model_dir, "SAM3 model with this name already exists")
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            blob_store.unpin(blob)
+            blob_store.release(blob.sha256)
+            raise
 
-        metadata = {"name": name}
-        metadata_path = model_dir / "metadata.json"
-        with metadata_path.open("w") as f:
-            json.dump(metadata, f)
+        cls.registry.register(name)
+        result_store.invalidate(f"sam3:{name}")
 
         return UploadSam3ModelResponse(
             name=name,
@@ -120,131 +221,240 @@ class Sam3Service:
 
     @classmethod
     def list_models(cls) -> List[Sam3ModelInfo]:
-        models = []
-        for model_dir in SAM3_MODELS_DIR.iterdir():
-            if model_dir.is_dir():
-                metadata_file = model_dir / "metadata.json"
-                if metadata_file.exists():
-                    models.append(Sam3ModelInfo(
-                        name=model_dir.name,
-                        date_add=datetime.fromtimestamp(model_dir.stat().st_mtime).isoformat()
-                    ))
-        return models
+        return [Sam3ModelInfo(name=record.name, date_add=record.date_add) for record in cls.registry.list()]
+
+    @classmethod
+    def _drop_loaded(cls, model_name: str, record: Optional[ModelRecord]) -> None:
+        if record is not None:
+            key, _ = model_identity(record)
+            ModelManager.pop("sam3-visual", key)
+            ModelManager.pop("sam3-concept", key)
+            drop_shared_weights(f"sam3-visual-{key}-")
+            drop_shared_weights(f"sam3-concept-{key}-")
+            cls._text_cache.pop_matching(lambda cache_key: cache_key[0] == key)
+        cls._embedding_cache.pop_matching(lambda key: key[1] == model_name)
 
     @classmethod
-    def delete_model(cls, model_name: str) -> None:
+    async def delete_model(cls, model_name: str) -> None:
         model_dir = SAM3_MODELS_DIR / model_name
         if not model_dir.exists():
             raise HTTPException(status_code=404, detail="SAM3 model not found")
 
-        cls._visual_cache.pop(model_name, None)
-        cls._concept_cache.pop(model_name, None)
-        shutil.rmtree(model_dir)
+        record = cls.registry.get(model_name)
+        cls.registry.unregister(model_name)
+        unload = record if record is not None and not cls.registry.is_shared(record) else None
+        lanes = [
+            model_lane(kind, record) if record is not None else f"{kind}:{model_name}"
+            for kind in ("sam3-visual", "sam3-concept")
+        ]
+        try:
+            # Models, prompt and embedding caches live in whichever worker processes served the model.
+            await InferenceExecutor.broadcast(lanes[0], cls._drop_loaded, model_name, unload, admitted=True)
+        except Exception as exc:
+            logger.warning("Failed to unload SAM3 model %s from every worker: %s", model_name, exc)
+        await asyncio.to_thread(result_store.invalidate, f"sam3:{model_name}")
+        if record is None or unload is not None:
+            # Other names with the same weights keep using these lanes.
+            InferenceExecutor.drop_lanes(*lanes)
+        await asyncio.to_thread(shutil.rmtree, model_dir)
+        if record is not None:
+            blob_store.release(record.metadata.get("weights_sha256"))
 
     @classmethod
-    def annotate(
+    async def annotate(
         cls,
         model_name: str,
         payload: Sam3AnnotateRequest,
     ) -> Sam3AnnotateResponse:
-        model = cls.get_visual_model(model_name)
-        img = load_image_from_url(payload.image_url)
+        key = flight_key("sam3-annotate", model_name, payload)
+        return await cls._flights.do(key, partial(cls._annotate, model_name, payload))
 
+    @classmethod
+    async def _annotate(cls, model_name: str, payload: Sam3AnnotateRequest) -> Sam3AnnotateResponse:
+        lane = cls.lane("sam3-visual", model_name)
+        await InferenceExecutor.run(lane, cls.load_visual_model, model_name)
+        img = await load_image_from_url(payload.image_url)
+        return await InferenceExecutor.run(lane, cls.annotate_image, model_name, img, payload)
+
+    @classmethod
+    def _set_image(cls, predictor, kind: str, model_name: str, img, features=None):
+        if features is None:
+            key = (kind, model_name, cls.require_model(model_name).version, image_digest(img))
+            features = cls._embedding_cache.get(key)
+            if features is None:
+                with timed("preprocess", model_name):
+                    predictor.set_image(img)
+                features = cls._copy_features(predictor.features)
+                cls._embedding_cache.put(key, features, tensor_nbytes(features))
+                return features
+        predictor.setup_source(img)
+        predictor.features = cls._copy_features(features)
+        return features
+
+    @classmethod
+    def _copy_features(cls, features):
+        # forward_grounding adds the prompt embeddings to the predictor's features dict in place.
+        return dict(features) if isinstance(features, dict) else features
+
+    @classmethod
+    def encode_image(cls, model_name: str, img):
+        predictor = cls.get_visual_model(model_name)
         try:
-            if payload.prompt_type == "bbox":
-                if not payload.bboxes or len(payload.bboxes) != 4:
-                    raise HTTPException(status_code=400, detail="bboxes must contain exactly 4 values [x1, y1, x2, y2]")
-                results = model(img, bboxes=payload.bboxes, retina_masks=True)
-
-            elif payload.prompt_type == "point":
-                if not payload.points or len(payload.points) != 1 or len(payload.points[0]) != 2:
-                    raise HTTPException(status_code=400, detail="points must contain exactly one point [x, y]")
-                if not payload.labels or len(payload.labels) != 1:
-                    raise HTTPException(status_code=400, detail="labels must contain exactly one label")
-                results = model(img, points=payload.points[0], labels=payload.labels, retina_masks=True)
-
-            elif payload.prompt_type == "points":
-                if not payload.points:
-                    raise HTTPException(status_code=400, detail="points list cannot be empty")
-                if not payload.labels or len(payload.labels) != len(payload.points):
-                    raise HTTPException(status_code=400, detail="labels must have same length as points")
-                results = model(img, points=payload.points, labels=payload.labels, retina_masks=True)
-
-            elif payload.prompt_type == "points_per_object":
-                if not payload.points:
-                    raise HTTPException(status_code=400, detail="points list cannot be empty")
-                if not payload.labels or len(payload.labels) != len(payload.points):
-                    raise HTTPException(status_code=400, detail="labels must have same length as points")
-                results = model(img, points=[payload.points], labels=[payload.labels], retina_masks=True)
-
-            elif payload.prompt_type == "negative_points":
-                if not payload.points:
-                    raise HTTPException(status_code=400, detail="points list cannot be empty")
-                if not payload.labels or len(payload.labels) != len(payload.points):
-                    raise HTTPException(status_code=400, detail="labels must have same length as points")
-                results = model(img, points=[payload.points], labels=[payload.labels], retina_masks=True)
-
-            else:
-                raise HTTPException(status_code=400, detail="Invalid prompt_type")
-
-        except HTTPException:
-            raise
+            return cls._set_image(predictor, "visual", model_name, img)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"SAM3 image encoding failed: {exc}") from exc
+
+    @classmethod
+    def warm_up_visual(cls, name: str) -> None:
+        predictor = cls.get_visual_model(name)
+        predictor.set_image(np.zeros((WARMUP_IMGSZ, WARMUP_IMGSZ, 3), dtype=np.uint8))
+        predictor(bboxes=[0, 0, WARMUP_IMGSZ // 2, WARMUP_IMGSZ // 2])
+
+    @classmethod
+    def warm_up_concept(cls, name: str) -> None:
+        predictor = cls.get_concept_predictor(name)
+        predictor.set_image(np.zeros((WARMUP_IMGSZ, WARMUP_IMGSZ, 3), dtype=np.uint8))
+        predictor(text=["object"], save=False)
+
+    @classmethod
+    def embedding_cache_stats(cls) -> dict:
+        return cls._embedding_cache.stats()
+
+    @classmethod
+    def text_cache_stats(cls) -> dict:
+        return cls._text_cache.stats()
+
+    @classmethod
+    def coalescing_stats(cls) -> dict:
+        return {"requests": cls._flights.stats(), "model_loads": cls._loads.stats()}
+
+    @classmethod
+    def _prompt_kwargs(cls, payload: Sam3PromptRequest) -> dict:
+        if payload.prompt_type == "bbox":
+            if not payload.bboxes or len(payload.bboxes) != 4:
+                raise HTTPException(status_code=400, detail="bboxes must contain exactly 4 values [x1, y1, x2, y2]")
+            return dict(bboxes=payload.bboxes)
+
+        if payload.prompt_type == "point":
+            if not payload.points or len(payload.points) != 1 or len(payload.points[0]) != 2:
+                raise HTTPException(status_code=400, detail="points must contain exactly one point [x, y]")
+            if not payload.labels or len(payload.labels) != 1:
+                raise HTTPException(status_code=400, detail="labels must contain exactly one label")
+            return dict(points=payload.points[0], labels=payload.labels)
+
+        if payload.prompt_type in ("points", "points_per_object", "negative_points"):
+            if not payload.points:
+                raise HTTPException(status_code=400, detail="points list cannot be empty")
+            if not payload.labels or len(payload.labels) != len(payload.points):
+                raise HTTPException(status_code=400, detail="labels must have same length as points")
+            if payload.prompt_type == "points":
+                return dict(points=payload.points, labels=payload.labels)
+            return dict(points=[payload.points], labels=[payload.labels])
+
+        raise HTTPException(status_code=400, detail="Invalid prompt_type")
+
+    @classmethod
+    def annotate_image(
+        cls,
+        model_name: str,
+        img,
+        payload: Sam3PromptRequest,
+        features=None,
+    ) -> Sam3AnnotateResponse:
+        prompt = cls._prompt_kwargs(payload)
+        predictor = cls.get_visual_model(model_name)
+
+        try:
+            cls._set_image(predictor, "visual", model_name, img, features)
+            with timed("inference", model_name):
+                results = predictor(**prompt)
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"SAM3 inference failed: {exc}") from exc
 
-        masks_list = []
+        with timed("encode", model_name):
+            return cls._build_annotate_response(results, payload.mask_format, payload.polygon_options)
+
+    @classmethod
+    def _build_annotate_response(cls, results, mask_format=None, polygon_options=None) -> Sam3AnnotateResponse:
+        mask_fields = encode_masks(None, mask_format)
+        num_masks = 0
         boxes_list = []
         confidences_list = []
-        mask_images_list = []
 
         if results and len(results) > 0:
             result = results[0]
 
             if hasattr(result, 'masks') and result.masks is not None:
-                masks_list = [p.tolist() for p in result.masks.xy]
-                for mask_data in result.masks.data:
-                    mask_images_list.append(mask_to_base64_png(mask_data))
+                mask_fields = encode_masks(result.masks, mask_format, polygon_options=polygon_options)
+                num_masks = len(result.masks)
 
             if hasattr(result, 'boxes') and result.boxes is not None:
                 boxes_list = result.boxes.xyxy.cpu().numpy().tolist()
                 if hasattr(result.boxes, 'conf') and result.boxes.conf is not None:
                     confidences_list = result.boxes.conf.cpu().numpy().tolist()
 
-        return Sam3AnnotateResponse(
-            masks=masks_list,
+        return Sam3AnnotateResponse.model_construct(
             boxes=boxes_list,
-            confidences=confidences_list if confidences_list else [1.0] * len(masks_list),
-            mask_images=mask_images_list
+            confidences=confidences_list if confidences_list else [1.0] * num_masks,
+            **mask_fields
         )
 
     @classmethod
-    def concept_segment(
+    async def concept_segment(
+        cls,
+        model_name: str,
+        payload: Sam3ConceptRequest,
+    ) -> Sam3ConceptResponse:
+        key = flight_key("sam3-concept", model_name, payload)
+        return await cls._flights.do(key, partial(cls._concept_segment, model_name, payload))
+
+    @classmethod
+    async def _concept_segment(cls, model_name: str, payload: Sam3ConceptRequest) -> Sam3ConceptResponse:
+        lane = cls.lane("sam3-concept", model_name)
+        await InferenceExecutor.run(lane, cls.load_concept_predictor, model_name)
+        img = await load_image_from_url(payload.image_url)
+        digest = await asyncio.to_thread(content_digest, img)
+        key = await result_key(cls.registry, model_name, digest, "concept", payload.model_dump(exclude={"image_url"}))
+        cached = await load_result(key)
+        if cached is not None:
+            return Sam3ConceptResponse.model_validate_json(cached)
+        response = await InferenceExecutor.run(lane, cls._concept_segment_image, model_name, img, payload)
+        await save_result(key, f"sam3:{model_name}", response.model_dump_json().encode())
+        return response
+
+    @classmethod
+    def _concept_segment_image(
         cls,
         model_name: str,
+        img,
         payload: Sam3ConceptRequest,
     ) -> Sam3ConceptResponse:
         predictor = cls.get_concept_predictor(model_name)
-        img = load_image_from_url(payload.image_url)
 
         try:
-            predictor.set_image(img)
-            results = predictor(text=payload.text_prompts, save=False, retina_masks=True)
+            cls._set_image(predictor, "concept", model_name, img)
+            with timed("inference", model_name):
+                results = predictor(text=payload.text_prompts, save=False, retina_masks=True)
         except Exception as exc:
             raise HTTPException(status_code=500, detail=f"SAM3 concept segmentation failed: {exc}") from exc
 
-        masks_list = []
+        with timed("encode", model_name):
+            return cls._build_concept_response(results, payload)
+
+    @classmethod
+    def _build_concept_response(cls, results, payload: Sam3ConceptRequest) -> Sam3ConceptResponse:
+        mask_fields = encode_masks(None, payload.mask_format)
         boxes_list = []
         confidences_list = []
         prompt_indices_list = []
-        mask_images_list = []
 
         if results and len(results) > 0:
             for prompt_idx, result in enumerate(results):
                 if hasattr(result, 'masks') and result.masks is not None:
-                    polygons = [p.tolist() for p in result.masks.xy]
-                    masks_list.extend(polygons)
-                    for mask_data in result.masks.data:
-                        mask_images_list.append(mask_to_base64_png(mask_data))
+                    cls._extend_mask_fields(mask_fields, encode_masks(
+                        result.masks, payload.mask_format, polygon_options=payload.polygon_options
+                    ))
+                    num_masks = len(result.masks)
 
                     if hasattr(result, 'boxes') and result.boxes is not None:
                         bxs = result.boxes.xyxy.cpu().numpy().tolist()
@@ -257,74 +467,178 @@ class Sam3Service:
                         else:
                             confidences_list.extend([1.0] * len(bxs))
 
-                    prompt_indices_list.extend([prompt_idx] * len(polygons))
+                    prompt_indices_list.extend([prompt_idx] * num_masks)
 
-        return Sam3ConceptResponse(
-            masks=masks_list,
+        return Sam3ConceptResponse.model_construct(
             boxes=boxes_list,
-            confidences=confidences_list if confidences_list else [1.0] * len(masks_list),
+            confidences=confidences_list if confidences_list else [1.0] * len(prompt_indices_list),
             prompt_indices=prompt_indices_list,
-            mask_images=mask_images_list
+            **mask_fields
         )
 
     @classmethod
-    def concept_batch(
+    def _extend_mask_fields(cls, fields: dict, encoded: dict) -> None:
+        for key in ("masks", "mask_images", "mask_rles", "mask_bitmaps"):
+            fields[key].extend(encoded[key])
+        fields["mask_size"] = encoded["mask_size"] or fields["mask_size"]
+
+    @classmethod
+    async def concept_batch(
         cls,
         model_name: str,
         payload: Sam3ConceptBatchRequest,
     ) -> Sam3ConceptBatchResponse:
-        predictor = cls.get_concept_predictor(model_name)
-        results_list = []
+        results_list: list = [None] * len(payload.image_urls)
+        async for idx, item in await cls.stream_concept_batch(model_name, payload):
+            results_list[idx] = item
+        return Sam3ConceptBatchResponse.model_construct(results=results_list)
 
-        for image_url in payload.image_urls:
+    @classmethod
+    async def stream_concept_batch(
+        cls,
+        model_name: str,
+        payload: Sam3ConceptBatchRequest,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[tuple[int, Sam3ConceptBatchResultItem]]:
+        lane = cls.lane("sam3-concept", model_name)
+        await InferenceExecutor.run(lane, cls.load_concept_predictor, model_name)
+        params = payload.model_dump(exclude={"image_urls", "class_name", "skip_duplicates"})
+        # Raw ultralytics results cannot leave a worker process, so there the worker encodes too.
+        encode_in_lane = InferenceExecutor.uses_processes()
+
+        # Identical concurrent requests share every step: one fetch per URL, one decode and store
+        # lookup per fetched image, and one inference per image content.
+        async def fetch(image_url: str):
+            return await cls._flights.do(flight_key("fetch", image_url), partial(fetch_image, image_url))
+
+        async def prepare(fetched):
+            img = (await decode_fetched_image(fetched)).image
+            digest = await asyncio.to_thread(content_digest, img)
+            key = await result_key(cls.registry, model_name, digest, "concept-batch", params)
+            if payload.skip_duplicates:
+                cached = await load_result(key)
+                if cached is not None:
+                    return Finished(Sam3ConceptBatchResultItem.model_validate_json(cached))
+            return img, digest, key
+
+        async def decode(fetched):
+            # Shared fetches hand every caller the same object, and it stays alive while the flight runs.
+            flight = flight_key("sam3-concept-batch-decode", model_name, id(fetched), params, payload.skip_duplicates)
+            return await cls._flights.do(flight, partial(prepare, fetched))
+
+        async def infer(job):
+            img, digest, key = job
+            flight = flight_key("sam3-concept-batch", model_name, digest, params)
+            run = partial(
+                InferenceExecutor.run, lane, cls._concept_batch_image, model_name, img, payload, encode_in_lane,
+                admitted=True,
+            )
+            return await cls._flights.do(flight, run), key
+
+        async def encode(job):
+            out, key = job
+            if not encode_in_lane:
+                out = await asyncio.to_thread(cls._encode_concept_batch_item, model_name, out, payload)
+            await save_result(key, f"sam3:{model_name}", out.model_dump_json().encode())
+            return out
+
+        stages = [
+            Stage("fetch", fetch, PIPELINE_FETCH_CONCURRENCY),
+            Stage("decode", decode, PIPELINE_DECODE_CONCURRENCY),
+            Stage("inference", infer, CONCEPT_BATCH_INFLIGHT),
+            Stage("encode", encode, PIPELINE_ENCODE_CONCURRENCY),
+        ]
+
+        # Admitted once here, before any response bytes go out; the images then wait for the lane.
+        # The slot is released when the stream ends or is closed, or once it is dropped unread.
+        reservation = InferenceExecutor.reserve(lane)
+
+        async def items() -> AsyncIterator[tuple[int, Sam3ConceptBatchResultItem]]:
             try:
-                img = load_image_from_url(image_url)
+                async for idx, item in iterate_pipeline(payload.image_urls, stages):
+                    if isinstance(item, Exception):
+                        if not isinstance(item, HTTPException):
+                            raise item
+                        if not return_exceptions:
+                            # The batch response has no per-image error field.
+                            item = cls._empty_batch_item()
+                    yield idx, item
+            finally:
+                InferenceExecutor.release(reservation)
+
+        return items()
+
+    @classmethod
+    def _empty_batch_item(cls) -> Sam3ConceptBatchResultItem:
+        return Sam3ConceptBatchResultItem.model_construct(
+            masks=[],
+            boxes=[],
+            confidences=[],
+            prompt_indices=[],
+            mask_images=[]
+        )
+
+    @classmethod
+    def _concept_batch_image(
+        cls,
+        model_name: str,
+        img,
+        payload: Sam3ConceptBatchRequest,
+        encode: bool = True,
+    ):
+        predictor = cls.get_concept_predictor(model_name)
+        try:
+            with timed("preprocess", model_name):
                 predictor.set_image(img)
+            with timed("inference", model_name):
                 results = predictor(text=payload.text_prompts, save=False, retina_masks=True)
-            except Exception as exc:
-                results_list.append(Sam3ConceptBatchResultItem(
-                    masks=[],
-                    boxes=[],
-                    confidences=[],
-                    prompt_indices=[],
-                    mask_images=[]
-                ))
-                continue
-
-            masks_list = []
-            boxes_list = []
-            confidences_list = []
-            prompt_indices_list = []
-            mask_images_list = []
-
-            if results and len(results) > 0:
-                for prompt_idx, result in enumerate(results):
-                    if hasattr(result, 'masks') and result.masks is not None:
-                        polygons = [p.tolist() for p in result.masks.xy]
-                        mask_imgs = [mask_to_base64_png(m) for m in result.masks.data]
-
-                        if hasattr(result, 'boxes') and result.boxes is not None:
-                            bxs = result.boxes.xyxy.cpu().numpy().tolist()
-                            
-                            if hasattr(result.boxes, 'conf') and result.boxes.conf is not None:
-                                confs = result.boxes.conf.cpu().numpy().tolist()
-                            else:
-                                confs = [1.0] * len(bxs)
-
-                            for i, (polygon, box, conf, mask_img) in enumerate(zip(polygons, bxs, confs, mask_imgs)):
-                                if conf >= (payload.conf_threshold or 0.25):
-                                    masks_list.append(polygon)
-                                    boxes_list.append(box)
-                                    confidences_list.append(conf)
-                                    prompt_indices_list.append(prompt_idx)
-                                    mask_images_list.append(mask_img)
-
-            results_list.append(Sam3ConceptBatchResultItem(
-                masks=masks_list,
-                boxes=boxes_list,
-                confidences=confidences_list if confidences_list else [],
-                prompt_indices=prompt_indices_list,
-                mask_images=mask_images_list
-            ))
-
-        return Sam3ConceptBatchResponse(results=results_list)
+        except Exception as exc:
+            # Surfaced as an empty item by stream_concept_batch, but never stored as a result.
+            raise HTTPException(status_code=500, detail=f"SAM3 concept segmentation failed: {exc}") from exc
+
+        if not encode:
+            return results
+        return cls._encode_concept_batch_item(model_name, results, payload)
+
+    @classmethod
+    def _encode_concept_batch_item(cls, model_name: str, results, payload: Sam3ConceptBatchRequest):
+        with timed("encode", model_name):
+            return cls._build_concept_batch_item(results, payload)
+
+    @classmethod
+    def _build_concept_batch_item(cls, results, payload: Sam3ConceptBatchRequest) -> Sam3ConceptBatchResultItem:
+        mask_fields = encode_masks(None, payload.mask_format)
+        boxes_list = []
+        confidences_list = []
+        prompt_indices_list = []
+
+        if results and len(results) > 0:
+            for prompt_idx, result in enumerate(results):
+                if hasattr(result, 'masks') and result.masks is not None:
+                    if hasattr(result, 'boxes') and result.boxes is not None:
+                        bxs = result.boxes.xyxy.cpu().numpy().tolist()
+
+                        if hasattr(result.boxes, 'conf') and result.boxes.conf is not None:
+                            confs = result.boxes.conf.cpu().numpy().tolist()
+                        else:
+                            confs = [1.0] * len(bxs)
+
+                        keep = [
+                            i for i, conf in enumerate(confs[:len(result.masks)])
+                            if conf >= (payload.conf_threshold or 0.25)
+                        ]
+                        if not keep:
+                            continue
+                        cls._extend_mask_fields(mask_fields, encode_masks(
+                            result.masks, payload.mask_format, keep, payload.polygon_options
+                        ))
+                        boxes_list.extend(bxs[i] for i in keep)
+                        confidences_list.extend(confs[i] for i in keep)
+                        prompt_indices_list.extend([prompt_idx] * len(keep))
+
+        return Sam3ConceptBatchResultItem.model_construct(
+            boxes=boxes_list,
+            confidences=confidences_list if confidences_list else [],
+            prompt_indices=prompt_indices_list,
+            **mask_fields
+        )
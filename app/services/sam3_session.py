@@ -0,0 +1,130 @@
+import asyncio
+import json
+import time
+import uuid
+
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.config import SAM3_SESSION_MAX, SAM3_SESSION_IDLE_TIMEOUT
+from app.schemas.sam3 import Sam3SessionPrompt, Sam3AnnotateResponse
+from app.services.image_service import load_image_from_url
+from app.services.inference_executor import InferenceExecutor
+from app.services.sam3_service import Sam3Service
+
+
+class Sam3Session:
+    def __init__(self, model_name: str, lane: str, image_url: str, image, features):
+        self.id = uuid.uuid4().hex
+        self.model_name = model_name
+        self.lane = lane
+        self.image_url = image_url
+        self.image = image
+        self.features = features
+        self.prompts = 0
+        self.last_active = time.monotonic()
+
+
+class Sam3SessionManager:
+    _sessions: dict[str, Sam3Session] = {}
+    _opening = 0
+
+    @classmethod
+    async def open(cls, model_name: str, image_url: str) -> Sam3Session:
+        # Opens still loading count against the cap, so concurrent opens cannot overshoot it.
+        if len(cls._sessions) + cls._opening >= SAM3_SESSION_MAX:
+            raise HTTPException(status_code=503, detail="Too many open SAM3 sessions, retry later")
+
+        cls._opening += 1
+        try:
+            lane = Sam3Service.lane("sam3-visual", model_name)
+            await InferenceExecutor.run(lane, Sam3Service.load_visual_model, model_name)
+            img = await load_image_from_url(image_url)
+            features = await InferenceExecutor.run(lane, Sam3Service.encode_image, model_name, img)
+
+            session = Sam3Session(model_name, lane, image_url, img, features)
+            cls._sessions[session.id] = session
+            return session
+        finally:
+            cls._opening -= 1
+
+    @classmethod
+    async def prompt(cls, session: Sam3Session, payload: Sam3SessionPrompt) -> Sam3AnnotateResponse:
+        session.last_active = time.monotonic()
+        session.prompts += 1
+        return await InferenceExecutor.run(
+            session.lane, Sam3Service.annotate_image, session.model_name, session.image, payload, session.features
+        )
+
+    @classmethod
+    def close(cls, session: Sam3Session) -> None:
+        cls._sessions.pop(session.id, None)
+
+    @classmethod
+    def stats(cls) -> dict:
+        now = time.monotonic()
+        return {
+            "active": len(cls._sessions),
+            "opening": cls._opening,
+            "max": SAM3_SESSION_MAX,
+            "idle_timeout_s": SAM3_SESSION_IDLE_TIMEOUT,
+            "oldest_idle_s": max((now - s.last_active for s in cls._sessions.values()), default=0.0),
+        }
+
+    @classmethod
+    async def serve(cls, websocket: WebSocket, model_name: str, image_url: str) -> None:
+        await websocket.accept()
+        try:
+            session = await cls.open(model_name, image_url)
+        except HTTPException as exc:
+            await websocket.send_json({"type": "error", "status": exc.status_code, "detail": exc.detail})
+            await websocket.close(code=4000 + exc.status_code)
+            return
+
+        try:
+            height, width = session.image.shape[:2]
+            await websocket.send_json({
+                "type": "ready",
+                "session_id": session.id,
+                "width": width,
+                "height": height,
+            })
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(websocket.receive_text(), SAM3_SESSION_IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    await websocket.close(code=1000, reason="Session idle timeout")
+                    return
+
+                request_id = None
+                try:
+                    data = json.loads(message)
+                    if isinstance(data, dict):
+                        request_id = data.get("request_id")
+                    payload = Sam3SessionPrompt.model_validate(data)
+                    response = await cls.prompt(session, payload)
+                except (json.JSONDecodeError, ValidationError) as exc:
+                    await websocket.send_json({
+                        "type": "error",
+                        "request_id": request_id,
+                        "status": 422,
+                        "detail": str(exc),
+                    })
+                except HTTPException as exc:
+                    await websocket.send_json({
+                        "type": "error",
+                        "request_id": request_id,
+                        "status": exc.status_code,
+                        "detail": exc.detail,
+                    })
+                else:
+                    await websocket.send_json({
+                        "type": "result",
+                        "request_id": request_id,
+                        **response.model_dump(),
+                    })
+        except WebSocketDisconnect:
+            pass
+        finally:
+            cls.close(session)
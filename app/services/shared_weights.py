@@ -0,0 +1,36 @@
+import os
+import re
+
+import torch
+
+from app.config import MODEL_MMAP_DIR, MODEL_MMAP_WEIGHTS
+
+
+def _mmap_path(key: str):
+    return MODEL_MMAP_DIR / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', key)}.pt"
+
+
+def share_module_weights(module, key: str) -> bool:
+    """Back ``module``'s parameters and buffers with a memory-mapped state file.
+
+    The first process to load a model writes its (already fused/cast) state dict
+    once; every process then maps that file read-only, so the weights live in the
+    shared page cache instead of being copied into each worker's heap.
+    """
+    if not MODEL_MMAP_WEIGHTS or not isinstance(module, torch.nn.Module):
+        return False
+
+    path = _mmap_path(key)
+    if not path.exists():
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        torch.save(module.state_dict(), tmp_path)
+        os.replace(tmp_path, path)
+
+    state = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    module.load_state_dict(state, assign=True)
+    return True
+
+
+def drop_shared_weights(prefix: str) -> None:
+    for path in MODEL_MMAP_DIR.glob(f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', prefix)}*.pt"):
+        path.unlink(missing_ok=True)
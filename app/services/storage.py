@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from app.config import MODEL_BLOBS_DIR, UPLOAD_CHUNK_SIZE
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    sha256: str
+    path: Path
+    size: int
+    pin: Optional[Path] = None
+
+
+class BlobStore:
+    """Content-addressed store for model weights.
+
+    Uploads are streamed to a temp file while being hashed, then renamed into
+    place. Model directories reference blobs through hard links, so identical
+    weights uploaded under several names occupy disk space once.
+
+    A blob's link count is its reference count. A fresh upload holds its own
+    temporary link (the pin) until ``link`` has placed it in a model
+    directory, and pinning, the count check and the unlink all happen under
+    one lock. A concurrent ``release`` therefore cannot delete a blob that an
+    upload is about to reuse.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.tmp_dir = root / ".tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256
+
+    def _write_stream(self, source: BinaryIO) -> StoredBlob:
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=self.tmp_dir)
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in iter(lambda: source.read(UPLOAD_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+
+            sha256 = digest.hexdigest()
+            blob = self.blob_path(sha256)
+            with self._lock:
+                if blob.exists():
+                    tmp_path.unlink()
+                    os.link(blob, tmp_path)
+                else:
+                    blob.parent.mkdir(exist_ok=True)
+                    os.link(tmp_path, blob)
+            return StoredBlob(sha256, blob, size, pin=tmp_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    async def save_upload(self, upload: UploadFile) -> StoredBlob:
+        await upload.seek(0)
+        try:
+            return await asyncio.to_thread(self._write_stream, upload.file)
+        except OSError as exc:
+            raise HTTPException(status_code=500, detail=f"Failed to store weights: {exc}") from exc
+
+    def link(self, blob: StoredBlob, dest: Path) -> None:
+        try:
+            os.link(blob.path, dest)
+        except OSError:
+            shutil.copyfile(blob.path, dest)
+        finally:
+            self.unpin(blob)
+
+    def unpin(self, blob: StoredBlob) -> None:
+        if blob.pin is not None:
+            blob.pin.unlink(missing_ok=True)
+
+    def release(self, sha256: Optional[str]) -> None:
+        if not sha256:
+            return
+        blob = self.blob_path(sha256)
+        with self._lock:
+            try:
+                if blob.stat().st_nlink <= 1:
+                    blob.unlink()
+            except FileNotFoundError:
+                pass
+
+
+blob_store = BlobStore(MODEL_BLOBS_DIR)
+
+
+def create_staging_dir(root: Path) -> Path:
+    staging = root / f".staging-{uuid.uuid4().hex}"
+    staging.mkdir()
+    return staging
+
+
+def publish_staging_dir(staging: Path, target: Path, exists_detail: str) -> None:
+    try:
+        os.rename(staging, target)
+    except OSError as exc:
+        raise HTTPException(status_code=400, detail=exists_detail) from exc
@@ -0,0 +1,165 @@
+import io
+from typing import Iterator
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+from PIL.TiffImagePlugin import (
+    COMPRESSION,
+    PHOTOMETRIC_INTERPRETATION,
+    PLANAR_CONFIGURATION,
+    ROWSPERSTRIP,
+    STRIPOFFSETS,
+    TILEOFFSETS,
+)
+from torchvision.ops import batched_nms
+
+from app.config import MAX_IMAGE_PIXELS
+from app.services.detections import DetectionBoxes, DetectionResult
+from app.services.image_service import decode_image
+
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+
+def tile_starts(length: int, tile: int, stride: int) -> list[int]:
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, stride))
+    starts.append(length - tile)
+    return starts
+
+
+class ArrayRegionReader:
+    """Serves bands of an already decoded image as zero-copy views."""
+
+    def __init__(self, img: np.ndarray):
+        self.img = img
+        self.height, self.width = img.shape[:2]
+
+    def read_band(self, top: int, height: int) -> np.ndarray:
+        return self.img[top:top + height]
+
+
+class TiffBandReader:
+    """Reads only the strips of an uncompressed, strip-organized TIFF that intersect a band.
+
+    The strip layout comes from the public tag directory and the rows are viewed
+    straight out of the encoded bytes. Anything else (compressed, tiled, planar,
+    inverted or non 8-bit data) is decoded fully by ``open_region_reader``.
+    """
+
+    CHANNELS = {"L": 1, "RGB": 3, "RGBA": 4}
+    PHOTOMETRIC = {"L": 1, "RGB": 2, "RGBA": 2}
+    TO_BGR = {"L": cv2.COLOR_GRAY2BGR, "RGB": cv2.COLOR_RGB2BGR, "RGBA": cv2.COLOR_RGBA2BGR}
+
+    def __init__(self, data: bytes, image: Image.Image):
+        tags = image.tag_v2
+        self.data = data
+        self.mode = image.mode
+        self.width, self.height = image.size
+        self.rows_per_strip = min(int(tags.get(ROWSPERSTRIP, self.height)), self.height)
+        self.offsets = tuple(tags[STRIPOFFSETS])
+        self.row_bytes = self.width * self.CHANNELS[self.mode]
+
+    @classmethod
+    def supports(cls, image: Image.Image) -> bool:
+        if image.format != "TIFF" or image.mode not in cls.CHANNELS or getattr(image, "n_frames", 1) != 1:
+            return False
+        tags = image.tag_v2
+        return (
+            tags.get(COMPRESSION, 1) == 1
+            and tags.get(PLANAR_CONFIGURATION, 1) == 1
+            and tags.get(PHOTOMETRIC_INTERPRETATION) == cls.PHOTOMETRIC[image.mode]
+            and TILEOFFSETS not in tags
+            and len(tags.get(STRIPOFFSETS, ())) > 1
+        )
+
+    def read_band(self, top: int, height: int) -> np.ndarray:
+        bottom = min(top + height, self.height)
+        first, last = top // self.rows_per_strip, (bottom - 1) // self.rows_per_strip
+        strips = []
+        for strip in range(first, last + 1):
+            rows = min(self.rows_per_strip, self.height - strip * self.rows_per_strip)
+            strips.append(np.frombuffer(self.data, np.uint8, rows * self.row_bytes, self.offsets[strip]))
+        skip = top - first * self.rows_per_strip
+        band = np.concatenate(strips).reshape(-1, self.width, self.CHANNELS[self.mode])[skip:skip + bottom - top]
+        return cv2.cvtColor(band, self.TO_BGR[self.mode])
+
+
+def open_region_reader(data: bytes):
+    try:
+        image = Image.open(io.BytesIO(data))
+        if TiffBandReader.supports(image):
+            return TiffBandReader(data, image)
+    except Exception:
+        pass
+    return ArrayRegionReader(decode_image(data))
+
+
+def iter_tiles(reader, tile_size: int, overlap: float) -> Iterator[tuple[np.ndarray, int, int]]:
+    stride = max(1, int(tile_size * (1 - overlap)))
+    xs = tile_starts(reader.width, tile_size, stride)
+    for top in tile_starts(reader.height, tile_size, stride):
+        band = reader.read_band(top, tile_size)
+        for left in xs:
+            yield band[:, left:left + tile_size], left, top
+
+
+def _box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+def nms(xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray, iou_threshold: float):
+    keep = batched_nms(
+        torch.from_numpy(xyxy).float(),
+        torch.from_numpy(conf).float(),
+        torch.from_numpy(cls).long(),
+        iou_threshold,
+    ).numpy()
+    return xyxy[keep], conf[keep], cls[keep]
+
+
+def weighted_boxes_fusion(xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray, iou_threshold: float):
+    """Fuse overlapping same-class boxes into confidence-weighted averages."""
+    fused_boxes, fused_conf, fused_cls = [], [], []
+    for label in np.unique(cls):
+        idx = np.flatnonzero(cls == label)
+        boxes, scores = xyxy[idx], conf[idx]
+        order = np.argsort(-scores)
+        boxes, scores = boxes[order], scores[order]
+        remaining = np.ones(len(boxes), dtype=bool)
+        for i in range(len(boxes)):
+            if not remaining[i]:
+                continue
+            members = remaining & (_box_iou(boxes[i], boxes) >= iou_threshold)
+            members[i] = True
+            weights = scores[members]
+            fused_boxes.append((boxes[members] * weights[:, None]).sum(axis=0) / weights.sum())
+            fused_conf.append(weights.mean())
+            fused_cls.append(label)
+            remaining &= ~members
+    if not fused_boxes:
+        return xyxy[:0], conf[:0], cls[:0]
+    return np.stack(fused_boxes), np.array(fused_conf, dtype=conf.dtype), np.array(fused_cls, dtype=cls.dtype)
+
+
+def merge_tile_detections(
+    detections: list[tuple[np.ndarray, np.ndarray, np.ndarray]],
+    method: str,
+    iou_threshold: float,
+) -> DetectionResult:
+    if not detections:
+        return DetectionResult.empty()
+    xyxy = np.concatenate([d[0] for d in detections])
+    conf = np.concatenate([d[1] for d in detections])
+    cls = np.concatenate([d[2] for d in detections])
+    merge = weighted_boxes_fusion if method == "wbf" else nms
+    return DetectionResult(DetectionBoxes(*merge(xyxy, conf, cls, iou_threshold)))
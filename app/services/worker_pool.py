@@ -0,0 +1,136 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.services.metrics import collect_stages
+
+logger = logging.getLogger(__name__)
+
+
+def _cpu_slices(processes: int) -> list[list[int]]:
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    size = max(1, len(cores) // processes)
+    return [cores[i * size:(i + 1) * size] or cores for i in range(processes)]
+
+
+def _init_worker(index: int, threads: int, cores: Optional[list[int]]) -> None:
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    import torch
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+    logger.info("Inference worker %d started (threads=%d, cores=%s)", index, threads, cores or "any")
+
+
+def _invoke(fn: Callable[..., Any], args: tuple) -> tuple:
+    with collect_stages() as observations:
+        try:
+            return "ok", fn(*args), observations
+        except HTTPException as exc:
+            return "http_error", (exc.status_code, exc.detail, exc.headers), observations
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class WorkerPool:
+    """Single-process executors, one per worker, so each one can be pinned and sized.
+
+    Work goes to the worker with the fewest in-flight calls. When a worker
+    process dies, the calls it was running fail with ``BrokenProcessPool`` and
+    its executor is replaced by a fresh one before the next submission.
+    """
+
+    def __init__(self, processes: int, threads: int = 0, pin_cpus: bool = False):
+        self._context = multiprocessing.get_context("spawn")
+        self._slices = _cpu_slices(processes)
+        self._threads = threads
+        self._pin_cpus = pin_cpus
+        self.executors = [self._new_executor(index) for index in range(len(self._slices))]
+        self.inflight = [0] * len(self.executors)
+        self.broken = [False] * len(self.executors)
+        self.restarts = 0
+        self._lock = threading.Lock()
+
+    def _new_executor(self, index: int) -> ProcessPoolExecutor:
+        cores = self._slices[index]
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(index, self._threads or len(cores), cores if self._pin_cpus else None),
+        )
+
+    def _replace_broken(self) -> None:
+        # Called with the lock held. Creating the executor is cheap; its process starts on first submit.
+        for index, broken in enumerate(self.broken):
+            if broken:
+                logger.warning("Inference worker %d died, starting a replacement", index)
+                self.executors[index].shutdown(wait=False, cancel_futures=True)
+                self.executors[index] = self._new_executor(index)
+                self.broken[index] = False
+                self.restarts += 1
+
+    def __len__(self) -> int:
+        return len(self.executors)
+
+    def start(self) -> list[int]:
+        return [executor.submit(_ping).result() for executor in self.executors]
+
+    def _submit_to(self, index: int, fn: Callable[..., Any], args: tuple) -> Future:
+        with self._lock:
+            self._replace_broken()
+            executor = self.executors[index]
+            self.inflight[index] += 1
+        try:
+            future = executor.submit(_invoke, fn, args)
+        except BrokenProcessPool:
+            # Died before this call reached it, so nothing ran: retry once on a replacement.
+            with self._lock:
+                self.inflight[index] -= 1
+                if self.executors[index] is executor:
+                    self.broken[index] = True
+                self._replace_broken()
+                executor = self.executors[index]
+                self.inflight[index] += 1
+            future = executor.submit(_invoke, fn, args)
+
+        def done(f: Future):
+            with self._lock:
+                self.inflight[index] -= 1
+                if not f.cancelled() and isinstance(f.exception(), BrokenProcessPool) \
+                        and self.executors[index] is executor:
+                    self.broken[index] = True
+
+        future.add_done_callback(done)
+        return future
+
+    def submit(self, fn: Callable[..., Any], args: tuple) -> Future:
+        with self._lock:
+            index = min(range(len(self.inflight)), key=self.inflight.__getitem__)
+        return self._submit_to(index, fn, args)
+
+    def broadcast(self, fn: Callable[..., Any], args: tuple) -> list[Future]:
+        return [self._submit_to(index, fn, args) for index in range(len(self.executors))]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"processes": len(self.executors), "inflight": list(self.inflight), "restarts": self.restarts}
+
+    def shutdown(self) -> None:
+        for executor in self.executors:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,100 @@
+import json
+import shutil
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from ultralytics import YOLO
+
+from app.config import DEFAULT_IMGSZ, YOLO_BENCHMARK_RUNS
+from app.services.model_registry import ModelRecord
+
+EXPORT_SUFFIXES = (".onnx", ".torchscript")
+EXPORT_OPTIONS = {
+    "onnx": dict(dynamic=True),
+    "openvino": dict(dynamic=True),
+    "torchscript": dict(),
+}
+
+
+def artifact_path(weights_path: Path, fmt: str) -> Path:
+    if fmt == "openvino":
+        return weights_path.parent / f"{weights_path.stem}_openvino_model"
+    return weights_path.with_suffix(f".{fmt}")
+
+
+def export_artifact(weights_path: Path, fmt: str, imgsz: int = DEFAULT_IMGSZ) -> Path:
+    model = YOLO(str(weights_path))
+    exported = Path(model.export(format=fmt, imgsz=imgsz, **EXPORT_OPTIONS[fmt]))
+    target = artifact_path(weights_path, fmt)
+    if exported.resolve() != target.resolve():
+        if target.is_dir():
+            shutil.rmtree(target)
+        elif target.exists():
+            target.unlink()
+        shutil.move(str(exported), target)
+    return target
+
+
+def measure_latency(path: Path, imgsz: int = DEFAULT_IMGSZ, runs: int = YOLO_BENCHMARK_RUNS) -> float:
+    model = YOLO(str(path))
+    dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+    kwargs = dict(imgsz=imgsz, save=False, verbose=False)
+    model.predict(source=dummy, **kwargs)
+    timings = []
+    for _ in range(max(1, runs)):
+        start = time.perf_counter()
+        model.predict(source=dummy, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def write_backends(model_dir: Path, backends: dict) -> None:
+    tmp_path = model_dir / "backends.json.tmp"
+    with tmp_path.open("w") as f:
+        json.dump(backends, f)
+    tmp_path.replace(model_dir / "backends.json")
+
+
+def export_and_benchmark(record: ModelRecord, formats: list[str]) -> dict:
+    backends = dict(record.backends)
+    backends["pytorch"] = {"path": record.weights_path.name}
+    for fmt in formats:
+        try:
+            path = export_artifact(record.weights_path, fmt)
+            backends[fmt] = {"path": path.name, "exported_at": datetime.now().isoformat()}
+        except Exception as exc:
+            backends[fmt] = {"path": None, "error": f"Export failed: {exc}"}
+
+    for name, entry in backends.items():
+        if not entry.get("path"):
+            continue
+        try:
+            entry["latency_ms"] = measure_latency(record.path / entry["path"])
+            entry.pop("error", None)
+        except Exception as exc:
+            entry["latency_ms"] = None
+            entry["error"] = f"Benchmark failed: {exc}"
+
+    write_backends(record.path, backends)
+    return backends
+
+
+def select_backend(record: ModelRecord) -> tuple[str, Optional[Path]]:
+    best_name, best_path, best_latency = "pytorch", record.weights_path, None
+    pytorch_latency = record.backends.get("pytorch", {}).get("latency_ms")
+    for name, entry in record.backends.items():
+        latency = entry.get("latency_ms")
+        if name == "pytorch" or latency is None or not entry.get("path"):
+            continue
+        path = record.path / entry["path"]
+        if not path.exists():
+            continue
+        if pytorch_latency is not None and latency >= pytorch_latency:
+            continue
+        if best_latency is None or latency < best_latency:
+            best_name, best_path, best_latency = name, path, latency
+    return best_name, best_path
@@ -1,55 +1,214 @@
+import asyncio
 import json
+import logging
+import math
 import shutil
-from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
+import numpy as np
 import yaml
 from fastapi import HTTPException, UploadFile
 from ultralytics import YOLO
 
-from app.config import YOLO_MODELS_DIR
-from app.schemas.yolo import YoloModelInfo, UploadModelResponse, AutoAnnotateRequest
-from app.services.image_service import load_image_from_url
+from app.config import (
+    YOLO_MODELS_DIR,
+    DEFAULT_IMGSZ,
+    YOLO_BATCH_MAX_SIZE,
+    YOLO_BATCH_MAX_LATENCY_MS,
+    YOLO_BATCH_MAX_QUEUE,
+    YOLO_BATCH_IDLE_TIMEOUT,
+    YOLO_EXPORT_FORMATS,
+    YOLO_EXPORT_ON_UPLOAD,
+    MODEL_MMAP_WEIGHTS,
+    PIPELINE_FETCH_CONCURRENCY,
+    PIPELINE_DECODE_CONCURRENCY,
+    PIPELINE_ENCODE_CONCURRENCY,
+)
+from app.schemas.yolo import (
+    YoloModelInfo,
+    UploadModelResponse,
+    AutoAnnotateRequest,
+    ExportModelRequest,
+    ModelBackendInfo,
+    ModelBackendsResponse,
+)
+from app.services.batching import MicroBatcher
+from app.services.detections import DetectionFailure, DetectionResult
+from app.services.image_service import decode_fetched_image, fetch_image, fetch_image_bytes
+from app.services.inference_executor import InferenceExecutor
+from app.services.metrics import observe_stage, timed
+from app.services.model_manager import ModelManager, estimate_model_bytes
+from app.services.model_registry import ModelRecord, ModelRegistry, model_identity, model_lane
+from app.services.pipeline import Finished, Stage, iterate_pipeline
+from app.services.result_store import content_digest, load_result, result_key, result_store, save_result
+from app.services.shared_weights import drop_shared_weights, share_module_weights
+from app.services.single_flight import AsyncSingleFlight, SingleFlight, flight_key
+from app.services.storage import blob_store, create_staging_dir, publish_staging_dir
+from app.services.tiling import iter_tiles, merge_tile_detections, open_region_reader
+from app.services.yolo_export import EXPORT_SUFFIXES, export_and_benchmark, select_backend
+
+logger = logging.getLogger(__name__)
+
+
+def letterbox_bucket(shape: tuple, imgsz: Optional[int] = None, stride: int = 32) -> tuple[int, int]:
+    size = imgsz or DEFAULT_IMGSZ
+    h, w = shape[:2]
+    ratio = size / max(h, w)
+    new_h, new_w = round(h * ratio), round(w * ratio)
+    return math.ceil(new_h / stride) * stride, math.ceil(new_w / stride) * stride
 
 
 class YoloService:
-    _cache: dict[str, YOLO] = {}
+    registry = ModelRegistry(
+        YOLO_MODELS_DIR,
+        weights_glob="weights.*",
+        required_file="classes.json",
+        exclude_suffixes=EXPORT_SUFFIXES,
+    )
+    _batchers: dict[tuple, MicroBatcher] = {}
+    _background_tasks: set[asyncio.Task] = set()
+    _flights = AsyncSingleFlight()
+    _loads = SingleFlight()
 
     @classmethod
-    def get_model(cls, name: str) -> tuple[YOLO, list[str]]:
-        if name in cls._cache:
-            model_dir = YOLO_MODELS_DIR / name
-            classes_file = model_dir / "classes.json"
-            if not model_dir.exists() or not classes_file.exists():
-                cls._cache.pop(name, None)
-                raise HTTPException(status_code=404, detail="YOLO model not found")
-            with classes_file.open() as f:
-                classes_list = json.load(f)
-            return cls._cache[name], classes_list
-
-        model_dir = YOLO_MODELS_DIR / name
-        if not model_dir.exists():
+    def require_model(cls, name: str) -> ModelRecord:
+        record = cls.registry.get(name)
+        if record is None:
             raise HTTPException(status_code=404, detail="YOLO model not found")
+        return record
 
-        weights_files = list(model_dir.glob("weights.*"))
-        if not weights_files:
+    @classmethod
+    def lane(cls, name: str) -> str:
+        return model_lane("yolo", cls.require_model(name))
+
+    @classmethod
+    def get_model(cls, name: str) -> tuple[YOLO, list[str]]:
+        record = cls.require_model(name)
+
+        if record.weights_path is None:
             raise HTTPException(status_code=404, detail="Model weights file not found")
 
-        weights_path = weights_files[0]
+        identity, version = model_identity(record)
+        backend, weights_path = select_backend(record)
+        key = f"{identity}#{backend}"
+        cached = ModelManager.get("yolo", key, version)
+        if cached is not None:
+            return cached, record.classes
+
+        load = partial(cls._load_model, name, record, identity, version, backend, key, weights_path)
+        return cls._loads.do(("yolo", key, version), load), record.classes
+
+    @classmethod
+    def _load_model(
+        cls,
+        name: str,
+        record: ModelRecord,
+        identity: str,
+        version,
+        backend: str,
+        key: str,
+        weights_path: Path,
+    ) -> YOLO:
+        try:
+            with timed("load", name):
+                model = YOLO(str(weights_path))
+        except Exception as exc:
+            if backend == "pytorch":
+                raise HTTPException(status_code=500, detail=f"Failed to load YOLO model: {exc}") from exc
+            key, weights_path = f"{identity}#pytorch", record.weights_path
+            try:
+                with timed("load", name):
+                    model = YOLO(str(weights_path))
+            except Exception as exc:
+                raise HTTPException(status_code=500, detail=f"Failed to load YOLO model: {exc}") from exc
+
+        if key.endswith("#pytorch") and MODEL_MMAP_WEIGHTS:
+            model.fuse()
+            share_module_weights(getattr(model, "model", None), f"yolo-{identity}-{version or ''}")
+
+        ModelManager.put("yolo", key, model, estimate_model_bytes(model, weights_path), version, alias=name)
+        return model
+
+    @classmethod
+    def load_model(cls, name: str) -> tuple[list[str], int]:
+        """Load the model and return its class names and the input size it runs at by default."""
+        model, class_names = cls.get_model(name)
+        imgsz = getattr(model, "overrides", {}).get("imgsz")
+        if isinstance(imgsz, (list, tuple)):
+            imgsz = max(imgsz)
+        return class_names, int(imgsz or DEFAULT_IMGSZ)
+
+    @classmethod
+    def _drop_loaded(cls, record: ModelRecord) -> None:
+        identity, _ = model_identity(record)
+        for backend in ("pytorch", *YOLO_EXPORT_FORMATS):
+            ModelManager.pop("yolo", f"{identity}#{backend}")
+        drop_shared_weights(f"yolo-{identity}-")
 
+    @classmethod
+    async def _drop_everywhere(cls, name: str, record: ModelRecord) -> None:
+        """Unload ``record`` in every process that may hold it, not just the one handling the request."""
         try:
-            model = YOLO(str(weights_path))
+            await InferenceExecutor.broadcast(model_lane("yolo", record), cls._drop_loaded, record, admitted=True)
         except Exception as exc:
-            raise HTTPException(status_code=500, detail=f"Failed to load YOLO model: {exc}") from exc
+            logger.warning("Failed to unload YOLO model %s from every worker: %s", name, exc)
+
+    @classmethod
+    def export_model(cls, name: str, formats: list[str]) -> ModelBackendsResponse:
+        record = cls.require_model(name)
+        if record.weights_path is None:
+            raise HTTPException(status_code=404, detail="Model weights file not found")
+
+        export_and_benchmark(record, formats)
+        cls.registry.register(name)
+        result_store.invalidate(f"yolo:{name}")
+        return cls.get_backends(name)
+
+    @classmethod
+    async def _export(cls, name: str, formats: list[str]) -> ModelBackendsResponse:
+        record = cls.require_model(name)
+        response = await InferenceExecutor.run(f"yolo-export:{name}", cls.export_model, name, formats)
+        if not cls.registry.is_shared(record):
+            await cls._drop_everywhere(name, record)
+        return response
 
-        cls._cache[name] = model
+    @classmethod
+    async def export(cls, name: str, payload: ExportModelRequest) -> ModelBackendsResponse:
+        cls.require_model(name)
+        return await cls._export(name, payload.formats)
+
+    @classmethod
+    def _schedule_export(cls, name: str, formats: list[str]) -> None:
+        task = asyncio.create_task(cls._export(name, formats))
+        cls._background_tasks.add(task)
 
-        classes_file = model_dir / "classes.json"
-        with classes_file.open() as f:
-            classes_list = json.load(f)
+        def _done(t: asyncio.Task) -> None:
+            cls._background_tasks.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning("Export of YOLO model %s failed: %s", name, t.exception())
 
-        return model, classes_list
+        task.add_done_callback(_done)
+
+    @classmethod
+    def get_backends(cls, name: str) -> ModelBackendsResponse:
+        record = cls.require_model(name)
+
+        selected, _ = select_backend(record)
+        return ModelBackendsResponse(
+            name=name,
+            selected=selected,
+            backends=[
+                ModelBackendInfo(
+                    name=backend,
+                    path=entry.get("path"),
+                    latency_ms=entry.get("latency_ms"),
+                    error=entry.get("error"),
+                )
+                for backend, entry in record.backends.items()
+            ],
+        )
 
     @classmethod
     async def upload_model(
@@ -62,13 +221,6 @@ class YoloService:
         if model_dir.exists():
             raise HTTPException(status_code=400, detail="Model with this name already exists")
 
-        model_dir.mkdir(parents=True, exist_ok=True)
-
-        weights_ext = Path(weights_file.filename).suffix
-        weights_storage_path = model_dir / f"weights{weights_ext}"
-        with weights_storage_path.open("wb") as buffer:
-            buffer.write(await weights_file.read())
-
         raw_classes_bytes = await classes_file.read()
         raw_classes_text = raw_classes_bytes.decode("utf-8")
 
@@ -95,9 +247,31 @@ class YoloService:
         if not classes_list:
             raise HTTPException(status_code=400, detail="No class names found in classes file")
 
-        classes_file_path = model_dir / "classes.json"
-        with classes_file_path.open("w") as f:
-            json.dump(classes_list, f)
+        weights_name = f"weights{Path(weights_file.filename).suffix}"
+        blob = await blob_store.save_upload(weights_file)
+        staging = create_staging_dir(YOLO_MODELS_DIR)
+        try:
+            blob_store.link(blob, staging / weights_name)
+            with (staging / "classes.json").open("w") as f:
+                json.dump(classes_list, f)
+            with (staging / "metadata.json").open("w") as f:
+                json.dump({
+                    "name": name,
+                    "weights_file": weights_name,
+                    "weights_sha256": blob.sha256,
+                    "weights_size": blob.size,
+                }, f)
+            publish_staging_dir(staging, model_dir, "Model with this name already exists")
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            blob_store.unpin(blob)
+            blob_store.release(blob.sha256)
+            raise
+
+        cls.registry.register(name)
+        result_store.invalidate(f"yolo:{name}")
+        if YOLO_EXPORT_ON_UPLOAD:
+            cls._schedule_export(name, YOLO_EXPORT_ON_UPLOAD)
 
         return UploadModelResponse(
             name=name,
@@ -107,82 +281,276 @@ class YoloService:
 
     @classmethod
     def list_models(cls) -> List[YoloModelInfo]:
-        models = []
-        for model_dir in YOLO_MODELS_DIR.iterdir():
-            if model_dir.is_dir():
-                classes_file = model_dir / "classes.json"
-                if classes_file.exists():
-                    with classes_file.open() as f:
-                        classes = json.load(f)
-                    models.append(YoloModelInfo(
-                        name=model_dir.name,
-                        classes=classes,
-                        date_add=datetime.fromtimestamp(model_dir.stat().st_mtime).isoformat()
-                    ))
-        return models
-
-    @classmethod
-    def delete_model(cls, model_name: str) -> None:
+        return [
+            YoloModelInfo(name=record.name, classes=record.classes, date_add=record.date_add)
+            for record in cls.registry.list()
+        ]
+
+    @classmethod
+    async def delete_model(cls, model_name: str) -> None:
         model_dir = YOLO_MODELS_DIR / model_name
         if not model_dir.exists():
             raise HTTPException(status_code=404, detail="Model not found")
 
-        cls._cache.pop(model_name, None)
-        shutil.rmtree(model_dir)
+        record = cls.registry.get(model_name)
+        cls.registry.unregister(model_name)
+        if record is not None and not cls.registry.is_shared(record):
+            await cls._drop_everywhere(model_name, record)
+            InferenceExecutor.drop_lanes(model_lane("yolo", record))
+        for key in [k for k in cls._batchers if k[0] == model_name]:
+            cls._batchers.pop(key)
+        InferenceExecutor.drop_lanes(f"yolo-export:{model_name}")
+        await asyncio.to_thread(result_store.invalidate, f"yolo:{model_name}")
+        await asyncio.to_thread(shutil.rmtree, model_dir)
+        if record is not None:
+            blob_store.release(record.metadata.get("weights_sha256"))
+
+    @classmethod
+    def _get_batcher(
+        cls,
+        model_name: str,
+        conf: float,
+        imgsz: Optional[int],
+        bucket: tuple[int, int],
+    ) -> MicroBatcher:
+        lane = cls.lane(model_name)
+        key = (model_name, conf, imgsz, bucket, lane)
+        batcher = cls._batchers.get(key)
+        if batcher is None:
+            batcher = MicroBatcher(
+                lane=lane,
+                run_batch=partial(cls._predict_batch, model_name, conf, imgsz),
+                max_batch_size=YOLO_BATCH_MAX_SIZE,
+                max_latency=YOLO_BATCH_MAX_LATENCY_MS / 1000,
+                max_queue=YOLO_BATCH_MAX_QUEUE,
+                idle_timeout=YOLO_BATCH_IDLE_TIMEOUT,
+                on_idle=lambda b: cls._batchers.pop(key) if cls._batchers.get(key) is b else None,
+            )
+            cls._batchers[key] = batcher
+        return batcher
+
+    @classmethod
+    def warm_up(cls, name: str) -> None:
+        model, _ = cls.get_model(name)
+        dummy = np.zeros((DEFAULT_IMGSZ, DEFAULT_IMGSZ, 3), dtype=np.uint8)
+        model.predict(source=dummy, save=False, verbose=False)
+
+    @classmethod
+    def coalescing_stats(cls) -> dict:
+        return {"requests": cls._flights.stats(), "model_loads": cls._loads.stats()}
+
+    @classmethod
+    def batcher_stats(cls) -> dict[str, dict]:
+        return {
+            f"{name}|conf={conf}|imgsz={imgsz}|bucket={bucket[0]}x{bucket[1]}": batcher.stats()
+            for (name, conf, imgsz, bucket, _), batcher in cls._batchers.items()
+        }
+
+    @classmethod
+    def _predict_kwargs(cls, conf: float, imgsz: Optional[int]) -> dict:
+        kwargs = dict(conf=conf, save=False, verbose=False)
+        if imgsz is not None:
+            kwargs["imgsz"] = imgsz
+        return kwargs
+
+    @classmethod
+    def _predict_batch(cls, model_name: str, conf: float, imgsz: Optional[int], images: list) -> list:
+        model, _ = cls.get_model(model_name)
+        kwargs = cls._predict_kwargs(conf, imgsz)
+        try:
+            results = list(model.predict(source=images, **kwargs))
+        except Exception:
+            results = []
+            for img in images:
+                try:
+                    results.append(cls._predict_single(model, kwargs, img))
+                except HTTPException as exc:
+                    results.append(DetectionFailure(exc.detail))
+        cls._observe_speed(model_name, [res for res in results if not isinstance(res, DetectionFailure)])
+        return [res if isinstance(res, DetectionFailure) else DetectionResult.from_results(res) for res in results]
+
+    @classmethod
+    def _observe_speed(cls, model_name: str, results: list) -> None:
+        for res in results:
+            speed = getattr(res, "speed", None) or {}
+            for stage in ("preprocess", "inference", "postprocess"):
+                if speed.get(stage) is not None:
+                    observe_stage(stage, speed[stage] / 1000, model_name)
+
+    @classmethod
+    def _predict_tiled(cls, model_name: str, conf: float, payload: AutoAnnotateRequest, data: bytes):
+        tiling = payload.tiling
+        model, _ = cls.get_model(model_name)
+        kwargs = cls._predict_kwargs(conf, payload.imgsz or tiling.tile_size)
+        with timed("decode", model_name):
+            reader = open_region_reader(data)
+
+        detections = []
+        batch, offsets = [], []
+
+        def flush():
+            try:
+                results = list(model.predict(source=batch, **kwargs))
+            except Exception:
+                results = [cls._predict_single(model, kwargs, tile) for tile in batch]
+            cls._observe_speed(model_name, results)
+            for res, (left, top) in zip(results, offsets):
+                if len(res.boxes) == 0:
+                    continue
+                xyxy = res.boxes.xyxy.cpu().numpy() + np.array([left, top, left, top], dtype=np.float32)
+                detections.append((xyxy, res.boxes.conf.cpu().numpy(), res.boxes.cls.cpu().numpy()))
+            batch.clear()
+            offsets.clear()
+
+        for tile, left, top in iter_tiles(reader, tiling.tile_size, tiling.overlap):
+            batch.append(tile)
+            offsets.append((left, top))
+            if len(batch) >= tiling.batch_size:
+                flush()
+        if batch:
+            flush()
+
+        with timed("merge", model_name):
+            return merge_tile_detections(detections, tiling.merge, tiling.iou_threshold)
+
+    @classmethod
+    def _predict_single(cls, model: YOLO, kwargs: dict, img):
+        try:
+            return model.predict(source=img, **kwargs)[0]
+        except Exception as exc:
+            error = exc
+        if "imgsz" not in kwargs:
+            try:
+                return model.predict(source=img, **{**kwargs, "imgsz": 320})[0]
+            except Exception as exc:
+                error = exc
+        raise HTTPException(status_code=500, detail=f"YOLO inference failed: {error}")
 
     @classmethod
-    def run_inference(
+    async def run_inference(
         cls,
         model_name: str,
         payload: AutoAnnotateRequest,
     ) -> list[list[dict]]:
+        all_annotations: list = [None] * len(payload.image_urls)
+        async for idx, annotations in await cls.stream_inference(model_name, payload):
+            all_annotations[idx] = annotations
+        return all_annotations
+
+    @classmethod
+    async def stream_inference(
+        cls,
+        model_name: str,
+        payload: AutoAnnotateRequest,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[tuple[int, list[dict]]]:
         if not payload.image_urls:
             raise HTTPException(status_code=400, detail="image_urls list cannot be empty")
 
-        model, class_names = cls.get_model(model_name)
+        lane = cls.lane(model_name)
+        class_names, model_imgsz = await InferenceExecutor.run(lane, cls.load_model, model_name)
+        imgsz = payload.imgsz or model_imgsz
+        conf = payload.conf_threshold or 0.25
+        params = (conf, payload.imgsz, payload.tiling, payload.class_map)
 
-        results = []
-        for url in payload.image_urls:
-            img = load_image_from_url(url)
+        async def predict(source):
+            if payload.tiling is not None:
+                return await InferenceExecutor.run(
+                    lane, cls._predict_tiled, model_name, conf, payload, source, admitted=True
+                )
+            bucket = letterbox_bucket(source.shape, imgsz)
+            [res] = await cls._get_batcher(model_name, conf, payload.imgsz, bucket).submit_many([source])
+            if isinstance(res, Exception):
+                raise res
+            if isinstance(res, DetectionFailure):
+                raise HTTPException(status_code=500, detail=res.detail)
+            return res
 
-            kwargs = dict(
-                source=img,
-                conf=payload.conf_threshold or 0.25,
-                save=False,
-                verbose=False,
-            )
-            if payload.imgsz is not None:
-                kwargs["imgsz"] = payload.imgsz
+        # Identical concurrent requests share every step: one fetch per URL, one decode and store
+        # lookup per fetched image, and one inference per image content.
+        async def fetch(url: str):
+            if payload.tiling is not None:
+                return await cls._flights.do(flight_key("fetch-bytes", url), partial(fetch_image_bytes, url))
+            return await cls._flights.do(flight_key("fetch", url, imgsz), partial(fetch_image, url, imgsz))
+
+        async def prepare(fetched):
+            if payload.tiling is not None:
+                # Tiled images are decoded region by region inside the inference stage.
+                source, scale = fetched, 1.0
+            else:
+                entry = await decode_fetched_image(fetched)
+                source, scale = entry.image, entry.scale
+            digest = await asyncio.to_thread(content_digest, source)
+            key = await result_key(cls.registry, model_name, digest, *params)
+            cached = await load_result(key)
+            if cached is not None:
+                return Finished(json.loads(cached))
+            return source, scale, digest, key
+
+        async def decode(fetched):
+            # Shared fetches hand every caller the same object, and it stays alive while the flight runs.
+            flight = flight_key("yolo-decode", model_name, id(fetched), *params)
+            return await cls._flights.do(flight, partial(prepare, fetched))
+
+        async def infer(job):
+            source, scale, digest, key = job
+            flight = flight_key("yolo", model_name, digest, *params)
+            return await cls._flights.do(flight, partial(predict, source)), scale, key
+
+        async def encode(job) -> list[dict]:
+            # Failed images raise in the inference stage and never get here, so they are never cached.
+            res, scale, key = job
+            with timed("encode", model_name):
+                annotations = cls._format_annotations(res, class_names, payload, model_name, scale)
+            await save_result(key, f"yolo:{model_name}", json.dumps(annotations).encode())
+            return annotations
+
+        stages = [
+            Stage("fetch", fetch, PIPELINE_FETCH_CONCURRENCY),
+            Stage("decode", decode, PIPELINE_DECODE_CONCURRENCY),
+            # Enough images in flight to fill a micro-batch.
+            Stage("inference", infer, YOLO_BATCH_MAX_SIZE),
+            Stage("encode", encode, PIPELINE_ENCODE_CONCURRENCY),
+        ]
+
+        # Admitted once here, as for concept batches; the images' batches then run as admitted calls.
+        reservation = InferenceExecutor.reserve(lane)
+
+        async def items() -> AsyncIterator[tuple[int, list[dict]]]:
             try:
-                pred = model.predict(**kwargs)
-                results.append(pred[0])
-            except Exception as exc:
-                if payload.imgsz is None:
-                    try:
-                        pred = model.predict(**{**kwargs, "imgsz": 320})
-                        results.append(pred[0])
-                        continue
-                    except Exception:
-                        pass
-                raise HTTPException(status_code=500, detail=f"YOLO inference failed: {exc}") from exc
+                async for idx, annotations in iterate_pipeline(payload.image_urls, stages):
+                    if isinstance(annotations, Exception):
+                        if not (return_exceptions and isinstance(annotations, HTTPException)):
+                            raise annotations
+                    yield idx, annotations
+            finally:
+                InferenceExecutor.release(reservation)
 
-        all_annotations = []
-        for res in results:
-            boxes = res.boxes
-            annotations_list = []
-            for xyxy, cls_idx, conf in zip(boxes.xyxy.tolist(), boxes.cls.tolist(), boxes.conf.tolist()):
-                x1, y1, x2, y2 = xyxy
-                raw_name = class_names[int(cls_idx)] if int(cls_idx) < len(class_names) else str(cls_idx)
-                mapped_name = payload.class_map.get(raw_name) if payload.class_map else raw_name
-                annotations_list.append(
-                    {
-                        "bbox": [x1, y1, x2, y2],
-                        "class_id": int(cls_idx),
-                        "class_name": mapped_name,
-                        "confidence": float(conf),
-                        "model": model_name,
-                    }
-                )
-            all_annotations.append(annotations_list)
+        return items()
 
-        return all_annotations
+    @classmethod
+    def _format_annotations(
+        cls,
+        res,
+        class_names: list[str],
+        payload: AutoAnnotateRequest,
+        model_name: str,
+        scale: float = 1.0,
+    ) -> list[dict]:
+        boxes = res.boxes
+        xyxy_all = boxes.xyxy * scale if scale != 1.0 else boxes.xyxy
+        annotations_list = []
+        for xyxy, cls_idx, conf in zip(xyxy_all.tolist(), boxes.cls.tolist(), boxes.conf.tolist()):
+            x1, y1, x2, y2 = xyxy
+            raw_name = class_names[int(cls_idx)] if int(cls_idx) < len(class_names) else str(cls_idx)
+            mapped_name = payload.class_map.get(raw_name) if payload.class_map else raw_name
+            annotations_list.append(
+                {
+                    "bbox": [x1, y1, x2, y2],
+                    "class_id": int(cls_idx),
+                    "class_name": mapped_name,
+                    "confidence": float(conf),
+                    "model": model_name,
+                }
+            )
+        return annotations_list
@@ -0,0 +1,77 @@
+"""Compare per-image YOLO predict against shape-bucketed batched predict.
+
+Usage:
+    python -m benchmarks.bench_yolo_batching --weights yolo11n.pt --images 200
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from ultralytics import YOLO
+
+from app.services.yolo_service import letterbox_bucket
+
+SHAPES = [(480, 640), (720, 1280), (1080, 1920), (640, 480), (1024, 1024)]
+
+
+def make_images(count: int, seed: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return [
+        rng.integers(0, 256, size=(*SHAPES[i % len(SHAPES)], 3), dtype=np.uint8)
+        for i in range(count)
+    ]
+
+
+def run_per_image(model: YOLO, images: list, kwargs: dict) -> float:
+    start = time.perf_counter()
+    for img in images:
+        model.predict(source=img, **kwargs)
+    return time.perf_counter() - start
+
+
+def run_bucketed(model: YOLO, images: list, kwargs: dict, batch_size: int) -> float:
+    buckets: dict[tuple[int, int], list[np.ndarray]] = {}
+    start = time.perf_counter()
+    for img in images:
+        buckets.setdefault(letterbox_bucket(img.shape, kwargs.get("imgsz")), []).append(img)
+    for group in buckets.values():
+        for i in range(0, len(group), batch_size):
+            model.predict(source=group[i:i + batch_size], **kwargs)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weights", required=True)
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--imgsz", type=int, default=None)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = YOLO(args.weights)
+    images = make_images(args.images, args.seed)
+    kwargs = dict(conf=args.conf, save=False, verbose=False)
+    if args.imgsz is not None:
+        kwargs["imgsz"] = args.imgsz
+
+    for img in images[:args.warmup]:
+        model.predict(source=img, **kwargs)
+
+    per_image = run_per_image(model, images, kwargs)
+    bucketed = run_bucketed(model, images, kwargs, args.batch_size)
+
+    print(json.dumps({
+        "images": args.images,
+        "batch_size": args.batch_size,
+        "per_image_images_per_sec": args.images / per_image,
+        "bucketed_images_per_sec": args.images / bucketed,
+        "speedup": per_image / bucketed,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
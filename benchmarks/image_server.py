@@ -0,0 +1,86 @@
+"""Local HTTP stand-in that serves a deterministic corpus of synthetic images."""
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import cv2
+import numpy as np
+
+SHAPES = [(480, 640), (720, 1280), (1080, 1920), (640, 480), (1024, 1024)]
+
+
+def make_corpus(count: int, seed: int, fmt: str = "jpg") -> list[bytes]:
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for i in range(count):
+        h, w = SHAPES[i % len(SHAPES)]
+        img = np.full((h, w, 3), rng.integers(0, 256, size=3), dtype=np.uint8)
+        for _ in range(8):
+            center = (int(rng.integers(0, w)), int(rng.integers(0, h)))
+            axes = (int(rng.integers(w // 20, w // 4)), int(rng.integers(h // 20, h // 4)))
+            color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+            cv2.ellipse(img, center, axes, float(rng.integers(0, 180)), 0, 360, color, -1)
+        ok, data = cv2.imencode(f".{fmt}", img)
+        if not ok:
+            raise RuntimeError(f"Failed to encode synthetic image as {fmt}")
+        corpus.append(data.tobytes())
+    return corpus
+
+
+class ImageServer:
+    def __init__(self, corpus: list[bytes], fmt: str = "jpg", host: str = "127.0.0.1", port: int = 0):
+        self.corpus = corpus
+        self.fmt = fmt
+        self.etags = [f'"{hashlib.sha1(data).hexdigest()}"' for data in corpus]
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, idx: int, suffix: str = "") -> str:
+        return f"{self.base_url}/images/{idx % len(self.corpus)}.{self.fmt}{suffix}"
+
+    def _handler(self):
+        server = self
+        content_type = "image/png" if self.fmt == "png" else "image/jpeg"
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                name = urlsplit(self.path).path.rsplit("/", 1)[-1].split(".", 1)[0]
+                try:
+                    idx = int(name)
+                    data, etag = server.corpus[idx], server.etags[idx]
+                except (ValueError, IndexError):
+                    self.send_error(404)
+                    return
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "ImageServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
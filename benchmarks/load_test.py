@@ -0,0 +1,419 @@
+"""Drive the inference endpoints at a fixed concurrency and report latency percentiles.
+
+Images come from a local synthetic image server. By default the app is served
+in-process (uvicorn on a free local port) with stub models; pass
+--yolo-weights/--sam3-weights to use real (tiny) weights, or --base-url to benchmark
+an already running server. A remote server never gets stub weights: it needs real
+weights to register, or --yolo-model/--sam3-model naming models it already serves
+(those are left in place, and the export scenario is skipped for them). Results are
+written as JSON so runs can be compared with --baseline.
+
+Usage:
+    python -m benchmarks.load_test --requests 200 --concurrency 16 --output run.json
+    python -m benchmarks.load_test --yolo-weights yolo11n.pt --scenarios yolo-annotate
+    python -m benchmarks.load_test --base-url http://127.0.0.1:8002 --yolo-model coco --sam3-model sam3 \\
+        --baseline run.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from urllib.parse import quote
+
+import httpx
+import numpy as np
+import websockets
+
+from benchmarks.image_server import ImageServer, make_corpus
+
+NDJSON = {"accept": "application/x-ndjson"}
+MSGPACK = {"accept": "application/msgpack"}
+JOB_POLL_INTERVAL = 0.02
+SESSION_PROMPTS = 4
+
+# A runner performs one logical request (possibly several round trips) and returns its status.
+Runner = Callable[[httpx.AsyncClient, str, Optional[dict], dict], Awaitable[str]]
+
+
+class Scenario:
+    def __init__(self, name: str, kind: Optional[str], method: str, path: str,
+                 body: Optional[Callable[[int], dict]] = None, headers: Optional[dict] = None,
+                 images: int = 1, runner: Optional[Runner] = None, mutates: bool = False):
+        self.name = name
+        self.kind = kind
+        self.method = method
+        self.path = path
+        self.body = body
+        self.headers = headers or {}
+        self.images = images
+        self.runner = runner
+        self.mutates = mutates
+
+
+async def run_job(client: httpx.AsyncClient, path: str, body: Optional[dict], headers: dict) -> str:
+    """Submit a job, poll it to a terminal state, read its results and delete it."""
+    response = await client.post(path, json=body, headers=headers)
+    if response.status_code != 202:
+        return str(response.status_code)
+    job_id = response.json()["id"]
+    try:
+        while True:
+            response = await client.get(f"/jobs/{job_id}")
+            if response.status_code != 200:
+                return str(response.status_code)
+            status = response.json()["status"]
+            if status not in ("queued", "running"):
+                break
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+        if status != "completed":
+            return f"job-{status}"
+        response = await client.get(f"/jobs/{job_id}/results", headers=headers)
+        await response.aread()
+        return str(response.status_code)
+    finally:
+        await client.delete(f"/jobs/{job_id}")
+
+
+async def run_session(client: httpx.AsyncClient, path: str, body: Optional[dict], headers: dict) -> str:
+    """Open a SAM3 WebSocket session, send a few box prompts and close it."""
+    url = str(client.base_url.copy_with(scheme="ws" if client.base_url.scheme == "http" else "wss"))
+    url = url.rstrip("/") + f"{path}?image_url={quote(body['image_url'], safe='')}"
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            ready = json.loads(await ws.recv())
+            if ready["type"] != "ready":
+                return str(ready.get("status", ready["type"]))
+            for n, bbox in enumerate(body["prompts"]):
+                await ws.send(json.dumps({"request_id": str(n), "prompt_type": "bbox", "bboxes": bbox}))
+                reply = json.loads(await ws.recv())
+                if reply["type"] != "result":
+                    return str(reply.get("status", reply["type"]))
+    except (OSError, websockets.WebSocketException) as exc:
+        return type(exc).__name__
+    return "200"
+
+
+def build_scenarios(urls: Callable[[int, int], list[str]], batch: int) -> list[Scenario]:
+    bbox = [40, 40, 360, 360]
+    yolo_body = lambda i: {"image_urls": urls(i, batch), "conf_threshold": 0.25}
+    batch_body = lambda i: {"image_urls": urls(i, batch), "text_prompts": ["object"], "class_name": "object"}
+    session_body = lambda i: {
+        "image_url": urls(i, 1)[0],
+        "prompts": [[40 + 10 * n, 40 + 10 * n, 360, 360] for n in range(SESSION_PROMPTS)],
+    }
+    return [
+        Scenario("health", None, "GET", "/health"),
+        Scenario("metrics", None, "GET", "/metrics"),
+        Scenario("yolo-list", None, "GET", "/yolo-models"),
+        Scenario("yolo-annotate", "yolo", "POST", "/yolo-models/{yolo}/annotate", yolo_body, images=batch),
+        Scenario("yolo-annotate-ndjson", "yolo", "POST", "/yolo-models/{yolo}/annotate", yolo_body, NDJSON, batch),
+        Scenario("yolo-annotate-msgpack", "yolo", "POST", "/yolo-models/{yolo}/annotate", yolo_body, MSGPACK, batch),
+        Scenario("sam3-list", None, "GET", "/sam3-models"),
+        Scenario("sam3-annotate", "sam3", "POST", "/sam3-models/{sam3}/annotate",
+                 lambda i: {"image_url": urls(i, 1)[0], "prompt_type": "bbox", "bboxes": bbox}),
+        Scenario("sam3-annotate-rle", "sam3", "POST", "/sam3-models/{sam3}/annotate",
+                 lambda i: {"image_url": urls(i, 1)[0], "prompt_type": "bbox", "bboxes": bbox, "mask_format": "rle"}),
+        Scenario("sam3-concept", "sam3", "POST", "/sam3-models/{sam3}/concept",
+                 lambda i: {"image_url": urls(i, 1)[0], "text_prompts": ["object", "shape"]}),
+        Scenario("sam3-concept-batch", "sam3", "POST", "/sam3-models/{sam3}/concept-batch", batch_body, images=batch),
+        Scenario("sam3-concept-batch-ndjson", "sam3", "POST", "/sam3-models/{sam3}/concept-batch",
+                 batch_body, NDJSON, batch),
+        Scenario("sam3-session", "sam3", "WS", "/sam3-models/{sam3}/session", session_body, runner=run_session),
+        Scenario("yolo-annotate-job", "yolo", "POST", "/yolo-models/{yolo}/jobs", yolo_body,
+                 images=batch, runner=run_job),
+        Scenario("sam3-concept-batch-job", "sam3", "POST", "/sam3-models/{sam3}/concept-batch/jobs", batch_body,
+                 images=batch, runner=run_job),
+        # Last: it rewrites the model's backends, which the annotate scenarios above would pick up.
+        Scenario("yolo-export", "yolo", "POST", "/yolo-models/{yolo}/export",
+                 lambda i: {"formats": ["torchscript"]}, mutates=True),
+    ]
+
+
+def select_scenarios(scenarios: list[Scenario], names: Optional[str]) -> list[Scenario]:
+    if not names:
+        return scenarios
+    wanted = set(names.split(","))
+    return [s for s in scenarios if s.name in wanted]
+
+
+class RssSampler:
+    """Polls /metrics for process_resident_memory_bytes and keeps the peak."""
+
+    def __init__(self, client: httpx.AsyncClient, interval: float):
+        self.client = client
+        self.interval = interval
+        self.peak = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def sample(self) -> int:
+        try:
+            response = await self.client.get("/metrics")
+        except httpx.HTTPError:
+            return 0
+        for line in response.text.splitlines():
+            if line.startswith("process_resident_memory_bytes"):
+                value = int(float(line.split()[-1]))
+                self.peak = max(self.peak, value)
+                return value
+        return 0
+
+    async def _run(self) -> None:
+        while True:
+            await self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self.peak = 0
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> int:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        await self.sample()
+        return self.peak
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, models: dict, requests: int,
+                       concurrency: int, warmup: int, sampler: RssSampler) -> dict:
+    path = scenario.path.format(**models)
+    counter = iter(range(warmup + requests))
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+
+    async def send(i: int) -> None:
+        body = scenario.body(i) if scenario.body else None
+        start = time.perf_counter()
+        try:
+            if scenario.runner:
+                status = await scenario.runner(client, path, body, scenario.headers)
+            else:
+                response = await client.request(scenario.method, path, json=body, headers=scenario.headers)
+                await response.aread()
+                status = str(response.status_code)
+        except httpx.HTTPError as exc:
+            status = type(exc).__name__
+        elapsed = time.perf_counter() - start
+        if i < warmup:
+            return
+        if status == "200":
+            latencies.append(elapsed)
+        else:
+            errors[status] = errors.get(status, 0) + 1
+
+    async def worker() -> None:
+        for i in counter:
+            await send(i)
+
+    for i in range(warmup):
+        await send(next(counter))
+
+    sampler.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+    peak_rss = await sampler.stop()
+
+    lat_ms = np.array(latencies) * 1000
+    ok = len(latencies)
+    return {
+        "requests": requests,
+        "ok": ok,
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "throughput_rps": ok / duration if duration else 0.0,
+        "throughput_images_per_s": ok * scenario.images / duration if duration else 0.0,
+        "latency_ms": {
+            "mean": float(lat_ms.mean()) if ok else None,
+            "p50": float(np.percentile(lat_ms, 50)) if ok else None,
+            "p95": float(np.percentile(lat_ms, 95)) if ok else None,
+            "p99": float(np.percentile(lat_ms, 99)) if ok else None,
+            "max": float(lat_ms.max()) if ok else None,
+        },
+        "peak_rss_bytes": peak_rss or None,
+    }
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    deltas = {}
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        entry = {}
+        if base["throughput_rps"]:
+            entry["throughput_ratio"] = result["throughput_rps"] / base["throughput_rps"]
+        for pct in ("p50", "p95", "p99"):
+            if result["latency_ms"][pct] and base["latency_ms"][pct]:
+                entry[f"{pct}_ratio"] = result["latency_ms"][pct] / base["latency_ms"][pct]
+        if result["peak_rss_bytes"] and base["peak_rss_bytes"]:
+            entry["peak_rss_ratio"] = result["peak_rss_bytes"] / base["peak_rss_bytes"]
+        deltas[name] = entry
+    return deltas
+
+
+async def register_models(client: httpx.AsyncClient, args, kinds: set[str]) -> tuple[dict, set[str]]:
+    """Register a throwaway model per kind, or use the existing ones named on the command line.
+
+    Returns the model names and the kinds this harness created (and must delete).
+    """
+    suffix = uuid.uuid4().hex[:8]
+    models = {"yolo": args.yolo_model or f"bench-yolo-{suffix}", "sam3": args.sam3_model or f"bench-sam3-{suffix}"}
+    created = set()
+    if "yolo" in kinds and not args.yolo_model:
+        weights = Path(args.yolo_weights).read_bytes() if args.yolo_weights else b"stub"
+        weights_name = Path(args.yolo_weights).name if args.yolo_weights else "weights.pt"
+        response = await client.post("/yolo-models", data={"name": models["yolo"]}, files={
+            "weights_file": (weights_name, weights),
+            "classes_file": ("classes.txt", b"object\nshape\nbackground\n"),
+        })
+        response.raise_for_status()
+        created.add("yolo")
+    if "sam3" in kinds and not args.sam3_model:
+        weights = Path(args.sam3_weights).read_bytes() if args.sam3_weights else b"stub"
+        response = await client.post("/sam3-models", data={"name": models["sam3"]}, files={
+            "weights_file": ("sam3.pt", weights),
+        })
+        response.raise_for_status()
+        created.add("sam3")
+    for kind in kinds - created:
+        response = await client.get(f"/{kind}-models/{models[kind]}")
+        response.raise_for_status()
+    return models, created
+
+
+async def unregister_models(client: httpx.AsyncClient, models: dict, created: set[str]) -> None:
+    if "yolo" in created:
+        await client.delete(f"/yolo-models/{models['yolo']}")
+    if "sam3" in created:
+        await client.delete(f"/sam3-models/{models['sam3']}")
+
+
+@asynccontextmanager
+async def serve_in_process(args) -> AsyncIterator[str]:
+    """Serve the app with uvicorn on a free local port, so WebSocket scenarios work too."""
+    import uvicorn
+
+    from main import app
+
+    if not args.yolo_weights and not args.sam3_weights:
+        from benchmarks.stub_models import install_stub_models
+
+        install_stub_models()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+            raise RuntimeError("In-process server exited during startup")
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    server = ImageServer(make_corpus(args.images, args.seed, args.image_format), args.image_format).start()
+    unique = uuid.uuid4().hex[:8]
+
+    def urls(i: int, count: int) -> list[str]:
+        if args.unique_urls:
+            return [server.url(i * count + j, f"?r={unique}-{i}-{j}") for j in range(count)]
+        return [server.url(i * count + j) for j in range(count)]
+
+    scenarios = select_scenarios(build_scenarios(urls, args.images_per_request), args.scenarios)
+    kinds = {s.kind for s in scenarios if s.kind}
+
+    async with AsyncExitStack() as stack:
+        base_url = args.base_url or await stack.enter_async_context(serve_in_process(args))
+        client = await stack.enter_async_context(httpx.AsyncClient(base_url=base_url, timeout=args.timeout))
+
+        models, created = await register_models(client, args, kinds)
+        try:
+            sampler = RssSampler(client, args.rss_interval)
+            results = {}
+            for scenario in scenarios:
+                if scenario.mutates and scenario.kind not in created:
+                    print(f"Skipping {scenario.name}: it would modify existing model {models[scenario.kind]}",
+                          file=sys.stderr)
+                    continue
+                results[scenario.name] = await run_scenario(
+                    client, scenario, models, args.requests, args.concurrency, args.warmup, sampler,
+                )
+        finally:
+            await unregister_models(client, models, created)
+            server.stop()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": "remote" if args.base_url else ("weights" if args.yolo_weights or args.sam3_weights else "stub"),
+            "args": vars(args),
+        },
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=None, help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--yolo-weights", default=None)
+    parser.add_argument("--sam3-weights", default=None)
+    parser.add_argument("--yolo-model", default=None, help="Use this already registered YOLO model instead")
+    parser.add_argument("--sam3-model", default=None, help="Use this already registered SAM3 model instead")
+    parser.add_argument("--scenarios", default=None, help="Comma-separated scenario names (default: all)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=4)
+    parser.add_argument("--images", type=int, default=32, help="Synthetic corpus size")
+    parser.add_argument("--images-per-request", type=int, default=4)
+    parser.add_argument("--image-format", choices=("jpg", "png"), default="jpg")
+    parser.add_argument("--unique-urls", action="store_true", help="Defeat the image cache with unique URLs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--rss-interval", type=float, default=0.25)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None, help="Previous JSON output to compare against")
+    args = parser.parse_args()
+    if args.base_url:
+        kinds = {s.kind for s in select_scenarios(build_scenarios(lambda i, n: [], 0), args.scenarios) if s.kind}
+        for kind in sorted(kinds):
+            if not getattr(args, f"{kind}_weights") and not getattr(args, f"{kind}_model"):
+                parser.error(f"--base-url needs --{kind}-weights or --{kind}-model (stub weights are in-process only)")
+    elif args.yolo_model or args.sam3_model:
+        parser.error("--yolo-model/--sam3-model name models on a --base-url server")
+
+    report = asyncio.run(run(args))
+    if args.baseline:
+        report["baseline"] = args.baseline
+        report["comparison"] = compare(report, json.loads(Path(args.baseline).read_text()))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
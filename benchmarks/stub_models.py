@@ -0,0 +1,156 @@
+"""Stub YOLO/SAM3 models with the same interface the services use.
+
+They return deterministic detections and masks after a fixed simulated compute
+time, so the serving overhead (fetch, decode, batching, encoding, serialization)
+can be measured without real weights or a GPU.
+"""
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+STUB_LATENCY = {"yolo": 0.005, "sam3_image": 0.02, "sam3_prompt": 0.005}
+
+
+class StubTensor:
+    def __init__(self, data):
+        self._data = np.asarray(data)
+
+    def cpu(self) -> "StubTensor":
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self._data
+
+    def tolist(self) -> list:
+        return self._data.tolist()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self):
+        return (StubTensor(row) for row in self._data)
+
+    def __getitem__(self, idx):
+        return StubTensor(self._data[idx])
+
+
+class StubBoxes:
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = StubTensor(xyxy)
+        self.conf = StubTensor(conf)
+        self.cls = StubTensor(cls)
+
+
+class StubMasks:
+    def __init__(self, data: np.ndarray):
+        self.data = StubTensor(data)
+        self.orig_shape = data.shape[1:]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def xy(self) -> list[np.ndarray]:
+        polygons = []
+        for mask in self.data.numpy():
+            contours, _ = cv2.findContours(mask.astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+            if contours:
+                polygons.append(max(contours, key=cv2.contourArea).reshape(-1, 2).astype(np.float32))
+            else:
+                polygons.append(np.zeros((0, 2), dtype=np.float32))
+        return polygons
+
+
+class StubResult:
+    def __init__(self, boxes: StubBoxes, masks=None, speed=None):
+        self.boxes = boxes
+        self.masks = masks
+        self.speed = speed or {}
+
+
+def _stub_boxes(shape, count: int, seed: int) -> StubBoxes:
+    h, w = shape[:2]
+    rng = np.random.default_rng(seed)
+    x1 = rng.uniform(0, w * 0.7, count)
+    y1 = rng.uniform(0, h * 0.7, count)
+    xyxy = np.stack([x1, y1, x1 + rng.uniform(8, w * 0.3, count), y1 + rng.uniform(8, h * 0.3, count)], axis=1)
+    return StubBoxes(xyxy.astype(np.float32), rng.uniform(0.3, 0.99, count).astype(np.float32),
+                     rng.integers(0, 3, count).astype(np.float32))
+
+
+def _stub_masks(shape, boxes: StubBoxes) -> StubMasks:
+    h, w = shape[:2]
+    data = np.zeros((len(boxes.xyxy), h, w), dtype=np.uint8)
+    for mask, (x1, y1, x2, y2) in zip(data, boxes.xyxy.numpy()):
+        center = (int((x1 + x2) / 2), int((y1 + y2) / 2))
+        axes = (max(int((x2 - x1) / 2), 1), max(int((y2 - y1) / 2), 1))
+        cv2.ellipse(mask, center, axes, 0, 0, 360, 1, -1)
+    return StubMasks(data.astype(np.float32))
+
+
+class StubYOLO:
+    detections = 5
+
+    def __init__(self, weights: str, *args, **kwargs):
+        self.weights = weights
+        self.model = None
+
+    def predict(self, source, **kwargs) -> list[StubResult]:
+        images = source if isinstance(source, list) else [source]
+        start = time.perf_counter()
+        time.sleep(STUB_LATENCY["yolo"] * len(images))
+        per_image_ms = (time.perf_counter() - start) * 1000 / len(images)
+        speed = {"preprocess": 0.0, "inference": per_image_ms, "postprocess": 0.0}
+        return [StubResult(_stub_boxes(img.shape, self.detections, i), speed=speed) for i, img in enumerate(images)]
+
+    def export(self, format: str, **kwargs) -> str:
+        path = Path(self.weights).with_suffix(f".{format}")
+        path.write_bytes(b"stub")
+        return str(path)
+
+
+class StubSAM3Predictor:
+    detections = 1
+
+    def __init__(self, overrides=None):
+        self.overrides = overrides or {}
+        self.model = None
+        self.features = None
+        self.image_shape = None
+
+    def setup_model(self, model=None, verbose=False) -> None:
+        pass
+
+    def setup_source(self, img) -> None:
+        self.image_shape = img.shape
+
+    def set_image(self, img) -> None:
+        time.sleep(STUB_LATENCY["sam3_image"])
+        self.setup_source(img)
+        self.features = {"image_embed": np.zeros((256, 64, 64), dtype=np.float16)}
+
+    def _result(self, seed: int) -> StubResult:
+        time.sleep(STUB_LATENCY["sam3_prompt"])
+        boxes = _stub_boxes(self.image_shape, self.detections, seed)
+        return StubResult(boxes, masks=_stub_masks(self.image_shape, boxes))
+
+    def __call__(self, **kwargs) -> list[StubResult]:
+        return [self._result(0)]
+
+
+class StubSAM3SemanticPredictor(StubSAM3Predictor):
+    detections = 4
+
+    def __call__(self, text=None, **kwargs) -> list[StubResult]:
+        return [self._result(i) for i in range(len(text or []))]
+
+
+def install_stub_models() -> None:
+    from app.services import sam3_service, yolo_export, yolo_service
+
+    yolo_service.YOLO = StubYOLO
+    yolo_export.YOLO = StubYOLO
+    sam3_service.SAM3Predictor = StubSAM3Predictor
+    sam3_service.SAM3SemanticPredictor = StubSAM3SemanticPredictor
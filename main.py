@@ -1,11 +1,38 @@
-from fastapi import FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from pathlib import Path
 
-from app.routers import health_router, yolo_router, sam3_router
+from app.routers import health_router, yolo_router, sam3_router, jobs_router, metrics_router
+from app.services.image_service import ImageFetcher
+from app.services.inference_executor import InferenceExecutor
+from app.services.job_service import JobService
+from app.services.metrics import label_endpoint
+from app.services.preload import preload_models
+from app.services.result_store import result_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await InferenceExecutor.start()
+    await asyncio.to_thread(result_store.open)
+    await preload_models()
+    await JobService.start()
+    yield
+    await JobService.stop()
+    await ImageFetcher.close()
+    InferenceExecutor.shutdown()
+    result_store.close()
 
-app = FastAPI(title="YOLO & SAM Inference Backend")
+
+app = FastAPI(
+    title="YOLO & SAM Inference Backend",
+    lifespan=lifespan,
+    dependencies=[Depends(label_endpoint)],
+)
 
 class PrivateNetworkMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -26,6 +53,8 @@ app.add_middleware(PrivateNetworkMiddleware)
 app.include_router(health_router)
 app.include_router(yolo_router)
 app.include_router(sam3_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     import uvicorn
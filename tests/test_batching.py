@@ -0,0 +1,127 @@
+import asyncio
+import contextvars
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.batching import MicroBatcher
+from app.services.inference_executor import InferenceExecutor
+
+endpoint = contextvars.ContextVar("endpoint", default=None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_lanes():
+    yield
+    InferenceExecutor.shutdown()
+
+
+def make_batcher(run_batch, **kwargs) -> MicroBatcher:
+    options = dict(max_batch_size=4, max_latency=0.02, max_queue=8, idle_timeout=0.1)
+    options.update(kwargs)
+    return MicroBatcher("yolo:test", run_batch, **options)
+
+
+def test_concurrent_submissions_share_a_batch():
+    batches = []
+
+    def run_batch(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    batcher = make_batcher(run_batch)
+
+    async def run():
+        return await asyncio.gather(batcher.submit_many([1]), batcher.submit_many([2, 3]), batcher.submit_many([4]))
+
+    assert asyncio.run(run()) == [[10], [20, 30], [40]]
+    assert batches == [[1, 2, 3, 4]]
+    assert batcher.stats()["batches"] == 1
+
+
+def test_partial_batch_is_dispatched_after_max_latency():
+    batcher = make_batcher(lambda items: items, max_latency=0.01)
+    assert asyncio.run(batcher.submit_many(["only"])) == ["only"]
+
+
+def test_full_queue_rejects_with_retry_after():
+    def run_batch(items):
+        return items
+
+    batcher = make_batcher(run_batch, max_queue=2, max_latency=0.05)
+
+    async def run():
+        first = asyncio.ensure_future(batcher.submit_many([1, 2]))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as rejected:
+            await batcher.submit_many([3])
+        await first
+        return rejected.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 503 and "Retry-After" in error.headers
+
+
+def test_batch_failure_reaches_every_item():
+    def run_batch(items):
+        raise RuntimeError("predict failed")
+
+    batcher = make_batcher(run_batch)
+
+    async def run():
+        return await asyncio.gather(batcher.submit_many([1]), batcher.submit_many([2]))
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for [result] in results)
+
+
+def test_idle_worker_stops_and_reports():
+    idle = []
+    batcher = make_batcher(lambda items: items, idle_timeout=0.01, on_idle=idle.append)
+
+    async def run():
+        await batcher.submit_many([1])
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert idle == [batcher]
+
+
+def test_submission_larger_than_the_queue_is_split():
+    batches = []
+
+    def run_batch(items):
+        batches.append(list(items))
+        return items
+
+    batcher = make_batcher(run_batch, max_queue=2)
+    assert asyncio.run(batcher.submit_many([1, 2, 3, 4, 5])) == [1, 2, 3, 4, 5]
+    assert all(len(batch) <= 2 for batch in batches)
+
+
+def test_worker_does_not_inherit_the_first_callers_context():
+    batcher = make_batcher(lambda items: [endpoint.get() for _ in items])
+
+    async def submit(label):
+        endpoint.set(label)
+        return await batcher.submit_many([label])
+
+    async def run():
+        return await asyncio.gather(submit("annotate"), submit("jobs"))
+
+    assert asyncio.run(run()) == [[None], [None]]
+
+
+def test_batches_run_as_admitted_calls_on_a_reserved_lane():
+    batcher = make_batcher(lambda items: items)
+
+    async def run():
+        InferenceExecutor.get_lane("yolo:test").max_pending = 1
+        reservation = InferenceExecutor.reserve("yolo:test")
+        try:
+            return await batcher.submit_many([1, 2])
+        finally:
+            InferenceExecutor.release(reservation)
+
+    assert asyncio.run(run()) == [1, 2]
+    assert InferenceExecutor.stats()["yolo:test"]["pending"] == 0
@@ -0,0 +1,69 @@
+import numpy as np
+
+from app.services.cache import LRUCache, tensor_nbytes
+
+
+def test_get_counts_hits_and_misses():
+    cache = LRUCache(100)
+    cache.put("a", 1, 10)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = LRUCache(100)
+    cache.put("a", "A", 40)
+    cache.put("b", "B", 40)
+    cache.get("a")
+    cache.put("c", "C", 40)
+
+    assert "b" not in cache
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.current_bytes == 80
+    assert cache.stats()["evictions"] == 1
+
+
+def test_peek_does_not_refresh_recency():
+    cache = LRUCache(100)
+    cache.put("a", "A", 50)
+    cache.put("b", "B", 50)
+    cache.peek("a")
+    cache.put("c", "C", 50)
+    assert "a" not in cache and "b" in cache
+
+
+def test_oversized_entry_is_rejected_and_replaces_nothing():
+    cache = LRUCache(100)
+    cache.put("a", "old", 10)
+    assert not cache.put("a", "new", 101)
+    assert "a" not in cache
+    assert cache.current_bytes == 0
+
+
+def test_replacing_an_entry_updates_its_size():
+    cache = LRUCache(100)
+    cache.put("a", "A", 30)
+    cache.put("a", "A2", 60)
+    assert len(cache) == 1 and cache.current_bytes == 60
+
+
+def test_pop_and_pop_matching_invalidate():
+    cache = LRUCache(1000)
+    for kind in ("visual", "concept"):
+        for model in ("m1", "m2"):
+            cache.put((kind, model, "digest"), object(), 10)
+
+    assert cache.pop(("visual", "m1", "digest")) is not None
+    assert cache.pop(("visual", "m1", "digest")) is None
+    assert cache.pop_matching(lambda key: key[1] == "m2") == 2
+    assert len(cache) == 1 and ("concept", "m1", "digest") in cache
+    assert cache.current_bytes == 10
+
+    cache.clear()
+    assert len(cache) == 0 and cache.current_bytes == 0
+
+
+def test_tensor_nbytes_walks_containers():
+    features = {"image_embed": np.zeros((2, 4), dtype=np.float16), "high_res": [np.zeros(3, dtype=np.uint8)]}
+    assert tensor_nbytes(features) == 2 * 4 * 2 + 3
@@ -0,0 +1,104 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.inference_executor import InferenceExecutor
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_lanes():
+    yield
+    InferenceExecutor.shutdown()
+
+
+def test_runs_off_the_event_loop_with_the_callers_context():
+    async def run():
+        request_id.set("req-1")
+        return await InferenceExecutor.run("yolo:a", lambda: (threading.current_thread().name, request_id.get()))
+
+    thread, value = asyncio.run(run())
+    assert thread.startswith("infer-yolo:a")
+    assert value == "req-1"
+
+
+def test_full_lane_rejects_with_retry_after():
+    release = threading.Event()
+
+    async def run():
+        lane = InferenceExecutor.get_lane("yolo:a")
+        lane.max_pending = 2
+        running = [asyncio.ensure_future(InferenceExecutor.run("yolo:a", release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as rejected:
+            await InferenceExecutor.run("yolo:a", lambda: None)
+        # Other lanes are not affected by a saturated one.
+        other = await InferenceExecutor.run("yolo:b", lambda: "ok")
+        release.set()
+        await asyncio.gather(*running)
+        return rejected.value, other, lane.stats()
+
+    error, other, stats = asyncio.run(run())
+    assert error.status_code == 503
+    assert "Retry-After" in error.headers
+    assert other == "ok"
+    assert stats["pending"] == 0
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+
+
+def test_failures_are_counted_and_raised():
+    def boom():
+        raise RuntimeError("predict failed")
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await InferenceExecutor.run("yolo:a", boom)
+        return InferenceExecutor.stats()["yolo:a"]
+
+    stats = asyncio.run(run())
+    assert stats["failed"] == 1
+    assert stats["pending"] == 0
+
+
+def test_reservation_admits_once_and_releases_once():
+    async def run():
+        lane = InferenceExecutor.get_lane("yolo:a")
+        lane.max_pending = 1
+        reservation = InferenceExecutor.reserve("yolo:a")
+        with pytest.raises(HTTPException) as rejected:
+            await InferenceExecutor.run("yolo:a", lambda: None)
+        # Calls made on behalf of the reserved request are already admitted.
+        value = await InferenceExecutor.run("yolo:a", lambda: "ok", admitted=True)
+        InferenceExecutor.release(reservation)
+        InferenceExecutor.release(reservation)
+        return rejected.value, value, lane.pending
+
+    error, value, pending = asyncio.run(run())
+    assert error.status_code == 503
+    assert value == "ok"
+    assert pending == 0
+
+
+def test_unread_stream_gives_its_reservation_back():
+    lane = InferenceExecutor.get_lane("yolo:a")
+
+    def open_stream():
+        reservation = InferenceExecutor.reserve("yolo:a")
+
+        async def items():
+            try:
+                yield 1
+            finally:
+                InferenceExecutor.release(reservation)
+
+        return items()
+
+    stream = open_stream()
+    assert lane.pending == 1
+    del stream
+    assert lane.pending == 0
@@ -0,0 +1,192 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.sam3 import Sam3ConceptBatchRequest
+from app.schemas.yolo import AutoAnnotateRequest
+from app.services import job_service, sam3_service
+from app.services.inference_executor import InferenceExecutor
+from app.services.job_service import Job, JobService
+from app.services.sam3_service import Sam3Service
+
+
+class FakeYolo:
+    """Stands in for YoloService.stream_inference; ``outcomes`` maps a URL to a list of results to hand out."""
+
+    def __init__(self, outcomes=None):
+        self.outcomes = outcomes or {}
+        self.calls = []
+        self.streams = []
+        self.closed = 0
+
+    async def stream_inference(self, model_name, payload, return_exceptions=False):
+        self.calls.append(list(payload.image_urls))
+
+        async def items():
+            try:
+                for idx, url in enumerate(payload.image_urls):
+                    queued = self.outcomes.get(url)
+                    value = queued.pop(0) if queued else [{"label": url}]
+                    await asyncio.sleep(0.01)
+                    yield idx, value
+            finally:
+                self.closed += 1
+
+        # Kept alive here, so only an explicit aclose() runs the cleanup.
+        self.streams.append(items())
+        return self.streams[-1]
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_service, "JOBS_DIR", tmp_path)
+    monkeypatch.setattr(job_service, "JOB_CHUNK_SIZE", 2)
+    monkeypatch.setattr(job_service, "INFERENCE_RETRY_AFTER", 0)
+    monkeypatch.setattr(JobService, "_jobs", {})
+    fake = FakeYolo()
+    monkeypatch.setattr(job_service.YoloService, "stream_inference", fake.stream_inference)
+    return fake
+
+
+@pytest.fixture
+def concept(jobs, monkeypatch):
+    """Runs the real concept stream; every fetch raises the next exception queued for its URL."""
+    outcomes, calls = {}, []
+
+    async def fetch_image(url):
+        calls.append(url)
+        raise outcomes[url].pop(0)
+
+    monkeypatch.setattr(sam3_service, "fetch_image", fetch_image)
+    monkeypatch.setattr(Sam3Service, "lane", classmethod(lambda cls, kind, name: f"{kind}:{name}"))
+    monkeypatch.setattr(Sam3Service, "load_concept_predictor", classmethod(lambda cls, name: None))
+    yield outcomes, calls
+    InferenceExecutor.shutdown()
+
+
+def urls(n):
+    return [f"http://images/{i}.jpg" for i in range(n)]
+
+
+async def wait_for(job_id, statuses=("completed", "failed")):
+    for _ in range(500):
+        if JobService.get(job_id).status in statuses:
+            return JobService.get(job_id)
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job stuck in {JobService.get(job_id).status}")
+
+
+def run_job(payload, kind="yolo-annotate"):
+    async def run():
+        await JobService.start()
+        try:
+            info = JobService.submit(kind, "m", payload)
+            return await wait_for(info.id)
+        finally:
+            await JobService.stop()
+
+    return asyncio.run(run())
+
+
+def test_job_runs_every_image_in_chunks(jobs):
+    info = run_job(AutoAnnotateRequest(image_urls=urls(5)))
+
+    assert info.status == "completed"
+    assert info.completed == 5 and info.failed == 0
+    assert jobs.calls == [urls(5)[0:2], urls(5)[2:4], urls(5)[4:5]]
+    page = JobService.results(info.id, 0, 10)
+    assert [item.index for item in page.items] == [0, 1, 2, 3, 4]
+    assert page.items[3].result == [{"label": urls(5)[3]}]
+
+
+def test_backpressure_is_retried_and_errors_are_recorded(jobs):
+    busy = HTTPException(status_code=503, detail="Inference queue is full")
+    jobs.outcomes = {
+        urls(3)[1]: [busy, busy],
+        urls(3)[2]: [HTTPException(status_code=400, detail="Failed to load image from URL")],
+    }
+    info = run_job(AutoAnnotateRequest(image_urls=urls(3)))
+
+    assert info.status == "completed"
+    assert info.completed == 3 and info.failed == 1
+    items = {item.index: item for item in JobService.results(info.id, 0, 10).items}
+    assert items[1].result == [{"label": urls(3)[1]}] and items[1].error is None
+    assert items[2].error == "Failed to load image from URL" and items[2].status_code == 400
+    assert sum(urls(3)[1] in call for call in jobs.calls) == 3
+
+
+def test_interrupted_job_resumes_where_it_stopped(jobs, tmp_path):
+    payload = AutoAnnotateRequest(image_urls=urls(4))
+    directory = tmp_path / "interrupted"
+    directory.mkdir()
+    job = Job("interrupted", "yolo-annotate", "m", payload, directory)
+    job.status = "running"
+    job.save()
+    job.append_result(0, {"index": 0, "result": [{"label": "before restart"}]})
+    job.append_result(2, {"index": 2, "result": [{"label": "before restart"}]})
+    with job.results_path.open("ab") as f:
+        f.write(b'{"index": 1, "res')  # torn write from the crash
+
+    async def run():
+        await JobService.start()
+        try:
+            return await wait_for("interrupted")
+        finally:
+            await JobService.stop()
+
+    info = asyncio.run(run())
+
+    assert info.status == "completed" and info.completed == 4
+    assert jobs.calls == [[urls(4)[1], urls(4)[3]]]
+    lines = [json.loads(line) for line in job.results_path.read_text().splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+    assert JobService.results("interrupted", 0, 4).items[0].result == [{"label": "before restart"}]
+
+
+def test_cancelled_job_closes_its_stream(jobs):
+    async def run():
+        await JobService.start()
+        try:
+            info = JobService.submit("yolo-annotate", "m", AutoAnnotateRequest(image_urls=urls(2)))
+            job = JobService._jobs[info.id]
+            while not job.offsets:
+                await asyncio.sleep(0.001)
+            JobService.delete(info.id)
+            await asyncio.sleep(0.05)
+            return len(job.offsets), jobs.closed
+        finally:
+            await JobService.stop()
+
+    completed, closed = asyncio.run(run())
+
+    assert completed == 1
+    assert closed == 1
+    assert jobs.calls == [urls(2)]
+
+
+def concept_payload(image_urls):
+    return Sam3ConceptBatchRequest(image_urls=image_urls, text_prompts=["cat"], class_name="cat")
+
+
+def test_concept_job_retries_backpressure_and_records_errors(concept):
+    outcomes, calls = concept
+    failed = HTTPException(status_code=400, detail="Failed to load image from URL")
+    outcomes[urls(2)[0]] = [HTTPException(status_code=503, detail="Inference worker crashed"), failed]
+    outcomes[urls(2)[1]] = [failed]
+    info = run_job(concept_payload(urls(2)), "sam3-concept-batch")
+
+    assert info.status == "completed"
+    assert info.completed == 2 and info.failed == 2
+    items = JobService.results(info.id, 0, 10).items
+    assert [(item.error, item.status_code) for item in items] == [("Failed to load image from URL", 400)] * 2
+    assert calls.count(urls(2)[0]) == 2
+
+
+def test_concept_batch_response_keeps_empty_items_for_failed_images(concept):
+    outcomes, _ = concept
+    outcomes[urls(1)[0]] = [HTTPException(status_code=400, detail="Failed to load image from URL")]
+    response = asyncio.run(Sam3Service.concept_batch("m", concept_payload(urls(1))))
+
+    assert response.results[0].masks == [] and response.results[0].confidences == []
@@ -0,0 +1,71 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.mask_encoding import encode_bitmaps, encode_pngs, encode_rle, masks_to_numpy
+
+
+def decode_rle(size, counts) -> np.ndarray:
+    h, w = size
+    flat = np.zeros(h * w, dtype=bool)
+    position, value = 0, False
+    for run in counts:
+        flat[position:position + run] = value
+        position += run
+        value = not value
+    assert position == h * w
+    return flat.reshape(w, h).T
+
+
+def rle_fields(rle):
+    return rle.size, rle.counts
+
+
+@pytest.fixture
+def masks():
+    rng = np.random.default_rng(0)
+    batch = rng.random((4, 17, 23)) > 0.6
+    batch[1] = False
+    batch[2] = True
+    batch[3, :, :5] = True
+    return batch
+
+
+def test_rle_round_trip(masks):
+    rles = encode_rle(masks)
+    assert len(rles) == len(masks)
+    for mask, rle in zip(masks, rles):
+        size, counts = rle_fields(rle)
+        assert size == [17, 23]
+        assert sum(counts) == 17 * 23
+        np.testing.assert_array_equal(decode_rle(size, counts), mask)
+
+
+def test_rle_starts_with_a_zero_run(masks):
+    _, empty = rle_fields(encode_rle(masks)[1])
+    _, full = rle_fields(encode_rle(masks)[2])
+    assert empty == [17 * 23]
+    assert full == [0, 17 * 23]
+
+
+def test_rle_of_empty_batch():
+    assert encode_rle(np.zeros((0, 4, 4), dtype=bool)) == []
+
+
+def test_bitmap_round_trip(masks):
+    for mask, encoded in zip(masks, encode_bitmaps(masks)):
+        bits = np.unpackbits(np.frombuffer(base64.b64decode(encoded), dtype=np.uint8))
+        np.testing.assert_array_equal(bits[:mask.size].reshape(mask.shape).astype(bool), mask)
+
+
+def test_png_round_trip(masks):
+    for mask, encoded in zip(masks, encode_pngs(masks)):
+        png = cv2.imdecode(np.frombuffer(base64.b64decode(encoded), dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        np.testing.assert_array_equal(png > 0, mask)
+
+
+def test_masks_to_numpy_thresholds_and_selects():
+    data = np.array([[[0.2, 0.7]], [[0.9, 0.1]], [[0.6, 0.6]]])
+    np.testing.assert_array_equal(masks_to_numpy(data, keep=[0, 2]), [[[False, True]], [[True, True]]])
@@ -0,0 +1,14 @@
+import sys
+
+from app.services.metrics import process_rss_bytes
+
+
+def test_rss_falls_back_without_psutil(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    assert process_rss_bytes() > 0
+
+
+def test_rss_is_unknown_without_psutil_or_resource(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    monkeypatch.setitem(sys.modules, "resource", None)
+    assert process_rss_bytes() is None
@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+from app.services.model_registry import ModelRegistry, file_sha256, model_identity, model_lane
+
+
+def add_model(root, name, weights=b"weights", record_hash=True):
+    model_dir = root / name
+    model_dir.mkdir()
+    weights_path = model_dir / "model.pt"
+    weights_path.write_bytes(weights)
+    metadata = {"weights_file": "model.pt", "weights_size": len(weights)}
+    if record_hash:
+        metadata["weights_sha256"] = file_sha256(weights_path)
+    (model_dir / "metadata.json").write_text(json.dumps(metadata))
+    return weights_path
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(tmp_path, "*.pt", "metadata.json")
+
+
+def test_same_weights_share_identity_and_lane(tmp_path, registry):
+    add_model(tmp_path, "a")
+    add_model(tmp_path, "b")
+    add_model(tmp_path, "c", weights=b"other")
+    a, b, c = (registry.get(name) for name in "abc")
+
+    assert model_identity(a) == model_identity(b) == (f"sha256:{a.metadata['weights_sha256']}", None)
+    assert model_lane("yolo", a) == model_lane("yolo", b) != model_lane("yolo", c)
+    assert registry.is_shared(a) and not registry.is_shared(c)
+
+
+def test_legacy_models_are_keyed_by_name(tmp_path, registry):
+    add_model(tmp_path, "a", record_hash=False)
+    add_model(tmp_path, "b", record_hash=False)
+    a, b = registry.get("a"), registry.get("b")
+
+    assert model_identity(a) == ("a", a.version)
+    assert model_lane("sam3-visual", a) == "sam3-visual:a"
+    assert model_lane("sam3-visual", b) == "sam3-visual:b"
+    assert not registry.is_shared(a)
+
+
+def test_weights_rewritten_after_metadata_drop_the_recorded_hash(tmp_path, registry):
+    weights_path = add_model(tmp_path, "a")
+    record = registry.get("a")
+    assert record.content_addressed
+
+    metadata_mtime = (tmp_path / "a" / "metadata.json").stat().st_mtime_ns
+    weights_path.write_bytes(b"patched")
+    os.utime(weights_path, ns=(metadata_mtime + 10**9, metadata_mtime + 10**9))
+    record = registry.register("a")
+
+    assert not record.content_addressed
+    assert model_identity(record) == ("a", record.version)
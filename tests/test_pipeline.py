@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from app.services.pipeline import Finished, Stage, iterate_pipeline
+
+
+async def collect(items, stages, **kwargs) -> list:
+    return [pair async for pair in iterate_pipeline(items, stages, **kwargs)]
+
+
+def test_every_item_passes_every_stage_in_order():
+    calls = []
+
+    def stage(name):
+        async def fn(value):
+            calls.append((name, value))
+            return f"{value}>{name}"
+        return Stage(name, fn)
+
+    results = asyncio.run(collect(["a", "b", "c"], [stage("fetch"), stage("decode")]))
+
+    assert sorted(results) == [(0, "a>fetch>decode"), (1, "b>fetch>decode"), (2, "c>fetch>decode")]
+    for value in "abc":
+        assert calls.index(("fetch", value)) < calls.index(("decode", f"{value}>fetch"))
+
+
+def test_yields_in_completion_order():
+    async def slow_first(value):
+        await asyncio.sleep(0.05 if value == 0 else 0)
+        return value
+
+    results = asyncio.run(collect([0, 1, 2], [Stage("work", slow_first, concurrency=3)]))
+
+    assert [idx for idx, _ in results] == [1, 2, 0]
+
+
+def test_stages_overlap():
+    events = []
+
+    async def fetch(value):
+        await asyncio.sleep(0.01)
+        events.append(("fetched", value))
+        return value
+
+    async def infer(value):
+        await asyncio.sleep(0.05)
+        events.append(("inferred", value))
+        return value
+
+    asyncio.run(collect([0, 1], [Stage("fetch", fetch), Stage("infer", infer)]))
+
+    # Item 1 was fetched while item 0 was still in inference.
+    assert events.index(("fetched", 1)) < events.index(("inferred", 0))
+
+
+def test_slow_consumer_backs_up_earlier_stages():
+    fetched = []
+
+    async def fetch(value):
+        fetched.append(value)
+        return value
+
+    async def run():
+        stream = iterate_pipeline(range(50), [Stage("fetch", fetch), Stage("encode", fetch)], queue_size=1)
+        await stream.__anext__()
+        await asyncio.sleep(0.05)
+        ahead = len(fetched)
+        await stream.aclose()
+        return ahead
+
+    # Bounded by the queues between stages and one item held by each worker, not the 50 items.
+    assert asyncio.run(run()) <= 8
+
+
+def test_finished_skips_remaining_stages():
+    later = []
+
+    async def lookup(value):
+        return Finished(f"cached-{value}") if value % 2 else value
+
+    async def infer(value):
+        later.append(value)
+        return f"inferred-{value}"
+
+    results = dict(asyncio.run(collect([0, 1, 2, 3], [Stage("lookup", lookup), Stage("infer", infer)])))
+
+    assert results == {0: "inferred-0", 1: "cached-1", 2: "inferred-2", 3: "cached-3"}
+    assert sorted(later) == [0, 2]
+
+
+def test_exception_becomes_that_items_result():
+    later = []
+
+    async def fetch(value):
+        if value == 1:
+            raise ValueError("bad image")
+        return value
+
+    async def infer(value):
+        later.append(value)
+        return value
+
+    results = dict(asyncio.run(collect([0, 1, 2], [Stage("fetch", fetch), Stage("infer", infer)])))
+
+    assert isinstance(results[1], ValueError)
+    assert results[0] == 0 and results[2] == 2
+    assert sorted(later) == [0, 2]
+
+
+def test_closing_the_stream_cancels_workers():
+    started = asyncio.Event()
+
+    async def hang(value):
+        started.set()
+        await asyncio.sleep(3600)
+
+    async def run():
+        stream = iterate_pipeline([0], [Stage("hang", hang)])
+        consumer = asyncio.ensure_future(stream.__anext__())
+        await started.wait()
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
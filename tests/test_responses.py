@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import msgpack
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import Response
+from starlette.requests import Request
+
+from app.responses import FAST_JSON_MEDIA_TYPE, fast_response, ndjson_response, wants_ndjson
+from app.schemas.sam3 import MaskRLE, Sam3ConceptBatchResponse, Sam3ConceptBatchResultItem
+
+
+def request(accept=None):
+    headers = [(b"accept", accept.encode())] if accept else []
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers})
+
+
+@pytest.fixture
+def response():
+    item = Sam3ConceptBatchResultItem.model_construct(
+        masks=[[[1.5, 2.0], [3.0, 4.25]]],
+        boxes=[[0.0, 1.0, 2.0, 3.0]],
+        confidences=[0.5],
+        prompt_indices=[0],
+        mask_images=[],
+        mask_rles=[MaskRLE.model_construct(size=[2, 2], counts=[1, 3])],
+    )
+    return Sam3ConceptBatchResponse.model_construct(results=[item])
+
+
+def expected(response):
+    return json.loads(response.model_dump_json())
+
+
+@pytest.mark.parametrize("accept", [None, "*/*", "application/json"])
+def test_default_clients_keep_the_validated_path(response, accept):
+    assert fast_response(request(accept), response) is response
+
+
+def test_fast_json_is_opt_in(response):
+    result = fast_response(request(f"{FAST_JSON_MEDIA_TYPE}, application/json"), response)
+
+    assert isinstance(result, Response)
+    assert result.media_type == FAST_JSON_MEDIA_TYPE
+    assert json.loads(result.body) == expected(response)
+
+
+def test_msgpack(response):
+    result = fast_response(request("application/msgpack"), response)
+
+    assert result.media_type == "application/msgpack"
+    assert msgpack.unpackb(result.body) == expected(response)
+
+
+def test_ndjson_lines_carry_results_and_errors():
+    async def items():
+        yield 1, [{"label": "cat"}]
+        yield 0, HTTPException(status_code=400, detail="Failed to load image from URL")
+
+    async def body():
+        return b"".join([chunk async for chunk in ndjson_response(items()).body_iterator])
+
+    assert wants_ndjson(request("application/x-ndjson"))
+    lines = [json.loads(line) for line in asyncio.run(body()).splitlines()]
+    assert lines == [
+        {"index": 1, "result": [{"label": "cat"}]},
+        {"index": 0, "error": "Failed to load image from URL", "status_code": 400},
+    ]
@@ -0,0 +1,97 @@
+import time
+
+from app.services.result_store import ResultStore
+
+
+def make_store(tmp_path, max_bytes=100, **kwargs):
+    return ResultStore(tmp_path / "results.sqlite3", max_bytes, **kwargs)
+
+
+def test_put_and_get(tmp_path):
+    store = make_store(tmp_path)
+    assert store.get("a") is None
+    assert store.put("a", "yolo:m", b"[1, 2]")
+    assert store.get("a") == b"[1, 2]"
+    assert store.stats()["hits"] == 1
+    assert store.stats()["misses"] == 1
+
+
+def test_oversized_value_is_not_stored(tmp_path):
+    store = make_store(tmp_path, max_bytes=10)
+    assert not store.put("a", "yolo:m", b"x" * 11)
+    assert store.get("a") is None
+
+
+def test_evicts_least_recently_read(tmp_path):
+    store = make_store(tmp_path, max_bytes=100)
+    for key in "abc":
+        store.put(key, "yolo:m", b"x" * 40)
+        time.sleep(0.01)
+    # "c" pushed the total over the limit and "a" was the oldest entry.
+    assert store.get("a") is None
+    store.get("b")
+    time.sleep(0.01)
+    store.put("d", "yolo:m", b"x" * 40)
+
+    assert store.get("b") is not None
+    assert store.get("c") is None
+    assert store.get("d") is not None
+    stats = store.stats()
+    assert stats["evictions"] == 2
+    assert stats["bytes"] == 80 <= stats["max_bytes"]
+    assert stats["entries"] == 2
+
+
+def test_eviction_trims_to_the_low_water_mark(tmp_path):
+    store = make_store(tmp_path, max_bytes=100, low_water=0.5)
+    for i in range(11):
+        store.put(str(i), "yolo:m", b"x" * 10)
+        time.sleep(0.001)
+    assert store.stats()["evictions"] == 6
+    assert store.stats()["bytes"] == 50
+
+    # Back under the mark, the next puts do not evict anything.
+    for i in range(11, 16):
+        store.put(str(i), "yolo:m", b"x" * 10)
+    assert store.stats()["evictions"] == 6
+    assert store.stats()["entries"] == 10
+    assert store.get("5") is None and store.get("6") is not None
+
+
+def test_replacing_a_key_keeps_the_byte_count(tmp_path):
+    store = make_store(tmp_path)
+    store.put("a", "yolo:m", b"x" * 30)
+    store.put("a", "yolo:m", b"x" * 50)
+    assert store.stats()["bytes"] == 50
+    assert store.stats()["entries"] == 1
+
+
+def test_invalidate_drops_only_that_model(tmp_path):
+    store = make_store(tmp_path)
+    store.put("a", "yolo:m", b"1")
+    store.put("b", "yolo:m", b"22")
+    store.put("c", "sam3:m", b"333")
+
+    assert store.invalidate("yolo:m") == 2
+    assert store.get("a") is None and store.get("b") is None
+    assert store.get("c") == b"333"
+    assert store.stats()["bytes"] == 3
+
+
+def test_reopen_keeps_entries_and_size(tmp_path):
+    store = make_store(tmp_path)
+    store.put("a", "yolo:m", b"x" * 25)
+    store.close()
+
+    reopened = make_store(tmp_path)
+    reopened.open()
+    assert reopened.stats()["bytes"] == 25
+    assert reopened.stats()["entries"] == 1
+    assert reopened.get("a") == b"x" * 25
+
+
+def test_disabled_store(tmp_path):
+    store = make_store(tmp_path, max_bytes=0)
+    assert not store.enabled
+    assert store.invalidate("yolo:m") == 0
+    assert store.stats()["entries"] == 0
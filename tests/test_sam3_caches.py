@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+
+from app.services.cache import LRUCache
+from app.services.sam3_service import Sam3Service
+
+
+class FakePredictor:
+    def __init__(self):
+        self.encoded = 0
+        self.features = None
+
+    def set_image(self, img):
+        self.encoded += 1
+        self.features = {"image_embed": torch.ones(4)}
+
+    def setup_source(self, img):
+        pass
+
+
+class FakeBackbone:
+    def __init__(self):
+        self.calls = []
+
+    def forward_text(self, captions, input_boxes=None, additional_text=None):
+        self.calls.append((list(captions), input_boxes, additional_text))
+        return {"language_features": torch.zeros(len(captions), 2)}
+
+
+@pytest.fixture(autouse=True)
+def caches(monkeypatch):
+    monkeypatch.setattr(Sam3Service, "_embedding_cache", LRUCache(1 << 20))
+    monkeypatch.setattr(Sam3Service, "_text_cache", LRUCache(1 << 20))
+    monkeypatch.setattr(Sam3Service, "require_model", classmethod(lambda cls, name: SimpleNamespace(version="v1")))
+
+
+def test_cached_image_features_are_not_mutated_by_prompts():
+    img = np.zeros((8, 8, 3), dtype=np.uint8)
+    predictor = FakePredictor()
+
+    Sam3Service._set_image(predictor, "concept", "m", img)
+    # forward_grounding adds the prompt's text embeddings to the live dict.
+    predictor.features["language_features"] = torch.zeros(1)
+
+    features = Sam3Service._set_image(predictor, "concept", "m", img)
+    assert predictor.encoded == 1
+    assert set(features) == {"image_embed"}
+    predictor.features["language_features"] = torch.zeros(1)
+    assert set(Sam3Service._set_image(predictor, "concept", "m", img)) == {"image_embed"}
+
+
+def test_text_encoder_is_cached_per_prompt_list_only_without_extra_inputs():
+    backbone = FakeBackbone()
+    predictor = SimpleNamespace(model=SimpleNamespace(backbone=backbone))
+    Sam3Service._cache_text_encoder(predictor, "sha256:abc", None)
+
+    first = backbone.forward_text(["cat", "dog"])
+    second = backbone.forward_text(["cat", "dog"], None, None)
+    assert first is not second and first.keys() == second.keys()
+    assert len(backbone.calls) == 1
+
+    boxes = torch.ones(1, 4)
+    backbone.forward_text(["cat", "dog"], boxes)
+    backbone.forward_text(["cat", "dog"], additional_text=["bird"])
+    assert [call[1:] for call in backbone.calls] == [(None, None), (boxes, None), (None, ["bird"])]
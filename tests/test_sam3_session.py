@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.routers.sam3 import router
+from app.schemas.sam3 import Sam3AnnotateResponse
+from app.services import sam3_session
+from app.services.inference_executor import InferenceExecutor
+from app.services.sam3_service import Sam3Service
+from app.services.sam3_session import Sam3SessionManager
+
+
+@pytest.fixture
+def client(monkeypatch):
+    encoded, prompts = [], []
+
+    def lane(cls, kind, name):
+        if name != "m":
+            raise HTTPException(status_code=404, detail="SAM3 model not found")
+        return f"{kind}:{name}"
+
+    async def load_image_from_url(url):
+        return np.zeros((6, 8, 3), dtype=np.uint8)
+
+    def encode_image(cls, model_name, img):
+        encoded.append(model_name)
+        return {"image_embed": "features"}
+
+    def annotate_image(cls, model_name, img, payload, features):
+        prompts.append((payload.prompt_type, features))
+        return Sam3AnnotateResponse(masks=[], boxes=[payload.bboxes], confidences=[0.9], mask_images=[])
+
+    monkeypatch.setattr(Sam3Service, "lane", classmethod(lane))
+    monkeypatch.setattr(Sam3Service, "load_visual_model", classmethod(lambda cls, name: None))
+    monkeypatch.setattr(Sam3Service, "encode_image", classmethod(encode_image))
+    monkeypatch.setattr(Sam3Service, "annotate_image", classmethod(annotate_image))
+    monkeypatch.setattr(sam3_session, "load_image_from_url", load_image_from_url)
+    monkeypatch.setattr(Sam3SessionManager, "_sessions", {})
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as test_client:
+        yield test_client, encoded, prompts
+    InferenceExecutor.shutdown()
+
+
+def test_session_encodes_once_and_answers_every_prompt(client):
+    test_client, encoded, prompts = client
+    with test_client.websocket_connect("/sam3-models/m/session?image_url=http://images/a.jpg") as ws:
+        ready = ws.receive_json()
+        assert ready["type"] == "ready" and (ready["width"], ready["height"]) == (8, 6)
+        assert Sam3SessionManager.stats()["active"] == 1
+
+        for request_id in ("p1", "p2"):
+            ws.send_json({"request_id": request_id, "prompt_type": "bbox", "bboxes": [1, 2, 3, 4]})
+            result = ws.receive_json()
+            assert result["type"] == "result" and result["request_id"] == request_id
+            assert result["boxes"] == [[1, 2, 3, 4]]
+
+        ws.send_json({"request_id": "bad", "prompt_type": "lasso"})
+        error = ws.receive_json()
+        assert error["type"] == "error" and error["request_id"] == "bad" and error["status"] == 422
+
+    assert encoded == ["m"]
+    assert prompts == [("bbox", {"image_embed": "features"})] * 2
+    for _ in range(100):
+        if not Sam3SessionManager.stats()["active"]:
+            break
+        time.sleep(0.01)
+    assert Sam3SessionManager.stats()["active"] == 0
+
+
+def test_unknown_model_closes_the_session(client):
+    test_client, encoded, _ = client
+    with test_client.websocket_connect("/sam3-models/missing/session?image_url=http://images/a.jpg") as ws:
+        error = ws.receive_json()
+        assert error == {"type": "error", "status": 404, "detail": "SAM3 model not found"}
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+
+    assert closed.value.code == 4404
+    assert encoded == []
+    assert Sam3SessionManager.stats()["opening"] == 0
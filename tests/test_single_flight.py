@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.services.single_flight import AsyncSingleFlight, SingleFlight, flight_key
+
+
+class Payload(BaseModel):
+    image_url: str
+    conf: float = 0.25
+
+
+def test_flight_key_is_canonical():
+    assert flight_key("m", {"a": 1, "b": [1, 2]}) == flight_key("m", {"b": (1, 2), "a": 1})
+    assert flight_key("m", Payload(image_url="u")) == flight_key("m", {"conf": 0.25, "image_url": "u"})
+    assert flight_key("m", Payload(image_url="u")) != flight_key("m", Payload(image_url="v"))
+
+
+def test_concurrent_misses_share_one_execution():
+    flights = AsyncSingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"annotations": calls}
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert flights.stats() == {"inflight": 0, "executed": 1, "coalesced": 4}
+
+
+def test_different_keys_run_separately():
+    flights = AsyncSingleFlight()
+
+    async def run():
+        return await asyncio.gather(flights.do("a", lambda: asyncio.sleep(0, "a")),
+                                    flights.do("b", lambda: asyncio.sleep(0, "b")))
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert flights.stats()["executed"] == 2
+
+
+def test_error_reaches_every_waiter():
+    flights = AsyncSingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise HTTPException(status_code=400, detail="Failed to load image from URL")
+
+    async def run():
+        return await asyncio.gather(*(flights.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(run())
+
+    assert len(errors) == 3
+    assert all(isinstance(error, HTTPException) and error.status_code == 400 for error in errors)
+    assert flights.stats()["inflight"] == 0
+
+
+def test_finished_flight_is_not_reused():
+    flights = AsyncSingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def run():
+        return [await flights.do("key", work), await flights.do("key", work)]
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flights = AsyncSingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("key", work))
+        second = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_thread_single_flight_coalesces_loads():
+    flights = SingleFlight()
+    loads = 0
+    barrier = threading.Barrier(4)
+
+    def load():
+        nonlocal loads
+        loads += 1
+        time.sleep(0.05)
+        return object()
+
+    def call():
+        barrier.wait()
+        return flights.do(("yolo", "weights"), load)
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: call(), range(4)))
+
+    assert loads == 1
+    assert all(result is results[0] for result in results)
+    assert flights.stats() == {"inflight": 0, "executed": 1, "coalesced": 3}
+
+
+def test_thread_single_flight_error_reaches_every_waiter():
+    flights = SingleFlight()
+    barrier = threading.Barrier(3)
+
+    def load():
+        time.sleep(0.05)
+        raise HTTPException(status_code=500, detail="Failed to load YOLO model")
+
+    def call():
+        barrier.wait()
+        try:
+            flights.do("key", load)
+        except HTTPException as exc:
+            return exc.status_code
+
+    with ThreadPoolExecutor(3) as pool:
+        assert list(pool.map(lambda _: call(), range(3))) == [500, 500, 500]
+    assert flights.stats()["inflight"] == 0
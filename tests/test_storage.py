@@ -0,0 +1,51 @@
+import io
+
+from app.services.storage import BlobStore
+
+
+def store_bytes(store, data: bytes):
+    return store._write_stream(io.BytesIO(data))
+
+
+def test_identical_uploads_share_one_blob(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    first, second = store_bytes(store, b"weights"), store_bytes(store, b"weights")
+    assert first.sha256 == second.sha256 and first.path == second.path
+    assert first.size == 7
+
+    store.link(first, tmp_path / "a.pt")
+    store.link(second, tmp_path / "b.pt")
+
+    assert not first.pin.exists() and not second.pin.exists()
+    assert (tmp_path / "a.pt").stat().st_ino == (tmp_path / "b.pt").stat().st_ino == first.path.stat().st_ino
+    assert first.path.stat().st_nlink == 3
+
+
+def test_release_deletes_only_unreferenced_blobs(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    blob = store_bytes(store, b"weights")
+    store.link(blob, tmp_path / "a.pt")
+    store.link(store_bytes(store, b"weights"), tmp_path / "b.pt")
+
+    (tmp_path / "a.pt").unlink()
+    store.release(blob.sha256)
+    assert blob.path.exists()
+
+    (tmp_path / "b.pt").unlink()
+    store.release(blob.sha256)
+    assert not blob.path.exists()
+    store.release(blob.sha256)
+    store.release(None)
+
+
+def test_pinned_upload_survives_a_concurrent_release(tmp_path):
+    store = BlobStore(tmp_path / "blobs")
+    blob = store_bytes(store, b"weights")
+
+    # The model that last used these weights is deleted while the new upload is still staging.
+    store.release(blob.sha256)
+    assert blob.path.exists()
+
+    store.link(blob, tmp_path / "a.pt")
+    assert (tmp_path / "a.pt").read_bytes() == b"weights"
+    assert blob.path.stat().st_nlink == 2
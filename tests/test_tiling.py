@@ -0,0 +1,46 @@
+import io
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services.tiling import ArrayRegionReader, TiffBandReader, iter_tiles, open_region_reader
+
+
+def encode_tiff(img: np.ndarray, **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(img).save(buffer, "TIFF", **kwargs)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def rgb():
+    return np.random.default_rng(0).integers(0, 256, (101, 70, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB", "RGBA"])
+def test_band_reads_match_full_decode(mode):
+    channels = {"L": (), "RGB": (3,), "RGBA": (4,)}[mode]
+    img = np.random.default_rng(1).integers(0, 256, (101, 70, *channels), dtype=np.uint8)
+    data = encode_tiff(img, tiffinfo={278: 8})
+    reader = open_region_reader(data)
+    assert isinstance(reader, TiffBandReader)
+
+    expected = cv2.cvtColor(np.asarray(Image.open(io.BytesIO(data)).convert("RGB")), cv2.COLOR_RGB2BGR)
+    for top, height in [(0, 8), (0, 101), (5, 20), (16, 8), (90, 32), (100, 1)]:
+        np.testing.assert_array_equal(reader.read_band(top, height), expected[top:top + height])
+
+
+def test_iter_tiles_covers_image(rgb):
+    reader = open_region_reader(encode_tiff(rgb, tiffinfo={278: 8}))
+    bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+    tiles = list(iter_tiles(reader, 32, 0.25))
+    for tile, left, top in tiles:
+        np.testing.assert_array_equal(tile, bgr[top:top + 32, left:left + 32])
+    assert {(left + tile.shape[1], top + tile.shape[0]) for tile, left, top in tiles} >= {(70, 101)}
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"compression": "tiff_lzw", "tiffinfo": {278: 8}}])
+def test_single_strip_or_compressed_tiff_decodes_fully(rgb, kwargs):
+    assert isinstance(open_region_reader(encode_tiff(rgb, **kwargs)), ArrayRegionReader)